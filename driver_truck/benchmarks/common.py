@@ -0,0 +1,78 @@
+"""
+Shared helpers for the benchmark scripts
+
+Benchmarks run against a throwaway SQLite file so they never touch the
+development database. Run them from the project directory, e.g.
+
+    python -m benchmarks.trip_listing --trips 1000000
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path=None):
+    """
+    Configure Django against a scratch database and run migrations
+    """
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'driver_truck.settings')
+
+    import django
+    from django.conf import settings
+
+    db_path = db_path or os.path.join(tempfile.mkdtemp(prefix='driver_truck_bench_'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    # Opening the replica alias (checks, migrate) would create its file in the source tree
+    if 'replica' in settings.DATABASES:
+        settings.DATABASES['replica']['NAME'] = f'{os.path.splitext(db_path)[0]}.replica.sqlite3'
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+    return db_path
+
+
+def measure(func, repeat=20, warmup=2):
+    """
+    Run ``func`` repeatedly and return latency percentiles in milliseconds
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples):
+    """
+    p50/p95/p99 of latency samples given in milliseconds
+    """
+    samples = sorted(samples)
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'runs': len(samples),
+    }
+
+
+def percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    index = (len(sorted_samples) - 1) * pct / 100
+    lower = int(index)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (index - lower)
@@ -0,0 +1,307 @@
+"""
+Endpoint benchmark suite
+
+Seeds a deterministic fleet (see benchmarks.fleet) and drives every
+viewset action -- list/retrieve/create/update/destroy, the trip and stop
+state transitions, vehicle assignment, the nested detail actions,
+exports, bulk ingest and the analytics endpoints -- through the Django
+test client. Each request runs inside a transaction that is rolled back,
+so writes leave the dataset unchanged and every run sees the same rows.
+
+Per endpoint the report holds p50/p95/p99 latency, the number of SQL
+queries and the response size in bytes. Save it with ``--output`` and
+pass an earlier file to ``--compare`` to print the difference between
+commits.
+
+    python -m benchmarks.endpoints --drivers 200 --output before.json
+    python -m benchmarks.endpoints --drivers 200 --compare before.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+from datetime import timedelta
+
+from benchmarks.common import PROJECT_DIR, setup_django, summarize
+from benchmarks.fleet import EPOCH, row_counts, seed_fleet
+
+
+class Case:
+    """
+    One request to benchmark
+    """
+
+    def __init__(self, name, method, path, data=None, **extra):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.extra = extra
+
+    def send(self, client):
+        """
+        Issue the request and return (response, body bytes)
+        """
+        if self.method == 'get':
+            response = client.get(self.path, self.data, **self.extra)
+        else:
+            response = getattr(client, self.method)(self.path, self.data, format='json', **self.extra)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+
+def targets():
+    """
+    Rows the cases act on, picked the same way on every run
+    """
+    from drivers.models import Driver, Vehicle
+    from logs.models import DutyLog, HOSViolation
+    from trips.models import Trip, TripEvent, TripStop
+
+    trips = Trip.objects.order_by('pk')
+    driver = trips.filter(status='completed').first().driver
+    return {
+        'driver': driver,
+        'trip': trips.filter(driver=driver, status='completed').first(),
+        'planned': trips.filter(status='planned').first(),
+        'in_progress': trips.filter(status='in_progress').first(),
+        'stop': TripStop.objects.filter(is_completed=False, trip__status='in_progress').order_by('pk').first(),
+        'event': TripEvent.objects.order_by('pk').first(),
+        'vehicle': Vehicle.objects.order_by('pk').first(),
+        'spare_driver': Driver.objects.order_by('-pk').first(),
+        'duty_log': DutyLog.objects.filter(driver=driver).order_by('pk').first(),
+        'violation': HOSViolation.objects.order_by('pk').first(),
+    }
+
+
+def trip_payload(driver, trip_number):
+    start = EPOCH.replace(year=2026)
+    return {
+        'driver': driver.pk, 'trip_number': trip_number,
+        'origin_address': '100 Depot Way', 'origin_city': 'Atlanta', 'origin_state': 'GA', 'origin_zip': '30301',
+        'origin_latitude': '33.748995', 'origin_longitude': '-84.387982',
+        'destination_address': '200 Dock St', 'destination_city': 'Nashville', 'destination_state': 'TN',
+        'destination_zip': '37201', 'destination_latitude': '36.162664', 'destination_longitude': '-86.781602',
+        'planned_start_time': start.isoformat(), 'planned_end_time': (start + timedelta(hours=8)).isoformat(),
+        'estimated_distance': '250.00', 'load_description': 'General freight',
+    }
+
+
+def build_cases(rows):
+    """
+    Every viewset action, keyed by ``<resource>.<action>``
+    """
+    driver, trip, planned, stop, event = rows['driver'], rows['trip'], rows['planned'], rows['stop'], rows['event']
+    day = (EPOCH + timedelta(days=3)).date().isoformat()
+    month_end = (EPOCH + timedelta(days=30)).date().isoformat()
+    trips, stops, events = '/api/trips/trips/', '/api/trips/stops/', '/api/trips/events/'
+    drivers, vehicles = '/api/drivers/drivers/', '/api/drivers/vehicles/'
+    logs, violations = '/api/logs/duty-logs/', '/api/logs/hos-violations/'
+    stop_payload = {
+        'trip': planned.pk, 'stop_type': 'fuel', 'stop_order': 99, 'address': '9 Fuel Rd', 'city': 'Dalton',
+        'state': 'GA', 'zip_code': '30720', 'latitude': '34.769802', 'longitude': '-84.970223',
+        'planned_arrival': planned.planned_start_time.isoformat(),
+        'planned_departure': (planned.planned_start_time + timedelta(minutes=30)).isoformat(),
+    }
+    event_payload = {
+        'trip': trip.pk, 'event_type': 'fuel', 'location': 'I-75', 'latitude': '34.000000',
+        'longitude': '-84.000000', 'description': 'Fuel purchase', 'additional_data': {'gallons': 120},
+    }
+    cases = [
+        Case('trips.list', 'get', trips),
+        Case('trips.list_filtered', 'get', trips, {'driver': driver.pk, 'status': 'completed', 'start_date': day,
+                                                   'end_date': month_end}),
+        Case('trips.list_cursor', 'get', trips, {'pagination': 'cursor'}),
+        Case('trips.list_include', 'get', trips, {'include': 'stops,events'}),
+        Case('trips.list_sparse', 'get', trips, {'fields': 'id,trip_number,status'}),
+        Case('trips.retrieve', 'get', f'{trips}{trip.pk}/'),
+        Case('trips.create', 'post', trips, trip_payload(driver, 'BENCH-NEW')),
+        Case('trips.update', 'put', f'{trips}{planned.pk}/', trip_payload(planned.driver, planned.trip_number)),
+        Case('trips.partial_update', 'patch', f'{trips}{planned.pk}/', {'notes': 'Gate code 1234'}),
+        Case('trips.destroy', 'delete', f'{trips}{planned.pk}/'),
+        Case('trips.export', 'get', f'{trips}export/', {'driver': driver.pk}, HTTP_ACCEPT='text/csv'),
+        Case('trips.start_trip', 'post', f'{trips}{planned.pk}/start_trip/'),
+        Case('trips.complete_trip', 'post', f'{trips}{rows["in_progress"].pk}/complete_trip/', {'actual_distance': '310.50'}),
+        Case('trips.stops', 'get', f'{trips}{trip.pk}/stops/'),
+        Case('trips.events', 'get', f'{trips}{trip.pk}/events/'),
+        Case('stops.list', 'get', stops),
+        Case('stops.list_near', 'get', stops, {'near': '33.748995,-84.387982', 'radius_mi': 25}),
+        Case('stops.retrieve', 'get', f'{stops}{stop.pk}/'),
+        Case('stops.create', 'post', stops, stop_payload),
+        Case('stops.partial_update', 'patch', f'{stops}{stop.pk}/', {'notes': 'Dock 4'}),
+        Case('stops.destroy', 'delete', f'{stops}{stop.pk}/'),
+        Case('stops.arrive', 'post', f'{stops}{stop.pk}/arrive/'),
+        Case('stops.depart', 'post', f'{stops}{stop.pk}/depart/'),
+        Case('events.list', 'get', events),
+        Case('events.list_trip', 'get', events, {'trip': trip.pk}),
+        Case('events.retrieve', 'get', f'{events}{event.pk}/'),
+        Case('events.create', 'post', events, event_payload),
+        Case('events.partial_update', 'patch', f'{events}{event.pk}/', {'description': 'Edited'}),
+        Case('events.destroy', 'delete', f'{events}{event.pk}/'),
+        Case('events.export', 'get', f'{events}export/', {'trip': trip.pk}, HTTP_ACCEPT='application/x-ndjson'),
+        Case('events.bulk', 'post', f'{events}bulk/', [{**event_payload, 'description': f'Ping {i}'} for i in range(100)]),
+        Case('fleet_positions.list', 'get', '/api/trips/fleet/positions/'),
+        Case('driver_stats.list', 'get', '/api/trips/driver-stats/', {'driver': driver.pk}),
+        Case('driver_stats.summary', 'get', '/api/trips/driver-stats/summary/', {'start_date': day, 'end_date': month_end}),
+        Case('lanes.list', 'get', '/api/trips/lanes/'),
+        Case('lanes.cities', 'get', '/api/trips/lanes/cities/', {'origin_state': 'GA'}),
+        Case('drivers.list', 'get', drivers),
+        Case('drivers.retrieve', 'get', f'{drivers}{driver.pk}/'),
+        Case('drivers.create', 'post', drivers, {'username': 'bench-new', 'driver_license': 'BENCH-NEW',
+                                                  'password': 'bench-password-1'}),
+        Case('drivers.partial_update', 'patch', f'{drivers}{driver.pk}/', {'phone_number': '555-0100'}),
+        Case('drivers.destroy', 'delete', f'{drivers}{rows["spare_driver"].pk}/'),
+        Case('drivers.duty_logs', 'get', f'{drivers}{driver.pk}/duty_logs/'),
+        Case('drivers.trips', 'get', f'{drivers}{driver.pk}/trips/'),
+        Case('drivers.current_status', 'get', f'{drivers}{driver.pk}/current_status/'),
+        Case('vehicles.list', 'get', vehicles),
+        Case('vehicles.retrieve', 'get', f'{vehicles}{rows["vehicle"].pk}/'),
+        Case('vehicles.create', 'post', vehicles, {'license_plate': 'BENCH-1', 'vin': '1BENCH00000000001',
+                                                    'make': 'Volvo', 'model': 'VNL', 'year': 2024}),
+        Case('vehicles.partial_update', 'patch', f'{vehicles}{rows["vehicle"].pk}/', {'notes': 'Tires rotated'}),
+        Case('vehicles.destroy', 'delete', f'{vehicles}{rows["vehicle"].pk}/'),
+        Case('vehicles.assign_driver', 'post', f'{vehicles}{rows["vehicle"].pk}/assign_driver/',
+             {'driver_id': rows['spare_driver'].pk}),
+        Case('vehicles.unassign_driver', 'post', f'{vehicles}{rows["vehicle"].pk}/unassign_driver/'),
+        Case('duty_logs.list', 'get', logs, {'driver': driver.pk}),
+        Case('duty_logs.retrieve', 'get', f'{logs}{rows["duty_log"].pk}/'),
+        Case('duty_logs.create', 'post', logs, {'driver': driver.pk, 'status': 'on_duty', 'location': 'Yard'}),
+        Case('duty_logs.partial_update', 'patch', f'{logs}{rows["duty_log"].pk}/', {'notes': 'Pre-trip inspection'}),
+        Case('duty_logs.destroy', 'delete', f'{logs}{rows["duty_log"].pk}/'),
+        Case('duty_logs.current', 'get', f'{logs}current/'),
+        Case('duty_logs.hos_status', 'get', f'{logs}hos-status/', {'driver': driver.pk}),
+        Case('hos_violations.list', 'get', violations),
+        Case('hos_violations.evaluate', 'post', f'{violations}evaluate/', {'driver': driver.pk}),
+    ]
+    if rows['violation'] is not None:
+        cases.append(Case('hos_violations.retrieve', 'get', f'{violations}{rows["violation"].pk}/'))
+    return cases
+
+
+def run_case(client, case, repeat, warmup):
+    """
+    Time ``case`` with every request rolled back, then count its queries
+    """
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+
+    samples = []
+    for run in range(warmup + repeat):
+        with transaction.atomic():
+            started = time.perf_counter()
+            response, body = case.send(client)
+            elapsed = (time.perf_counter() - started) * 1000
+            transaction.set_rollback(True)
+        if run >= warmup:
+            samples.append(elapsed)
+
+    with CaptureQueriesContext(connection) as queries, transaction.atomic():
+        case.send(client)
+        transaction.set_rollback(True)
+    # Leave out the BEGIN/ROLLBACK of the wrapping transaction
+    statements = [query for query in queries.captured_queries if query['sql'] not in ('BEGIN', 'ROLLBACK')]
+    return {
+        'method': case.method.upper(),
+        'path': case.path,
+        'status': response.status_code,
+        'queries': len(statements),
+        'bytes': len(body),
+        **summarize(samples),
+    }
+
+
+def git_revision():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def compare(report, baseline):
+    """
+    Print p50, query and size changes against an earlier report
+    """
+    print(f"{'endpoint':32} {'p50 ms':>19} {'queries':>10} {'bytes':>18}")
+    for name, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if previous is None:
+            print(f'{name:32} (new)')
+            continue
+        ratio = current['p50_ms'] / previous['p50_ms'] if previous['p50_ms'] else 0
+        print(
+            f"{name:32} {previous['p50_ms']:8.2f} -> {current['p50_ms']:7.2f} "
+            f"{previous['queries']:3} -> {current['queries']:3} "
+            f"{previous['bytes']:7} -> {current['bytes']:7}  x{ratio:.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--drivers', type=int, default=200)
+    parser.add_argument('--vehicles', type=int, help='Defaults to one per driver')
+    parser.add_argument('--trips-per-driver', type=int, default=25)
+    parser.add_argument('--stops-per-trip', type=int, default=3)
+    parser.add_argument('--events-per-trip', type=int, default=8)
+    parser.add_argument('--duty-days', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', help='Run endpoints whose name contains this text')
+    parser.add_argument('--cache', action='store_true', help='Leave the response cache on (off by default)')
+    parser.add_argument('--db', help='Reuse an existing benchmark database instead of seeding a new one')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    parser.add_argument('--compare', help='Earlier JSON report to compare against')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+    from rest_framework.test import APIClient
+    from trips.models import Trip
+
+    setup_test_environment(debug=False)
+    settings.RESPONSE_CACHE_ENABLED = args.cache
+
+    fleet = {
+        'drivers': args.drivers, 'vehicles': args.vehicles, 'trips_per_driver': args.trips_per_driver,
+        'stops_per_trip': args.stops_per_trip, 'events_per_trip': args.events_per_trip,
+        'duty_days': args.duty_days, 'seed_value': args.seed,
+    }
+    if not Trip.objects.exists():
+        started = time.perf_counter()
+        seed_fleet(**fleet)
+        fleet['seed_seconds'] = round(time.perf_counter() - started, 1)
+    fleet['rows'] = row_counts()
+
+    rows = targets()
+    client = APIClient()
+    client.force_authenticate(rows['driver'])
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'database': str(db_path),
+        'fleet': fleet,
+        'response_cache': args.cache,
+        'endpoints': {},
+    }
+    for case in build_cases(rows):
+        if args.only and args.only not in case.name:
+            continue
+        report['endpoints'][case.name] = run_case(client, case, args.repeat, args.warmup)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(report, json.load(baseline))
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
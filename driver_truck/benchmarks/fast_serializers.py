@@ -0,0 +1,133 @@
+"""
+Compiled read path benchmark
+
+Seeds 10k rows (by default) each of drivers, trips, stops and events and
+times serializing all of them with the DRF list serializers versus the
+compiled ReadPlan. Two numbers per serializer: "serialize" covers only
+turning already-fetched rows into dicts; "end_to_end" also includes the
+query (model instances for DRF, ``.values_list()`` tuples for the plan).
+
+    python -m benchmarks.fast_serializers --rows 10000
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from benchmarks.common import measure, setup_django
+
+
+def seed(rows, seed_value=42, batch_size=5000):
+    from django.utils import timezone
+    from drivers.models import Driver
+    from trips.models import Trip, TripEvent, TripStop
+
+    rng = random.Random(seed_value)
+    Driver.objects.bulk_create(
+        [
+            Driver(username=f'fast{i}', driver_license=f'FAST{i:08d}', first_name='Fast', last_name=str(i),
+                   carrier_name='Bench Freight')
+            for i in range(rows)
+        ],
+        batch_size=batch_size,
+    )
+    driver_ids = list(Driver.objects.values_list('id', flat=True))
+
+    epoch = timezone.make_aware(datetime(2025, 1, 1))
+    trips = []
+    for i in range(rows):
+        start = epoch + timedelta(minutes=rng.randrange(365 * 24 * 60))
+        trips.append(Trip(
+            driver_id=rng.choice(driver_ids),
+            trip_number=f'F{i:09d}',
+            origin_address='1 Main St', origin_city='Atlanta', origin_state='GA', origin_zip='30301',
+            destination_address='2 Market St', destination_city='Nashville',
+            destination_state='TN', destination_zip='37201',
+            planned_start_time=start,
+            planned_end_time=start + timedelta(hours=rng.randint(2, 14)),
+            estimated_distance=Decimal(rng.randint(2000, 90000)) / 100,
+            load_description='Palletised dry goods',
+            status=rng.choice(['planned', 'in_progress', 'completed']),
+        ))
+    trips = Trip.objects.bulk_create(trips, batch_size=batch_size)
+
+    TripStop.objects.bulk_create(
+        [
+            TripStop(
+                trip=trip, stop_type='fuel', stop_order=1, address='5 Truck Stop Rd', city='Chattanooga',
+                state='TN', zip_code='37401', latitude=Decimal('35.045631'), longitude=Decimal('-85.309677'),
+                planned_arrival=trip.planned_start_time + timedelta(hours=1),
+                planned_departure=trip.planned_start_time + timedelta(hours=1, minutes=30),
+            )
+            for trip in trips
+        ],
+        batch_size=batch_size,
+    )
+    TripEvent.objects.bulk_create(
+        [
+            TripEvent(
+                trip=trip, event_type=rng.choice(['delay', 'fuel', 'other']), event_time=trip.planned_start_time,
+                location='I-75', latitude=Decimal('34.000000'), longitude=Decimal('-84.000000'),
+                description='Bench event', additional_data={'speed': rng.randint(0, 70)},
+            )
+            for trip in trips
+        ],
+        batch_size=batch_size,
+    )
+
+
+def cases():
+    from drivers.models import Driver
+    from drivers.serializers import DriverListSerializer
+    from trips.models import Trip, TripEvent, TripStop
+    from trips.serializers import TripEventSerializer, TripListSerializer, TripStopSerializer
+
+    return {
+        'TripListSerializer': (TripListSerializer, Trip.objects.select_related('driver')),
+        'TripStopSerializer': (TripStopSerializer, TripStop.objects.select_related('trip')),
+        'TripEventSerializer': (TripEventSerializer, TripEvent.objects.select_related('trip')),
+        'DriverListSerializer': (DriverListSerializer, Driver.objects.all()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--db', help='Reuse an existing benchmark database instead of seeding a new one')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+
+    from driver_truck.fastpath import compile_plan
+    from trips.models import Trip
+
+    if not Trip.objects.exists():
+        seed(args.rows)
+
+    report = {'rows': args.rows, 'database': str(db_path)}
+    for name, (serializer_class, queryset) in cases().items():
+        queryset = queryset.order_by('pk')[:args.rows]
+        plan = compile_plan(serializer_class())
+        instances = list(queryset)
+        values = list(queryset.values_list(*plan.columns))
+        assert plan.serialize(values) == serializer_class(instances, many=True).data
+
+        drf = measure(lambda: serializer_class(instances, many=True).data, repeat=args.repeat)
+        fast = measure(lambda: plan.serialize(values), repeat=args.repeat)
+        drf_total = measure(lambda: serializer_class(list(queryset.all()), many=True).data, repeat=args.repeat)
+        fast_total = measure(lambda: plan.serialize(queryset.values_list(*plan.columns)), repeat=args.repeat)
+        report[name] = {
+            'serialize': {'drf': drf, 'compiled': fast, 'speedup': round(drf['p50_ms'] / fast['p50_ms'], 1)},
+            'end_to_end': {
+                'drf': drf_total,
+                'compiled': fast_total,
+                'speedup': round(drf_total['p50_ms'] / fast_total['p50_ms'], 1),
+            },
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Deterministic fleet dataset for the endpoint benchmarks
+
+``seed_fleet`` fills an empty database with drivers, vehicles, trips in
+every status, stops, located events and duty logs, all drawn from one
+seeded random generator and a fixed epoch, so the same arguments always
+produce the same rows. Derived tables (last known positions, daily
+rollups, the lane cube, HOS violations) are rebuilt afterwards.
+"""
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+
+EPOCH = datetime(2025, 1, 6)
+
+CITIES = [
+    ('Atlanta', 'GA', '33.748995', '-84.387982'),
+    ('Nashville', 'TN', '36.162664', '-86.781602'),
+    ('Chattanooga', 'TN', '35.045631', '-85.309677'),
+    ('Charlotte', 'NC', '35.227087', '-80.843127'),
+    ('Jacksonville', 'FL', '30.332184', '-81.655651'),
+    ('Birmingham', 'AL', '33.518589', '-86.810356'),
+    ('Memphis', 'TN', '35.149534', '-90.048980'),
+    ('Savannah', 'GA', '32.080899', '-81.091203'),
+    ('Louisville', 'KY', '38.252665', '-85.758456'),
+    ('Columbia', 'SC', '34.000710', '-81.034814'),
+]
+
+STATUS_WEIGHTS = {'completed': 70, 'planned': 15, 'in_progress': 10, 'cancelled': 5}
+STOP_TYPES = ['pickup', 'fuel', 'rest', 'inspection', 'delivery']
+EVENT_TYPES = ['fuel', 'delay', 'inspection', 'other']
+DUTY_CYCLE = [('off_duty', 10), ('on_duty', 1), ('driving', 5), ('on_duty', 1), ('driving', 5), ('off_duty', 2)]
+
+
+def jitter(rng, value, spread=50000):
+    """
+    ``value`` moved by up to ``spread`` millionths of a degree
+    """
+    return Decimal(value) + Decimal(rng.randint(-spread, spread)) / 10 ** 6
+
+
+def seed_fleet(drivers=200, vehicles=None, trips_per_driver=25, stops_per_trip=3, events_per_trip=8,
+               duty_days=8, seed_value=42, batch_size=2000):
+    """
+    Populate an empty database; returns the row counts
+    """
+    from django.utils import timezone
+    from drivers.models import Driver, Vehicle
+    from logs.models import DutyLog
+    from logs.services import evaluate_violations
+    from trips import lanes, rollups
+    from trips.changes import record_inserted
+    from trips.models import Trip, TripEvent, TripStop
+    from trips.services import update_positions
+
+    rng = random.Random(seed_value)
+    epoch = timezone.make_aware(EPOCH)
+    vehicles = drivers if vehicles is None else vehicles
+
+    Driver.objects.bulk_create(
+        [
+            Driver(username=f'fleet{i:06d}', driver_license=f'FLEET{i:08d}', first_name='Fleet', last_name=f'Driver {i}',
+                   carrier_name=f'Carrier {i % 10}', employee_id=f'E{i:06d}')
+            for i in range(drivers)
+        ],
+        batch_size=batch_size,
+    )
+    driver_ids = list(Driver.objects.filter(username__startswith='fleet').order_by('pk').values_list('pk', flat=True))
+    Vehicle.objects.bulk_create(
+        [
+            Vehicle(license_plate=f'FL-{i:06d}', vin=f'1FLEET{i:011d}', make=rng.choice(['Freightliner', 'Volvo', 'Kenworth']),
+                    model='Tractor', year=rng.randint(2015, 2025),
+                    assigned_driver_id=driver_ids[i] if i < len(driver_ids) else None)
+            for i in range(vehicles)
+        ],
+        batch_size=batch_size,
+    )
+
+    statuses, weights = zip(*STATUS_WEIGHTS.items())
+    trips = []
+    for index, driver_id in enumerate(driver_ids):
+        start = epoch
+        for number in range(trips_per_driver):
+            origin, destination = rng.sample(CITIES, 2)
+            start += timedelta(hours=rng.randint(14, 60))
+            hours = rng.randint(4, 14)
+            status = rng.choices(statuses, weights)[0]
+            trip = Trip(
+                driver_id=driver_id, trip_number=f'FL{index:06d}-{number:04d}', status=status,
+                origin_address='100 Depot Way', origin_city=origin[0], origin_state=origin[1], origin_zip='30301',
+                origin_latitude=Decimal(origin[2]), origin_longitude=Decimal(origin[3]),
+                destination_address='200 Dock St', destination_city=destination[0], destination_state=destination[1],
+                destination_zip='37201', destination_latitude=Decimal(destination[2]),
+                destination_longitude=Decimal(destination[3]),
+                planned_start_time=start, planned_end_time=start + timedelta(hours=hours),
+                estimated_distance=Decimal(rng.randint(hours * 4000, hours * 6000)) / 100,
+                load_description='General freight', load_weight=rng.randint(5000, 44000),
+            )
+            if status in ('in_progress', 'completed'):
+                trip.actual_start_time = start + timedelta(minutes=rng.randint(-30, 90))
+            if status == 'completed':
+                trip.actual_end_time = trip.actual_start_time + timedelta(hours=hours, minutes=rng.randint(-60, 120))
+                trip.actual_distance = trip.estimated_distance + Decimal(rng.randint(-2000, 4000)) / 100
+            trip.update_grid_cells()
+            trips.append(trip)
+    trips = Trip.objects.bulk_create(trips, batch_size=batch_size)
+
+    stops, events = [], []
+    for trip in trips:
+        span = trip.planned_end_time - trip.planned_start_time
+        for order in range(1, stops_per_trip + 1):
+            city = rng.choice(CITIES)
+            arrival = trip.planned_start_time + span * order / (stops_per_trip + 1)
+            done = trip.status == 'completed' or (trip.status == 'in_progress' and order == 1)
+            stop = TripStop(
+                trip=trip, stop_type=STOP_TYPES[(order - 1) % len(STOP_TYPES)], stop_order=order,
+                address=f'{order} Truck Stop Rd', city=city[0], state=city[1], zip_code='37401',
+                latitude=jitter(rng, city[2]), longitude=jitter(rng, city[3]),
+                planned_arrival=arrival, planned_departure=arrival + timedelta(minutes=30),
+                actual_arrival=arrival if done else None, actual_departure=arrival + timedelta(minutes=35) if done else None,
+                is_completed=done,
+            )
+            stop.update_grid_cell()
+            stops.append(stop)
+        if trip.status not in ('in_progress', 'completed'):
+            continue
+        for number in range(events_per_trip):
+            city = rng.choice(CITIES)
+            event = TripEvent(
+                trip=trip, event_type=rng.choice(EVENT_TYPES),
+                event_time=trip.actual_start_time + span * number / events_per_trip,
+                location=f'{city[0]}, {city[1]}', latitude=jitter(rng, city[2]), longitude=jitter(rng, city[3]),
+                description='Fleet event', additional_data={'speed': rng.randint(0, 70), 'odometer': rng.randint(1, 10 ** 6)},
+            )
+            event.update_grid_cell()
+            events.append(event)
+    TripStop.objects.bulk_create(stops, batch_size=batch_size)
+    for offset in range(0, len(events), batch_size):
+        update_positions(TripEvent.objects.bulk_create(events[offset:offset + batch_size]))
+
+    logs = []
+    for driver_id in driver_ids:
+        moment = epoch + timedelta(minutes=rng.randint(0, 600))
+        for _ in range(duty_days):
+            for duty_status, hours in DUTY_CYCLE:
+                end = moment + timedelta(hours=hours, minutes=rng.randint(-20, 20))
+                logs.append(DutyLog(driver_id=driver_id, status=duty_status, start_time=moment, end_time=end,
+                                    location='On route', odometer=rng.randint(1, 10 ** 6)))
+                moment = end
+        # Each driver's newest status stays open
+        logs[-1].end_time = None
+    DutyLog.objects.bulk_create(logs, batch_size=batch_size)
+
+    # The database starts empty, so every row needs its sync-feed entry
+    for model in (Driver, Vehicle, Trip, TripStop, TripEvent):
+        record_inserted(model, model.objects.all())
+    rollups.rebuild()
+    lanes.rebuild()
+    evaluate_violations(since=epoch, as_of=epoch + timedelta(days=duty_days + 1))
+    return row_counts()
+
+
+def row_counts():
+    """
+    Rows per benchmarked model, to record what a report was measured against
+    """
+    from drivers.models import Driver, Vehicle
+    from logs.models import DutyLog
+    from trips.models import Trip, TripEvent, TripStop
+
+    models = {'drivers': Driver, 'vehicles': Vehicle, 'trips': Trip, 'stops': TripStop, 'events': TripEvent,
+              'duty_logs': DutyLog}
+    return {name: model.objects.count() for name, model in models.items()}
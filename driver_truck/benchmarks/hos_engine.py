@@ -0,0 +1,102 @@
+"""
+Hours-of-Service engine benchmark
+
+Seeds duty logs for a whole fleet (2000 drivers by default) and times an
+8-day compliance sweep: loading the on-duty intervals, evaluating the
+11-hour, 14-hour, 30-minute break and 70-hour/8-day rules, and computing
+every driver's remaining clocks. Some drivers are seeded to run over the
+limits so the violation paths do real work.
+
+    python -m benchmarks.hos_engine --drivers 2000
+"""
+import argparse
+import json
+import random
+from datetime import timedelta
+
+from benchmarks.common import measure, setup_django
+
+
+def seed(drivers, days, seed_value=42, batch_size=10000):
+    from django.utils import timezone
+    from drivers.models import Driver
+    from logs.models import DutyLog
+
+    rng = random.Random(seed_value)
+    Driver.objects.bulk_create(
+        [Driver(username=f'hos{i}', driver_license=f'HOS{i:08d}') for i in range(drivers)],
+        batch_size=batch_size,
+    )
+    driver_ids = list(Driver.objects.values_list('id', flat=True))
+
+    midnight = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = midnight - timedelta(days=days)
+    batch = []
+    for driver_id in driver_ids:
+        # One in ten drivers pushes past the limits
+        heavy = rng.random() < 0.1
+        for day in range(days):
+            clock = first_day + timedelta(days=day, hours=rng.uniform(4, 8))
+            spans = [
+                ('on_duty', 0.5),
+                ('driving', rng.uniform(3, 5) + (2 if heavy else 0)),
+                ('on_duty', 0.5),
+                ('off_duty', 0.5 if rng.random() < 0.9 else 0.25),
+                ('driving', rng.uniform(2, 5)),
+                ('on_duty', rng.uniform(0.25, 1)),
+                ('sleeper_berth', 0),
+            ]
+            for status, hours in spans:
+                end = clock + timedelta(hours=hours) if hours else None
+                batch.append(DutyLog(driver_id=driver_id, status=status, start_time=clock, end_time=end))
+                clock = end or clock
+            if day < days - 1:
+                batch[-1].end_time = first_day + timedelta(days=day + 1, hours=4)
+            if len(batch) >= batch_size:
+                DutyLog.objects.bulk_create(batch)
+                batch = []
+    if batch:
+        DutyLog.objects.bulk_create(batch)
+    return driver_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--drivers', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--db', help='Reuse an existing benchmark database instead of seeding a new one')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+
+    from django.utils import timezone
+    from logs import hos
+    from logs.models import DutyLog
+    from logs.services import evaluate_violations, load_intervals
+
+    # The sweep needs the 8 days plus the engine's lookback
+    days = 8 + -(-hos.LOOKBACK // (24 * hos.HOUR))
+    if not DutyLog.objects.exists():
+        seed(args.drivers, days)
+
+    as_of = timezone.now()
+    since = as_of - timedelta(days=8)
+    window_start = since - timedelta(seconds=hos.LOOKBACK)
+    intervals = load_intervals(window_start, as_of)
+
+    report = {
+        'drivers': len(set(intervals.driver_ids.tolist())),
+        'duty_logs': DutyLog.objects.count(),
+        'on_duty_intervals': len(intervals),
+        'load_intervals': measure(lambda: load_intervals(window_start, as_of), repeat=args.repeat),
+        'violations': measure(intervals.violations, repeat=args.repeat),
+        'clocks': measure(lambda: intervals.clocks(int(as_of.timestamp())), repeat=args.repeat),
+        'full_sweep': measure(lambda: evaluate_violations(since=since, as_of=as_of), repeat=args.repeat),
+        'violations_found': len(evaluate_violations(since=since, as_of=as_of)),
+        'database': str(db_path),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Lane analytics cube benchmark
+
+Seeds completed trips (500k by default) across a few hundred cities and
+times the cube rebuild -- the columnar extract, the NumPy group-by at
+state and city-pair level, and the full replace -- against the naive
+approach of iterating Trip objects and summing in Python dicts. Also
+times the incremental update a single trip completion pays.
+
+    python -m benchmarks.lane_cube --trips 500000
+"""
+import argparse
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from benchmarks.common import measure, setup_django
+
+
+STATES = [
+    'AL', 'AR', 'AZ', 'CA', 'CO', 'FL', 'GA', 'IA', 'IL', 'IN', 'KS', 'KY', 'LA', 'MD', 'MI', 'MN',
+    'MO', 'MS', 'NC', 'NE', 'NJ', 'NM', 'NV', 'NY', 'OH', 'OK', 'OR', 'PA', 'SC', 'TN', 'TX', 'UT',
+    'VA', 'WA', 'WI',
+]
+
+
+def seed(trips, cities_per_state, seed_value=42, batch_size=10000):
+    from django.utils import timezone
+    from drivers.models import Driver
+    from trips.models import Trip
+
+    rng = random.Random(seed_value)
+    driver = Driver.objects.create(username='lanes', driver_license='LANES0001')
+    cities = [(f'City {state}{i}', state) for state in STATES for i in range(cities_per_state)]
+
+    epoch = timezone.make_aware(datetime(2024, 1, 1))
+    span_minutes = 365 * 24 * 60
+    batch = []
+    for i in range(trips):
+        (origin_city, origin_state), (destination_city, destination_state) = rng.sample(cities, 2)
+        start = epoch + timedelta(minutes=rng.randrange(span_minutes))
+        planned_hours = rng.randint(2, 14)
+        actual = timedelta(hours=planned_hours * rng.uniform(0.8, 1.3))
+        batch.append(Trip(
+            driver=driver,
+            trip_number=f'L{i:09d}',
+            origin_address='1 Main St', origin_city=origin_city, origin_state=origin_state, origin_zip='00000',
+            destination_address='2 Market St', destination_city=destination_city,
+            destination_state=destination_state, destination_zip='00000',
+            planned_start_time=start,
+            planned_end_time=start + timedelta(hours=planned_hours),
+            actual_start_time=start,
+            actual_end_time=start + actual,
+            estimated_distance=Decimal(planned_hours * 55),
+            actual_distance=Decimal(rng.randint(planned_hours * 45, planned_hours * 65)),
+            status='completed',
+        ))
+        if len(batch) >= batch_size:
+            Trip.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Trip.objects.bulk_create(batch)
+
+
+def python_cube():
+    """
+    The baseline: one Trip object per row, totals in dicts
+    """
+    from trips.models import Trip
+
+    cube = defaultdict(lambda: [0, 0, Decimal('0'), 0, 0])
+    trips = Trip.objects.filter(
+        status='completed', actual_start_time__isnull=False, actual_end_time__isnull=False
+    ).iterator(chunk_size=5000)
+    for trip in trips:
+        miles = trip.actual_distance if trip.actual_distance is not None else trip.estimated_distance
+        for key in (
+            (trip.origin_state, trip.destination_state, '', ''),
+            (trip.origin_state, trip.destination_state, trip.origin_city, trip.destination_city),
+        ):
+            totals = cube[key]
+            totals[0] += 1
+            totals[1] += trip.actual_end_time <= trip.planned_end_time
+            totals[2] += miles
+            totals[3] += int((trip.planned_end_time - trip.planned_start_time).total_seconds())
+            totals[4] += int((trip.actual_end_time - trip.actual_start_time).total_seconds())
+    return cube
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trips', type=int, default=500000)
+    parser.add_argument('--cities-per-state', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db', help='Reuse an existing benchmark database instead of seeding a new one')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+
+    from django.db import transaction
+    from trips import lanes
+    from trips.models import LaneStats, Trip
+
+    if not Trip.objects.exists():
+        seed(args.trips, args.cities_per_state)
+
+    columns = lanes.extract()
+    started = time.perf_counter()
+    baseline = python_cube()
+    baseline_ms = (time.perf_counter() - started) * 1000
+
+    lanes.rebuild()
+    sample = Trip.objects.filter(status='completed').first()
+
+    def complete_one():
+        # Roll back so repeated runs do not drift the cube
+        with transaction.atomic():
+            lanes.record_trip_completed(sample)
+            transaction.set_rollback(True)
+
+    report = {
+        'trips': Trip.objects.count(),
+        'lane_rows': LaneStats.objects.count(),
+        'python_baseline_ms': round(baseline_ms, 3),
+        'extract': measure(lanes.extract, repeat=args.repeat, warmup=1),
+        'group_by': measure(lambda: lanes.build(columns), repeat=args.repeat, warmup=1),
+        'rebuild': measure(lanes.rebuild, repeat=args.repeat, warmup=1),
+        'incremental_completion': measure(complete_one, repeat=200),
+        'baseline_rows_match': len(baseline) == LaneStats.objects.count(),
+        'database': str(db_path),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
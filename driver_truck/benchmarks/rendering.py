@@ -0,0 +1,64 @@
+"""
+Response encoding benchmark
+
+Serializes trip list pages of several sizes once, then times rendering
+them with DRF's JSONRenderer versus FastJSONRenderer (and MessagePack
+when installed), parsing them back, and compressing the JSON with each
+available content coding. Sizes are reported in bytes.
+
+    python -m benchmarks.rendering --rows 5000
+"""
+import argparse
+import json
+
+from benchmarks.common import measure, setup_django
+from benchmarks.fast_serializers import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--pages', default='20,200,1000,5000', help='Comma-separated page sizes')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--db', help='Reuse an existing benchmark database instead of seeding a new one')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+
+    from io import BytesIO
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from driver_truck import renderers
+    from driver_truck.compression import available_encoders
+    from trips.models import Trip
+    from trips.serializers import TripListSerializer
+
+    if not Trip.objects.exists():
+        seed(args.rows)
+
+    codecs = {'stdlib': (JSONRenderer(), JSONParser()), 'orjson': (renderers.FastJSONRenderer(), renderers.FastJSONParser())}
+    if renderers.msgpack is not None:
+        codecs['msgpack'] = (renderers.MessagePackRenderer(), renderers.MessagePackParser())
+
+    report = {'rows': args.rows, 'database': str(db_path), 'pages': {}}
+    for page_size in [int(size) for size in args.pages.split(',')]:
+        data = TripListSerializer(Trip.objects.select_related('driver').order_by('pk')[:page_size], many=True).data
+        page = {}
+        for name, (renderer, parser_) in codecs.items():
+            content = renderer.render(data)
+            page[name] = {
+                'bytes': len(content),
+                'render': measure(lambda: renderer.render(data), repeat=args.repeat),
+                'parse': measure(lambda: parser_.parse(BytesIO(content)), repeat=args.repeat),
+            }
+        content = codecs['orjson'][0].render(data)
+        for coding, compress in available_encoders().items():
+            page[coding] = {'bytes': len(compress(content)), 'compress': measure(lambda: compress(content), repeat=args.repeat)}
+        page['render_speedup'] = round(page['stdlib']['render']['p50_ms'] / page['orjson']['render']['p50_ms'], 1)
+        page['parse_speedup'] = round(page['stdlib']['parse']['p50_ms'] / page['orjson']['parse']['p50_ms'], 1)
+        report['pages'][page_size] = page
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Trip event stream fan-out benchmark
+
+Opens thousands of concurrent ``GET /api/trips/stream/`` connections
+against the ASGI application in one process and one event loop (the way
+a single uvicorn worker would serve them), publishes trip events from a
+writer thread and reports how long each message takes to reach every
+subscriber. Lower ``--interval`` to find the rate at which the worker
+falls behind.
+
+    python -m benchmarks.sse_fanout --connections 5000 --messages 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.common import percentile, setup_django
+
+
+class StreamClient:
+    """
+    Minimal ASGI client holding one event stream open
+    """
+
+    def __init__(self, app, cookie, query_string):
+        self.app = app
+        self.cookie = cookie
+        self.query_string = query_string
+        self.disconnected = asyncio.Event()
+        self.requested = False
+        self.status = None
+        self.latencies = []
+
+    def scope(self):
+        return {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': '/api/trips/stream/',
+            'raw_path': b'/api/trips/stream/',
+            'query_string': self.query_string.encode(),
+            'root_path': '',
+            'headers': [
+                (b'host', b'localhost'),
+                (b'accept', b'text/event-stream'),
+                (b'cookie', self.cookie.encode()),
+            ],
+            'client': ('127.0.0.1', 50000),
+            'server': ('localhost', 80),
+        }
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        received = time.perf_counter()
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+            return
+        body = message.get('body', b'')
+        if body.startswith(b'id: '):
+            data = json.loads(body[body.index(b'data: ') + 6:])
+            self.latencies.append(received - data['sent_at'])
+
+    async def run(self):
+        await self.app(self.scope(), self.receive, self.send)
+
+
+def summarize(samples):
+    samples = sorted(sample * 1000 for sample in samples)
+    if not samples:
+        return {}
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'max_ms': round(samples[-1], 3),
+    }
+
+
+async def run(connections, messages, interval, trip_filter_share):
+    from django.test import Client
+    from driver_truck.asgi import application
+    from drivers.models import Driver
+    from trips.models import Trip
+    from trips.streams import broker
+
+    driver = await Driver.objects.acreate(username='stream-bench', driver_license='STREAM0001')
+    trip = await Trip.objects.acreate(
+        driver=driver, trip_number='STREAM-1',
+        origin_address='1 Main St', origin_city='Atlanta', origin_state='GA', origin_zip='30301',
+        destination_address='2 Market St', destination_city='Nashville',
+        destination_state='TN', destination_zip='37201',
+        planned_start_time='2025-01-01T08:00:00Z', planned_end_time='2025-01-01T16:00:00Z',
+        estimated_distance=250,
+    )
+    client = Client()
+    await asyncio.to_thread(client.force_login, driver)
+    cookie = f'sessionid={client.cookies["sessionid"].value}'
+
+    filtered = int(connections * trip_filter_share)
+    clients = [
+        StreamClient(application, cookie, f'trip={trip.id}' if i < filtered else '')
+        for i in range(connections)
+    ]
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(c.run()) for c in clients]
+    # Wait for every response to start streaming, not just subscribe
+    while broker.subscriber_count < connections or any(c.status is None for c in clients):
+        if any(task.done() for task in tasks):
+            raise RuntimeError(f'stream rejected with status {[c.status for c in clients if c.status != 200][0]}')
+        await asyncio.sleep(0.05)
+    connect_seconds = time.perf_counter() - started
+
+    def publish():
+        for n in range(messages):
+            payload = {'trip': trip.id, 'event_type': 'gps', 'sequence': n, 'sent_at': time.perf_counter()}
+            broker.publish('trip_event', payload, trip_id=trip.id)
+            time.sleep(interval)
+
+    fanout_started = time.perf_counter()
+    await asyncio.to_thread(publish)
+    expected = connections * messages
+    while sum(len(c.latencies) for c in clients) < expected:
+        if time.perf_counter() - fanout_started > 60:
+            break
+        await asyncio.sleep(0.01)
+    fanout_seconds = time.perf_counter() - fanout_started
+
+    for c in clients:
+        c.disconnected.set()
+    await asyncio.wait(tasks, timeout=30)
+
+    delivered = [latency for c in clients for latency in c.latencies]
+    return {
+        'connections': connections,
+        'trip_filtered_connections': filtered,
+        'messages': messages,
+        'statuses': sorted({c.status for c in clients}),
+        'connect_seconds': round(connect_seconds, 3),
+        'deliveries': len(delivered),
+        'expected_deliveries': expected,
+        'fanout_seconds': round(fanout_seconds, 3),
+        'delivery_latency': summarize(delivered),
+        'subscribers_after_disconnect': broker.subscriber_count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=5000)
+    parser.add_argument('--messages', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between published messages')
+    parser.add_argument('--trip-filter-share', type=float, default=0.5,
+                        help='Share of connections subscribing with ?trip=')
+    parser.add_argument('--db', help='Use this SQLite file instead of a scratch database')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    from trips.streams import broker
+    # Let the per-subscriber queues absorb a full burst
+    broker.queue_size = max(broker.queue_size, args.messages + 1)
+
+    report = asyncio.run(run(args.connections, args.messages, args.interval, args.trip_filter_share))
+    report['database'] = str(db_path)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
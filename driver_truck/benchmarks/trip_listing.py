@@ -0,0 +1,154 @@
+"""
+Trip listing benchmark: composite indexes and sargable date ranges
+
+Seeds a trips table (1M rows by default) and times the queries behind
+``GET /api/trips/trips/`` -- COUNT(*) plus the first page -- for the
+common filter combinations, once with the legacy ``__date`` lookups and
+no composite indexes ("before") and once with the half-open datetime
+ranges and ``Meta.indexes`` ("after").
+
+    python -m benchmarks.trip_listing --trips 1000000
+"""
+import argparse
+import json
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from benchmarks.common import measure, setup_django
+
+
+STATUSES = ['planned', 'in_progress', 'completed', 'cancelled']
+PAGE_SIZE = 20
+
+
+def seed(trips, drivers, seed_value=42, batch_size=10000):
+    from django.utils import timezone
+    from drivers.models import Driver
+    from trips.models import Trip
+
+    rng = random.Random(seed_value)
+    Driver.objects.bulk_create(
+        [
+            Driver(username=f'bench{i}', driver_license=f'BENCH{i:08d}', first_name='Bench', last_name=str(i))
+            for i in range(drivers)
+        ],
+        batch_size=batch_size,
+    )
+    driver_ids = list(Driver.objects.values_list('id', flat=True))
+
+    epoch = timezone.make_aware(datetime(2024, 1, 1))
+    span_minutes = 2 * 365 * 24 * 60
+    batch = []
+    for i in range(trips):
+        start = epoch + timedelta(minutes=rng.randrange(span_minutes))
+        batch.append(Trip(
+            driver_id=rng.choice(driver_ids),
+            trip_number=f'B{i:09d}',
+            origin_address='1 Main St', origin_city='Atlanta', origin_state='GA', origin_zip='30301',
+            destination_address='2 Market St', destination_city='Nashville',
+            destination_state='TN', destination_zip='37201',
+            planned_start_time=start,
+            planned_end_time=start + timedelta(hours=rng.randint(2, 14)),
+            estimated_distance=Decimal(rng.randint(20, 900)),
+            status=rng.choice(STATUSES),
+        ))
+        if len(batch) >= batch_size:
+            Trip.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Trip.objects.bulk_create(batch)
+    return driver_ids
+
+
+def legacy_filter(queryset, start_day, end_day):
+    return queryset.filter(
+        planned_start_time__date__gte=start_day,
+        planned_start_time__date__lte=end_day,
+    )
+
+
+def sargable_filter(queryset, start_day, end_day):
+    from trips.views import local_day_start
+    return queryset.filter(
+        planned_start_time__gte=local_day_start(start_day),
+        planned_start_time__lt=local_day_start(end_day + timedelta(days=1)),
+    )
+
+
+def scenarios(driver_id):
+    from trips.models import Trip
+
+    base = Trip.objects.select_related('driver').order_by('-planned_start_time')
+    window = (date(2025, 3, 1), date(2025, 3, 31))
+    return {
+        'driver_only': lambda _: base.filter(driver_id=driver_id),
+        'driver_and_month': lambda f: f(base.filter(driver_id=driver_id), *window),
+        'status_and_month': lambda f: f(base.filter(status='in_progress'), *window),
+    }
+
+
+def run_page(queryset):
+    queryset.count()
+    list(queryset[:PAGE_SIZE])
+
+
+def query_plan(queryset):
+    from django.db import connection
+
+    sql, params = queryset[:PAGE_SIZE].query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def run_variant(label, filter_func, driver_id, repeat):
+    results = {}
+    for name, build in scenarios(driver_id).items():
+        queryset = build(filter_func)
+        results[name] = {
+            **measure(lambda: run_page(queryset), repeat=repeat),
+            'plan': query_plan(queryset),
+        }
+    return {label: results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trips', type=int, default=1_000_000)
+    parser.add_argument('--drivers', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--db', help='Reuse an existing benchmark database instead of seeding a new one')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+
+    from django.db import connection
+    from trips.models import Trip
+
+    if not Trip.objects.exists():
+        seed(args.trips, args.drivers)
+    driver_id = Trip.objects.values_list('driver_id', flat=True).first()
+    indexes = Trip._meta.indexes
+
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(Trip, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    report = run_variant('before', legacy_filter, driver_id, args.repeat)
+
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.add_index(Trip, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    report.update(run_variant('after', sargable_filter, driver_id, args.repeat))
+
+    report['trips'] = Trip.objects.count()
+    report['database'] = str(db_path)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+SQLite write-contention benchmark
+
+Starts ``--writers`` processes posting batches to
+``/api/trips/events/bulk/`` and ``--readers`` processes listing trips,
+all against the same SQLite file, the way several WSGI workers would.
+The run is repeated for each connection profile in
+driver_truck/database.py, on identical copies of one seeded database.
+For each profile it reports write throughput, "database is locked"
+failures and request latency.
+
+    python -m benchmarks.write_contention --writers 8 --readers 4 --seconds 20
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.common import PROJECT_DIR, summarize
+
+
+def configure(db_path, profile):
+    """
+    Set up Django in a worker process against ``db_path`` with ``profile``
+    """
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'driver_truck.settings')
+
+    import django
+    from django.conf import settings
+    from driver_truck.database import sqlite_database
+
+    settings.DATABASES = {'default': sqlite_database(db_path, profile)}
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['*']
+    # Every read has to reach the database
+    settings.RESPONSE_CACHE_ENABLED = False
+    django.setup()
+
+
+def worker(role, index, db_path, profile, seconds, batch, barrier, results):
+    configure(db_path, profile)
+    from django.db import OperationalError, close_old_connections
+    from rest_framework.test import APIClient
+    from drivers.models import Driver
+    from trips.models import Trip
+
+    driver = Driver.objects.order_by('pk')[index % Driver.objects.count()]
+    trip_ids = list(Trip.objects.filter(driver=driver).values_list('id', flat=True)[:10])
+    close_old_connections()
+    client = APIClient()
+    client.force_authenticate(driver)
+
+    def request(n):
+        if role == 'reader':
+            return client.get('/api/trips/trips/', {'page': n % 5 + 1})
+        events = [{'trip': trip_ids[n % len(trip_ids)], 'event_type': 'other', 'description': f'w{index}-{n}-{i}'}
+                  for i in range(batch)]
+        return client.post('/api/trips/events/bulk/', events, format='json')
+
+    latencies, failures, n = [], 0, 0
+    barrier.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        # What a WSGI server does around each request (the test client skips it)
+        close_old_connections()
+        started = time.perf_counter()
+        try:
+            ok = request(n).status_code < 400
+        except OperationalError:
+            ok = False
+        latencies.append((time.perf_counter() - started) * 1000)
+        failures += not ok
+        n += 1
+        close_old_connections()
+    results.put((role, len(latencies) - failures, failures, latencies))
+
+
+def seed(db_path, drivers):
+    configure(db_path, 'default')
+    from django.core.management import call_command
+    from django.db import connections
+    from benchmarks.fleet import seed_fleet
+
+    call_command('migrate', verbosity=0, interactive=False)
+    counts = seed_fleet(drivers=drivers, trips_per_driver=10, events_per_trip=2, duty_days=1)
+    connections.close_all()
+    return counts
+
+
+def run_profile(template, profile, writers, readers, seconds, batch):
+    db_path = template.replace('template', profile)
+    shutil.copyfile(template, db_path)
+    if profile == 'default':
+        # A profile's journal mode sticks to the file; start from the stock one
+        with sqlite3.connect(db_path) as connection:
+            connection.execute('PRAGMA journal_mode = DELETE')
+
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(writers + readers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(role, index, db_path, profile, seconds, batch, barrier, results))
+        for role, count in (('writer', writers), ('reader', readers)) for index in range(count)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    report = {}
+    for role in ('writer', 'reader'):
+        rows = [row for row in collected if row[0] == role]
+        if not rows:
+            continue
+        ok = sum(row[1] for row in rows)
+        report[f'{role}s'] = {
+            'requests': ok,
+            'failed': sum(row[2] for row in rows),
+            'requests_per_second': round(ok / seconds, 1),
+            'latency': summarize([latency for row in rows for latency in row[3]]),
+        }
+        if role == 'writer':
+            report['writers']['events_per_second'] = round(ok * batch / seconds, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--batch', type=int, default=10, help='Events per bulk request')
+    parser.add_argument('--drivers', type=int, default=50, help='Drivers in the seeded database')
+    parser.add_argument('--profiles', default='default,production', help='Comma-separated profiles to compare')
+    args = parser.parse_args()
+
+    template = os.path.join(tempfile.mkdtemp(prefix='driver_truck_bench_'), 'template.sqlite3')
+    # Seed in a child so this process never holds a connection to the files
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        pool.apply(seed, (template, args.drivers))
+
+    report = {'writers': args.writers, 'readers': args.readers, 'seconds': args.seconds, 'batch': args.batch}
+    for profile in args.profiles.split(','):
+        report[profile] = run_profile(template, profile, args.writers, args.readers, args.seconds, args.batch)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
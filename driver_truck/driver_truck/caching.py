@@ -0,0 +1,169 @@
+"""
+Response cache for read endpoints
+
+Serialized ``list``/``retrieve`` payloads are stored in the cache alias
+named by ``settings.RESPONSE_CACHE_ALIAS``. Every cache key embeds the
+current version of the tags the payload depends on (``trip:42``,
+``trips``, ``drivers``...). Writes bump those versions from
+post_save/post_delete handlers, which orphans the stale entries instead of
+hunting them down.
+"""
+import hashlib
+import itertools
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .replicas import reading_from_replica, sticky_seconds
+
+
+VERSION_PREFIX = 'version:'
+RESPONSE_PREFIX = 'response:'
+
+_counter = itertools.count()
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+
+
+def get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def cache_enabled():
+    """
+    ``RESPONSE_CACHE_ENABLED``, or when it is None, whether invalidations reach every worker
+    """
+    enabled = getattr(settings, 'RESPONSE_CACHE_ENABLED', None)
+    return versions_shared() if enabled is None else enabled
+
+
+def versions_shared():
+    """
+    Whether version tokens are seen by every worker process
+    """
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+
+def record(stat, amount=1):
+    with _stats_lock:
+        _stats[stat] += amount
+
+
+def cache_stats():
+    """
+    Hit/miss counters for this process
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def new_version():
+    """
+    Time-ordered version token (nanoseconds, nudged to stay unique)
+    """
+    return time.time_ns() + next(_counter) % 1000
+
+
+def get_versions(tags):
+    """
+    Current version of each tag, initializing unknown tags
+    """
+    cache = get_cache()
+    keys = [VERSION_PREFIX + tag for tag in tags]
+    found = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def bump(*tags):
+    if not tags:
+        return
+    get_cache().set_many({VERSION_PREFIX + tag: new_version() for tag in tags}, timeout=None)
+    record('invalidations', len(tags))
+
+
+def invalidate(*tags):
+    """
+    Invalidate cached responses depending on ``tags``
+
+    Versions are bumped immediately, so the writing request sees its own
+    change, and again after commit, so a reader that raced the transaction
+    cannot leave a stale entry under the new version.
+    """
+    bump(*tags)
+    transaction.on_commit(lambda: bump(*tags))
+
+
+class CachedReadMixin:
+    """
+    ViewSet mixin caching serialized list/retrieve payloads
+
+    ``cache_tag`` names the per-object tag (``<cache_tag>:<pk>``) and the
+    collection tag (``<cache_tag>s``). ``cache_dependencies`` lists
+    collection tags of related models rendered in the payload.
+    """
+    cache_tag = None
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(self.get_cache_tags(), super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(self.get_cache_tags(), super().retrieve, request, *args, **kwargs)
+
+    def get_cache_tags(self):
+        tags = [f'{self.cache_tag}s', *self.cache_dependencies]
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if lookup is not None:
+            tags[0] = f'{self.cache_tag}:{lookup}'
+        return tags
+
+    def get_cache_key(self, tags):
+        versions = get_versions(tags)
+        raw = '|'.join([
+            self.request.get_host(),
+            self.request.get_full_path(),
+            self.action,
+            *(f'{tag}={version}' for tag, version in zip(tags, versions)),
+        ])
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return f'{RESPONSE_PREFIX}{self.cache_tag}:{self.action}:{digest}'
+
+    def cached_response(self, tags, handler, request, *args, **kwargs):
+        if not cache_enabled():
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_cache_key(tags)
+        data = cache.get(key)
+        if data is not None:
+            record('hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record('misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+            if reading_from_replica():
+                # A lagging replica may have answered with rows older than the
+                # versions in the key; keep such entries no longer than the lag
+                timeout = min(timeout, sticky_seconds())
+            cache.set(key, response.data, timeout=timeout)
+            record('stores')
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,109 @@
+"""
+Negotiated response compression
+
+Responses of at least ``RESPONSE_COMPRESSION_MIN_SIZE`` bytes are
+compressed with brotli (when the optional ``brotli`` package is
+installed) or gzip, whichever the client's Accept-Encoding weighs
+higher; brotli wins ties. Streaming responses (exports, the SSE event
+stream) are left alone so they keep flushing as they are produced. A
+viewset opts out with ``compress_responses = False``.
+"""
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def gzip_compress(content):
+    # Random padding in the gzip header, as GZipMiddleware does against BREACH
+    return compress_string(content, max_random_bytes=100)
+
+
+def brotli_compress(content):
+    return brotli.compress(content, quality=getattr(settings, 'RESPONSE_COMPRESSION_BROTLI_QUALITY', 5))
+
+
+def available_encoders():
+    """
+    Content codings this process can produce, in order of preference
+    """
+    encoders = {'br': brotli_compress} if brotli is not None else {}
+    encoders['gzip'] = gzip_compress
+    return encoders
+
+
+def accepted_encodings(header):
+    """
+    Parse Accept-Encoding into ``{coding: qvalue}``
+    """
+    weights = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def negotiate_encoding(header):
+    """
+    Best coding both sides support, or None for identity
+    """
+    weights = accepted_encodings(header)
+    best, best_weight = None, 0.0
+    for coding in available_encoders():
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compression_enabled(response):
+    if not getattr(settings, 'RESPONSE_COMPRESSION_ENABLED', True):
+        return False
+    view = (getattr(response, 'renderer_context', None) or {}).get('view')
+    return getattr(view, 'compress_responses', True)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    gzip/brotli for responses above the size threshold
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024):
+            return response
+        if not compression_enabled(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if coding is None:
+            return response
+        compressed = available_encoders()[coding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = coding
+        # The encoded body is no longer byte-identical to the one the ETag was computed for
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
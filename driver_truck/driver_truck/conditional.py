@@ -0,0 +1,112 @@
+"""
+Conditional GET (ETag / Last-Modified / 304) for list and detail endpoints
+
+Validators are computed before anything is serialized. A single aggregate
+over the filtered queryset gives the row count, the highest primary key
+and, for models with an ``updated_at`` column, the latest modification.
+Models without ``updated_at`` (stops, events, drivers, vehicles) use
+the latest entry of a database change log (``change_log``, the sync
+feed's sequence) as their change marker, read by the same query.
+
+Version tokens from driver_truck.caching are added only when the cache
+is shared between worker processes. A per-process cache would miss
+writes handled by other workers and keep answering 304 with stale data.
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .caching import get_versions, versions_shared
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin answering If-None-Match / If-Modified-Since with 304
+
+    ``conditional_modified_field`` names a timestamp column that moves on
+    every update, or None. ``change_log`` is a model with an ascending
+    ``id`` and a ``changed_at`` column that receives an entry on every
+    write the payload depends on, or None. ``version_tags`` lists version
+    tags for viewsets that do not define get_cache_tags().
+    """
+    conditional_modified_field = None
+    change_log = None
+    version_tags = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_version_tags(self):
+        if hasattr(self, 'get_cache_tags'):
+            return self.get_cache_tags()
+        return list(self.version_tags)
+
+    def get_validators(self):
+        """
+        Return (etag, last_modified timestamp), or None when the object is
+        missing or no change marker is available
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        tags = self.get_version_tags() if versions_shared() else []
+        if not tags and not (self.conditional_modified_field or self.change_log):
+            # Nothing this process can see marks a change
+            return None
+
+        aggregates = {'rows': Count('pk'), 'last_pk': Max('pk')}
+        if self.conditional_modified_field:
+            aggregates['modified'] = Max(self.conditional_modified_field)
+        if self.change_log:
+            latest = self.change_log.objects.order_by('-id')[:1]
+            aggregates['sequence'] = Max(Subquery(latest.values('id')))
+            aggregates['changed'] = Max(Subquery(latest.values('changed_at')))
+        try:
+            if lookup is not None:
+                queryset = queryset.filter(**{self.lookup_field: lookup})
+            state = queryset.aggregate(**aggregates)
+        except (ValueError, TypeError, ValidationError):
+            # A malformed lookup; the handler answers with its usual 404
+            return None
+        if lookup is not None and not state['rows']:
+            return None
+
+        versions = get_versions(tags)
+        raw = '|'.join([
+            self.request.get_full_path(),
+            str(state['rows']),
+            str(state['last_pk']),
+            state['modified'].isoformat() if state.get('modified') else '',
+            str(state.get('sequence') or ''),
+            *(f'{tag}={version}' for tag, version in zip(tags, versions)),
+        ])
+        etag = 'W/"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+        # Version tokens are nanosecond timestamps
+        timestamps = [version // 1_000_000_000 for version in versions]
+        for field in ('modified', 'changed'):
+            if state.get(field):
+                timestamps.append(int(state[field].timestamp()))
+        return etag, max(timestamps) if timestamps else None
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
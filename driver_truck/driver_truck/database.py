@@ -0,0 +1,57 @@
+"""
+SQLite connection profile for concurrent API writes
+
+Django's defaults (rollback journal, ``BEGIN`` deferred, a new
+connection per request) make parallel writers fail with "database is
+locked": a deferred transaction that reads first and then writes cannot
+wait for the lock, because SQLite returns SQLITE_BUSY right away to
+avoid a deadlock. The production profile:
+
+- switches to WAL so readers never block the writer or each other;
+- starts transactions with ``BEGIN IMMEDIATE``, which takes the write
+  lock up front so ``busy_timeout`` actually queues writers;
+- relaxes ``synchronous`` to NORMAL (still safe under WAL, only the last
+  commits can be lost on power failure);
+- memory-maps the file and enlarges the page cache;
+- keeps connections open between requests so the pragmas run once per
+  connection instead of once per request.
+
+``benchmarks/write_contention.py`` compares it with the defaults.
+"""
+
+# Values are in SQLite's units: milliseconds, bytes, and KiB when negative
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 10000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def init_command(pragmas):
+    return '; '.join(f'PRAGMA {name} = {value}' for name, value in pragmas.items())
+
+
+def sqlite_database(name, profile='production', conn_max_age=600, **pragmas):
+    """
+    ``DATABASES`` entry for the SQLite file ``name``
+
+    ``profile='default'`` gives Django's stock settings, for comparison.
+    Keyword arguments override single pragmas of the production profile.
+    """
+    database = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}
+    if profile == 'default':
+        return database
+    if profile != 'production':
+        raise ValueError(f'Unknown SQLite profile {profile!r}')
+    return {
+        **database,
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': init_command({**SQLITE_PRAGMAS, **pragmas}),
+        },
+    }
@@ -0,0 +1,27 @@
+"""
+Database expressions shared by the apps
+"""
+from django.db.models import BigIntegerField, Func
+
+
+class EpochSeconds(Func):
+    """
+    Unix time of a datetime column, computed by the database
+
+    Skips building a datetime object per value when loading large extracts.
+    """
+    output_field = BigIntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # unixepoch() (SQLite 3.38+) skips strftime's formatting round trip
+        if connection.Database.sqlite_version_info >= (3, 38, 0):
+            return self.as_sql(compiler, connection, function='unixepoch', **extra_context)
+        return self.as_sql(compiler, connection, template="CAST(strftime('%%%%s', %(expressions)s) AS INTEGER)",
+                           **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='EXTRACT(EPOCH FROM %(expressions)s)::bigint',
+                           **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function='UNIX_TIMESTAMP', **extra_context)
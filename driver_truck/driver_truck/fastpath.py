@@ -0,0 +1,208 @@
+"""
+Compiled read path for list endpoints
+
+A ``ReadPlan`` is compiled once from a ModelSerializer's fields: the
+columns to fetch with ``.values_list()`` and, per output field, a tuple
+index and a converter that reproduce what DRF's ``to_representation``
+would return. Serializing a page is then one dict comprehension per row
+instead of model instances, field objects and per-value coercion.
+
+Plain model columns are compiled from their DRF field type. Computed
+fields need the serializer to declare ``fast_fields`` (a function of
+the values of the columns listed in ``field_sources``); a serializer
+with any other kind of field, e.g. a nested serializer, is not compiled
+and the view falls back to the regular serializer.
+"""
+from operator import itemgetter
+
+from django.utils import timezone
+from django.utils.duration import duration_string
+from rest_framework import fields as drf_fields, relations
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .fieldsets import is_column
+from .profiling import serializer_timer
+
+
+ISO_8601 = 'iso-8601'
+
+_plans = {}
+
+
+def display_name(first_name, last_name, username):
+    """
+    ``get_full_name() or username`` from the raw columns
+    """
+    return f'{first_name} {last_name}'.strip() or username
+
+
+def choice_display(model, field_name):
+    """
+    ``get_<field>_display`` as a lookup table
+    """
+    labels = {value: str(label) for value, label in model._meta.get_field(field_name).flatchoices}
+    return lambda value: labels.get(value, value)
+
+
+def datetime_converter(field):
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT) != ISO_8601:
+        return None
+    zone = getattr(field, 'timezone', None) or timezone.get_current_timezone()
+
+    def convert(value):
+        value = value.astimezone(zone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def decimal_converter(field):
+    coerce = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce or field.localize or field.normalize_output or field.decimal_places is None:
+        return None
+    exponent = -field.decimal_places
+
+    def convert(value):
+        # Database values already carry the field's scale; anything else
+        # goes through DRF's quantize
+        if value.as_tuple().exponent == exponent:
+            return f'{value:f}'
+        return field.to_representation(value)
+    return convert
+
+
+def date_converter(field):
+    if getattr(field, 'format', api_settings.DATE_FORMAT) != ISO_8601:
+        return None
+    return lambda value: value.isoformat()
+
+
+def choice_converter(field):
+    choices = field.choice_strings_to_values
+    return lambda value: choices.get(str(value), value)
+
+
+# Fields whose representation of a database value is the value itself
+IDENTITY_FIELDS = (
+    drf_fields.CharField, drf_fields.IntegerField, drf_fields.BooleanField,
+    drf_fields.ReadOnlyField, drf_fields.JSONField, relations.PrimaryKeyRelatedField,
+)
+
+CONVERTERS = (
+    (drf_fields.DateTimeField, datetime_converter),
+    (drf_fields.DecimalField, decimal_converter),
+    (drf_fields.DateField, date_converter),
+    (drf_fields.DurationField, lambda field: duration_string),
+    (drf_fields.FloatField, lambda field: float),
+    (drf_fields.ChoiceField, choice_converter),
+)
+
+
+def converter_for(field):
+    """
+    Fast equivalent of ``field.to_representation`` for non-null values
+    """
+    for field_class, factory in CONVERTERS:
+        if isinstance(field, field_class):
+            return factory(field) or field.to_representation
+    if isinstance(field, IDENTITY_FIELDS) and not getattr(field, 'pk_field', None):
+        return None
+    return field.to_representation
+
+
+def nullable(getter, convert):
+    if convert is None:
+        return getter
+
+    def get(row):
+        value = getter(row)
+        return None if value is None else convert(value)
+    return get
+
+
+def computed(function, getters):
+    return lambda row: function(*[getter(row) for getter in getters])
+
+
+class ReadPlan:
+    """
+    Columns to fetch and per-field getters for one serializer configuration
+    """
+
+    def __init__(self, columns, getters):
+        self.columns = columns
+        self.getters = getters
+
+    def serialize(self, rows):
+        getters = self.getters
+        with serializer_timer():
+            return [{name: get(row) for name, get in getters} for row in rows]
+
+
+def compile_plan(serializer):
+    """
+    ReadPlan for a serializer instance's current fields, or None
+
+    Plans are cached per serializer class, field set and timezone.
+    """
+    key = (type(serializer), tuple(serializer.fields), timezone.get_current_timezone_name())
+    if key not in _plans:
+        _plans[key] = build_plan(serializer)
+    return _plans[key]
+
+
+def build_plan(serializer):
+    model = serializer.Meta.model
+    sources = getattr(serializer, 'field_sources', {})
+    functions = getattr(serializer, 'fast_fields', {})
+    columns = {}
+    getters = []
+
+    def column(path):
+        return itemgetter(columns.setdefault(path, len(columns)))
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in functions:
+            getters.append((name, computed(functions[name], [column(path) for path in sources.get(name, ())])))
+            continue
+        path = field.source.replace('.', '__')
+        if field.source == '*' or not is_column(model, path):
+            return None
+        if '__' not in path and model._meta.get_field(path).is_relation:
+            # Fetch foreign keys by attname: a values() alias named after
+            # the relation would change what order_by('<relation>') means
+            path = model._meta.get_field(path).attname
+        getters.append((name, nullable(column(path), converter_for(field))))
+    return ReadPlan(list(columns), getters)
+
+
+class FastListMixin:
+    """
+    ViewSet mixin serving ``list`` through a compiled ReadPlan
+
+    Rows are fetched as ``.values_list()`` tuples and never become model
+    instances. Views whose list serializer cannot be compiled use the
+    normal path.
+    """
+    fast_list = True
+
+    def list(self, request, *args, **kwargs):
+        plan = compile_plan(self.get_serializer()) if self.fast_list else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        columns = plan.columns + [name for name in self.get_row_keys() if name not in plan.columns]
+        queryset = self.filter_queryset(self.get_queryset()).values_list(*columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize(queryset))
+
+    def get_row_keys(self):
+        """
+        Extra columns the paginator reads back from rows (keyset ordering)
+        """
+        keyset = getattr(self.paginator, 'keyset_class', None)
+        return [name.lstrip('-') for name in getattr(keyset, 'ordering', ())]
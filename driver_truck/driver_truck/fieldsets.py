@@ -0,0 +1,162 @@
+"""
+Sparse fieldsets: ``?fields=`` and ``?omit=`` on read endpoints
+
+The serializer drops the fields the client did not ask for, so their
+SerializerMethodFields never run, and the viewset narrows the queryset
+with .only() to the columns the remaining fields read.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def parse_field_list(value):
+    return [name.strip() for name in value.split(',') if name.strip()] if value else []
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin keeping ``context['fields']`` minus ``context['omit']``
+
+    Only the top-level serializer is trimmed; nested serializers see the
+    same context but keep all their fields. ``field_sources`` maps fields
+    that are not plain model columns (properties, method fields, nested
+    collections) to the ORM paths they read.
+    """
+    field_sources = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        if parent is not None:
+            return fields
+
+        wanted = self.context.get('fields')
+        if wanted:
+            fields = {name: field for name, field in fields.items() if name in wanted}
+        for name in self.context.get('omit') or ():
+            fields.pop(name, None)
+        return fields
+
+
+def is_column(model, path):
+    """
+    Whether ``path`` (``a__b``) names a concrete column reachable through forward relations
+    """
+    *relations, name = path.split('__')
+    try:
+        for relation in relations:
+            field = model._meta.get_field(relation)
+            if not (field.many_to_one or field.one_to_one) or not field.concrete:
+                return False
+            model = field.related_model
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return field.concrete and not field.many_to_many
+
+
+def select_related_paths(related, prefix=''):
+    """
+    Flatten Query.select_related (nested dicts) into ``a``, ``a__b`` paths
+    """
+    paths = []
+    for name, nested in related.items():
+        path = f'{prefix}{name}'
+        paths.append(path)
+        paths.extend(select_related_paths(nested, f'{path}__'))
+    return paths
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin for ``?fields=a,b`` and ``?omit=c`` on GET requests
+
+    Unknown field names are a 400. When every kept field's columns are
+    known, the queryset is limited to them with .only() and joins that
+    only fed dropped fields are removed from select_related().
+    """
+
+    def get_sparse_fields(self):
+        if self.request.method not in ('GET', 'HEAD'):
+            return None, None
+        params = self.request.query_params
+        return parse_field_list(params.get('fields')) or None, parse_field_list(params.get('omit')) or None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['omit'] = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields, omit = self.get_sparse_fields()
+        if not (fields or omit):
+            return queryset
+
+        context = self.get_serializer_context()
+        serializer_class = self.get_serializer_class()
+        available = serializer_class(context={**context, 'fields': None, 'omit': None}).fields
+        unknown = [name for name in (fields or []) + (omit or []) if name not in available]
+        if unknown:
+            raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}"})
+
+        columns = self.get_sparse_columns(serializer_class(context=context))
+        if columns is None:
+            return queryset
+        return self.narrow_queryset(queryset, columns | self.get_ordering_columns(queryset))
+
+    def get_sparse_columns(self, serializer):
+        """
+        ORM paths read by the serializer's kept fields, or None if any are unknown
+        """
+        model = serializer.Meta.model
+        sources = getattr(serializer, 'field_sources', {})
+        columns = {model._meta.pk.name}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in sources:
+                columns.update(sources[name])
+                continue
+            path = field.source.replace('.', '__')
+            if field.source == '*' or not is_column(model, path):
+                return None
+            columns.add(path)
+        return columns
+
+    def get_ordering_columns(self, queryset):
+        """
+        Ordering keys, which keyset pagination reads back from the last row
+        """
+        names = [name for name in queryset.query.order_by if isinstance(name, str)]
+        names += getattr(getattr(self.paginator, 'keyset_class', None), 'ordering', ())
+        columns = set()
+        for name in names:
+            name = name.lstrip('-')
+            if is_column(queryset.model, name):
+                # Normalise attnames such as trip_id to the field name
+                columns.add(name if '__' in name else queryset.model._meta.get_field(name).name)
+        return columns
+
+    def narrow_queryset(self, queryset, columns):
+        """
+        Apply .only(columns), traversing only relations that are select_related
+        """
+        related = queryset.query.select_related
+        selected = set(select_related_paths(related)) if isinstance(related, dict) else set()
+
+        only = set()
+        for column in columns:
+            parts = column.split('__')
+            # Beyond the joined relations, fall back to the foreign key column
+            depth = next((i for i in range(len(parts) - 1, 0, -1) if '__'.join(parts[:i]) in selected), 0)
+            only.add('__'.join(parts[:depth + 1]))
+            only.update('__'.join(parts[:i]) for i in range(1, depth + 1))
+
+        keep = [path for path in selected if path in only]
+        if isinstance(related, dict) and len(keep) < len(selected):
+            queryset = queryset.select_related(None)
+            if keep:
+                queryset = queryset.select_related(*keep)
+        return queryset.only(*only)
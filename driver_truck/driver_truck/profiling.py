@@ -0,0 +1,236 @@
+"""
+Per-request performance instrumentation
+
+With ``REQUEST_PROFILING_ENABLED`` on, ProfilingMiddleware records the
+SQL query count and time, the serializer time (minus the SQL serializers
+trigger themselves), the render time and the response size of every
+request. Each request gets a ``Server-Timing`` header (shown by browser
+devtools) and one JSON line on the ``driver_truck.profiling`` logger.
+The numbers also feed a rolling per-endpoint summary served at
+``/api/profiling/stats/``. A query shape repeated
+``REQUEST_PROFILING_DUPLICATE_THRESHOLD`` times in one request is logged
+as a likely N+1 pattern.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_profile', default=None)
+_summary_lock = threading.Lock()
+_summary = {}
+
+# Placeholder lists of any length (IN clauses, multi-row VALUES) count as one shape
+PLACEHOLDERS = re.compile(r'%s(?:\s*,\s*%s)+')
+
+
+def profiling_enabled():
+    return getattr(settings, 'REQUEST_PROFILING_ENABLED', False)
+
+
+def query_shape(sql):
+    return PLACEHOLDERS.sub('%s...', sql)
+
+
+class RequestProfile:
+    """
+    Timings collected while one request is handled
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+        self.serializing = False
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed as a database execute_wrapper
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries += 1
+            self.shapes[query_shape(sql)] += 1
+
+    def duplicates(self, threshold):
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+@contextmanager
+def serializer_timer():
+    """
+    Add the enclosed block to the current request's serializer time
+
+    Nested blocks are counted once, and SQL run inside the block stays
+    under SQL time.
+    """
+    profile = _current.get()
+    if profile is None or profile.serializing:
+        yield
+        return
+    profile.serializing = True
+    started, sql = time.perf_counter(), profile.sql
+    try:
+        yield
+    finally:
+        profile.serializing = False
+        profile.serialize += time.perf_counter() - started - (profile.sql - sql)
+
+
+def install_serializer_timer():
+    """
+    Time every DRF ``serializer.data`` access
+
+    Views build their payloads with ``serializer.data`` in many places,
+    so the property is wrapped once instead of every call site.
+    """
+    if getattr(BaseSerializer, 'profiled', False):
+        return
+    data = BaseSerializer.data.fget
+
+    def timed_data(self):
+        with serializer_timer():
+            return data(self)
+
+    BaseSerializer.data = property(timed_data)
+    BaseSerializer.profiled = True
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    name = (match.view_name or match.route) if match else 'unresolved'
+    return f'{request.method} {name}'
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def record_sample(endpoint, sample):
+    window = getattr(settings, 'REQUEST_PROFILING_WINDOW', 200)
+    with _summary_lock:
+        entry = _summary.get(endpoint)
+        if entry is None or entry['samples'].maxlen != window:
+            entry = _summary[endpoint] = {'requests': 0, 'samples': deque(maxlen=window)}
+        entry['requests'] += 1
+        entry['samples'].append(sample)
+
+
+def profiling_stats():
+    """
+    Rolling per-endpoint summary for this process
+    """
+    with _summary_lock:
+        entries = {endpoint: (entry['requests'], list(entry['samples'])) for endpoint, entry in _summary.items()}
+    stats = {}
+    for endpoint, (requests, samples) in sorted(entries.items()):
+        totals = [sample['total_ms'] for sample in samples]
+        stats[endpoint] = {
+            'requests': requests,
+            'window': len(samples),
+            'total_ms': {'p50': percentile(totals, 0.5), 'p95': percentile(totals, 0.95), 'max': max(totals)},
+            **{
+                f'avg_{name}': round(sum(sample[name] for sample in samples) / len(samples), 3)
+                for name in ('sql_queries', 'sql_ms', 'serialize_ms', 'render_ms', 'bytes')
+            },
+            'n_plus_one': sum(1 for sample in samples if sample['duplicates']),
+        }
+    return stats
+
+
+def reset_profiling_stats():
+    with _summary_lock:
+        _summary.clear()
+
+
+def server_timing(sample):
+    metrics = [
+        f"sql;dur={sample['sql_ms']};desc=\"{sample['sql_queries']} queries\"",
+        f"serialize;dur={sample['serialize_ms']}",
+        f"render;dur={sample['render_ms']}",
+        f"total;dur={sample['total_ms']}",
+    ]
+    if sample['bytes'] is not None:
+        metrics.append(f"size;desc=\"{sample['bytes']} bytes\"")
+    if sample['duplicates']:
+        metrics.append(f"nplus1;desc=\"{len(sample['duplicates'])} repeated query shapes\"")
+    return ', '.join(metrics)
+
+
+class ProfilingMiddleware:
+    """
+    Server-Timing headers, log lines and per-endpoint summaries
+
+    Place it before CompressionMiddleware so the recorded size is what
+    goes over the wire.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling_enabled():
+            return self.get_response(request)
+
+        # Patched on the first profiled request, so DRF is untouched while profiling is off
+        install_serializer_timer()
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, profile)
+        return response
+
+    def process_template_response(self, request, response):
+        profile = _current.get()
+        if profile is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                profile.render += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def report(self, request, response, profile):
+        threshold = getattr(settings, 'REQUEST_PROFILING_DUPLICATE_THRESHOLD', 5)
+        endpoint = endpoint_name(request)
+        duplicates = profile.duplicates(threshold)
+        sample = {
+            'total_ms': round((time.perf_counter() - profile.started) * 1000, 3),
+            'sql_queries': profile.queries,
+            'sql_ms': round(profile.sql * 1000, 3),
+            'serialize_ms': round(profile.serialize * 1000, 3),
+            'render_ms': round(profile.render * 1000, 3),
+            'bytes': None if response.streaming else len(response.content),
+            'duplicates': duplicates,
+        }
+        response['Server-Timing'] = server_timing(sample)
+        record_sample(endpoint, {**sample, 'bytes': sample['bytes'] or 0})
+
+        line = {'endpoint': endpoint, 'path': request.get_full_path(), 'status': response.status_code, **sample}
+        line['duplicates'] = len(duplicates)
+        logger.info(json.dumps(line))
+        for shape, count in duplicates.items():
+            logger.warning(json.dumps({'endpoint': endpoint, 'possible_n_plus_one': shape, 'executions': count}))
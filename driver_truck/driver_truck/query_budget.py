@@ -0,0 +1,70 @@
+"""
+Query budget guard
+
+Wraps a block of code (or a test method) and fails when it runs more SQL
+queries than declared. Used by the test suite to keep list and detail
+endpoints at a constant number of queries regardless of row count.
+"""
+from contextlib import ContextDecorator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a block runs more queries than its budget allows
+    """
+
+
+class query_budget(ContextDecorator):
+    """
+    Context manager / decorator enforcing a maximum query count
+
+        with query_budget(2):
+            client.get('/api/trips/trips/')
+
+        @query_budget(3)
+        def test_something(self):
+            ...
+    """
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS, label=None):
+        self.max_queries = max_queries
+        self.using = using
+        self.label = label
+
+    def __enter__(self):
+        self._context = CaptureQueriesContext(connections[self.using])
+        self._context.__enter__()
+        return self._context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+
+        executed = len(self._context)
+        if executed > self.max_queries:
+            queries = '\n'.join(
+                f"{i}. {query['sql']}"
+                for i, query in enumerate(self._context.captured_queries, start=1)
+            )
+            label = f"{self.label}: " if self.label else ''
+            raise QueryBudgetExceeded(
+                f"{label}{executed} queries executed, budget is {self.max_queries}\n{queries}"
+            )
+        return False
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin exposing query_budget as an assertion
+    """
+
+    def assertQueryBudget(self, max_queries, func=None, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+        guard = query_budget(max_queries, using=using)
+        if func is None:
+            return guard
+        with guard:
+            return func(*args, **kwargs)
@@ -0,0 +1,174 @@
+"""
+Read replicas
+
+Viewsets with ReplicaReadMixin serve their safe-method ``list``,
+``retrieve`` and related-list actions from one of the aliases in
+``settings.DATABASE_REPLICAS``. Everything else uses the primary
+(``default``):
+
+- every write, and every read after a write in the same request or inside
+  a transaction;
+- every request from a client that wrote less than
+  ``REPLICA_STICKY_SECONDS`` ago. ReplicaMiddleware marks such clients
+  with a cookie, so they read their own writes even while the replica
+  lags.
+
+Routing is off while ``DATABASE_REPLICAS`` is empty. ``replicate()`` (or
+``manage.py replicate``) copies the primary SQLite file onto the replica
+files and stands in for real replication locally.
+"""
+import random
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+STICKY_COOKIE = 'primary_until'
+
+_current = ContextVar('replica_state', default=None)
+
+
+class ReadState:
+    """
+    Where the current request reads from
+    """
+
+    def __init__(self, sticky=False):
+        self.sticky = sticky
+        self.alias = None
+        self.wrote = False
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+
+def reading_from_replica():
+    """
+    The alias reads are currently routed to, or None for the primary
+    """
+    state = _current.get()
+    if state is None or state.alias is None or state.wrote:
+        return None
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+    return state.alias
+
+
+@contextmanager
+def read_from(alias):
+    """
+    Route the reads of the enclosed block to ``alias`` (None for the primary)
+    """
+    state = _current.get()
+    if state is None:
+        state = ReadState()
+        token = _current.set(state)
+    else:
+        token = None
+    previous, state.alias = state.alias, alias
+    try:
+        yield state
+    finally:
+        state.alias = previous
+        if token is not None:
+            _current.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica picked for the request, writes to the primary
+    """
+
+    def db_for_read(self, model, **hints):
+        # Returning the primary explicitly keeps instances loaded from a
+        # replica from pulling related reads back to it
+        return reading_from_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
+
+
+class ReplicaMiddleware:
+    """
+    Track writes per request and keep recent writers on the primary
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+
+        try:
+            sticky = float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            sticky = False
+        state = ReadState(sticky=sticky)
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            window = sticky_seconds()
+            response.set_cookie(STICKY_COOKIE, f'{time.time() + window:.3f}', max_age=window,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    ViewSet mixin serving ``replica_actions`` from a read replica
+    """
+    replica_actions = ('list', 'retrieve', 'stops', 'events', 'trips', 'export')
+
+    def dispatch(self, request, *args, **kwargs):
+        with read_from(self.get_read_alias(request)):
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_read_alias(self, request):
+        replicas = replica_aliases()
+        state = _current.get()
+        if not replicas or request.method not in SAFE_METHODS or (state is not None and state.sticky):
+            return None
+        if self.action_map.get(request.method.lower()) not in self.replica_actions:
+            return None
+        return random.choice(replicas)
+
+
+def copy_database(source, target):
+    """
+    Overwrite the SQLite file ``target`` with a consistent snapshot of ``source``
+    """
+    with closing(sqlite3.connect(source)) as primary, closing(sqlite3.connect(target)) as replica:
+        primary.backup(replica)
+
+
+def replicate(aliases=None):
+    """
+    Bring the replica files up to date with the primary
+    """
+    source = settings.DATABASES[DEFAULT_DB_ALIAS]['NAME']
+    for alias in aliases or replica_aliases():
+        copy_database(source, settings.DATABASES[alias]['NAME'])
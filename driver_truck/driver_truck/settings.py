@@ -1,5 +1,8 @@
 from pathlib import Path
 from datetime import timedelta
+from importlib.util import find_spec
+
+from driver_truck.database import sqlite_database
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -26,6 +29,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'driver_truck.profiling.ProfilingMiddleware',
+    'driver_truck.compression.CompressionMiddleware',
+    'driver_truck.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,12 +60,72 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'driver_truck.wsgi.application'
 
+# WAL, BEGIN IMMEDIATE, busy timeout and persistent connections so
+# concurrent writers queue instead of failing (see driver_truck/database.py)
 DATABASES = {
+    'default': sqlite_database(BASE_DIR / 'db.sqlite3'),
+    # Local read replica; `manage.py replicate --interval 1` keeps it in sync
+    'replica': {**sqlite_database(BASE_DIR / 'db.replica.sqlite3'), 'TEST': {'MIRROR': 'default'}},
+}
+
+# Safe-method list/detail reads go to DATABASE_REPLICAS (see
+# driver_truck/replicas.py); a client that wrote reads from the primary for
+# REPLICA_STICKY_SECONDS, which should cover the replication lag.
+DATABASE_ROUTERS = ['driver_truck.replicas.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = 5
+
+# Response cache for read endpoints (see driver_truck/caching.py).
+# Point RESPONSE_CACHE_ALIAS at 'responses_file' to share the cache and its
+# invalidations between worker processes. With RESPONSE_CACHE_ENABLED = None
+# the cache is only used on such a shared backend: a per-process locmem
+# cache would keep serving other workers' stale entries. Set it to True
+# for a single-process server.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'responses_file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
 }
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_ENABLED = None
+RESPONSE_CACHE_TIMEOUT = 300
+
+# gzip/brotli for responses of at least this many bytes (brotli needs the
+# optional brotli package)
+RESPONSE_COMPRESSION_ENABLED = True
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+RESPONSE_COMPRESSION_BROTLI_QUALITY = 5
+
+# Per-request SQL/serializer/render timings as Server-Timing headers, log
+# lines and /api/profiling/stats/ (see driver_truck/profiling.py). A query
+# repeated DUPLICATE_THRESHOLD times in one request is reported as N+1.
+REQUEST_PROFILING_ENABLED = False
+REQUEST_PROFILING_WINDOW = 200
+REQUEST_PROFILING_DUPLICATE_THRESHOLD = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'driver_truck.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# application/msgpack is negotiated only when the optional msgpack package is installed
+MSGPACK_ENABLED = find_spec('msgpack') is not None
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -95,6 +161,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',  # Allow unauthenticated access for demo
     ),
+    'DEFAULT_RENDERER_CLASSES': [
+        'driver_truck.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        *(['driver_truck.renderers.MessagePackRenderer'] if MSGPACK_ENABLED else []),
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'driver_truck.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        *(['driver_truck.renderers.MessagePackParser'] if MSGPACK_ENABLED else []),
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
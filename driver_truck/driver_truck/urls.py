@@ -16,6 +16,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from trips.views import SyncFeedView
 from . import views
 
 urlpatterns = [
@@ -24,6 +25,8 @@ urlpatterns = [
     path('demo/', views.demo, name='demo'),
     path('api/status/', views.api_status, name='api-status'),
     path('api/csrf/', views.get_csrf_token, name='csrf-token'),
+    path('api/cache/stats/', views.response_cache_stats, name='cache-stats'),
+    path('api/profiling/stats/', views.request_profiling_stats, name='profiling-stats'),
     
     path('admin/', admin.site.urls),
     
@@ -31,6 +34,7 @@ urlpatterns = [
     path('api/drivers/', include('drivers.urls')),
     path('api/logs/', include('logs.urls')),
     path('api/trips/', include('trips.urls')),
+    path('api/sync/', SyncFeedView.as_view(), name='sync-feed'),
     
     # DRF auth endpoints
     path('api-auth/', include('rest_framework.urls')),
@@ -3,6 +3,8 @@ from django.http import JsonResponse
 from django.middleware.csrf import get_token
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_http_methods
+from .caching import cache_stats
+from .profiling import profiling_stats
 
 def home(request):
     return render(request, 'index.html')
@@ -27,4 +29,15 @@ def api_status(request):
             'schema': '/schema/',
             'admin': '/admin/'
         }
-    })
\ No newline at end of file
+    })
+
+@require_http_methods(["GET"])
+def response_cache_stats(request):
+    """Response cache hit/miss counters for this process"""
+    return JsonResponse(cache_stats())
+
+
+@require_http_methods(["GET"])
+def request_profiling_stats(request):
+    """Rolling per-endpoint timings recorded by ProfilingMiddleware"""
+    return JsonResponse(profiling_stats())
@@ -1,8 +1,10 @@
 from rest_framework import serializers
+from driver_truck.fastpath import display_name
+from driver_truck.fieldsets import SparseFieldsMixin
 from .models import Driver, Vehicle
 
 
-class DriverSerializer(serializers.ModelSerializer):
+class DriverSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Driver model
     """
@@ -41,12 +43,19 @@ class DriverSerializer(serializers.ModelSerializer):
         return instance
 
 
-class DriverListSerializer(serializers.ModelSerializer):
+class DriverListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Simplified serializer for driver list views
     """
     full_name = serializers.SerializerMethodField()
     
+    field_sources = {
+        'full_name': ('first_name', 'last_name', 'username'),
+    }
+    fast_fields = {
+        'full_name': display_name,
+    }
+    
     class Meta:
         model = Driver
         fields = [
@@ -58,12 +67,16 @@ class DriverListSerializer(serializers.ModelSerializer):
         return obj.get_full_name() or obj.username
 
 
-class VehicleSerializer(serializers.ModelSerializer):
+class VehicleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Vehicle model
     """
     assigned_driver_name = serializers.SerializerMethodField()
     
+    field_sources = {
+        'assigned_driver_name': ('assigned_driver__first_name', 'assigned_driver__last_name', 'assigned_driver__username'),
+    }
+    
     class Meta:
         model = Vehicle
         fields = [
@@ -77,12 +90,16 @@ class VehicleSerializer(serializers.ModelSerializer):
         return None
 
 
-class VehicleListSerializer(serializers.ModelSerializer):
+class VehicleListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Simplified serializer for vehicle list views
     """
     assigned_driver_name = serializers.SerializerMethodField()
     
+    field_sources = {
+        'assigned_driver_name': ('assigned_driver__first_name', 'assigned_driver__last_name', 'assigned_driver__username'),
+    }
+    
     class Meta:
         model = Vehicle
         fields = [
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from driver_truck.caching import invalidate
+from .models import Driver, Vehicle
+
+
+@receiver([post_save, post_delete], sender=Driver)
+def invalidate_driver(sender, instance, **kwargs):
+    invalidate(f'driver:{instance.pk}', 'drivers')
+
+
+@receiver([post_save, post_delete], sender=Vehicle)
+def invalidate_vehicle(sender, instance, **kwargs):
+    invalidate(f'vehicle:{instance.pk}', 'vehicles')
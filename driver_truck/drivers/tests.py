@@ -1,3 +1,105 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from driver_truck.caching import get_cache
+from driver_truck.query_budget import QueryBudgetMixin
+from .models import Driver, Vehicle
+from .views import DriverViewSet
+
+
+def create_driver(username='driver1', **kwargs):
+    defaults = {
+        'driver_license': f'DL-{username}',
+        'first_name': 'Test',
+        'last_name': username.title(),
+    }
+    defaults.update(kwargs)
+    return Driver.objects.create(username=username, **defaults)
+
+
+def create_vehicle(number, driver=None, **kwargs):
+    defaults = {
+        'license_plate': f'PLATE-{number}',
+        'vin': f'VIN{number:014d}',
+        'make': 'Freightliner',
+        'model': 'Cascadia',
+        'year': 2022,
+        'assigned_driver': driver,
+    }
+    defaults.update(kwargs)
+    return Vehicle.objects.create(**defaults)
+
+
+class APITestMixin:
+    def setUp(self):
+        get_cache().clear()
+        self.driver = create_driver()
+        self.client = APIClient()
+        self.client.force_authenticate(self.driver)
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestMixin, TestCase):
+    """
+    Driver and vehicle endpoints must run in a constant number of queries
+
+    Budgets include the single aggregate used for ETag/Last-Modified.
+    """
+
+    def test_vehicle_list_and_detail(self):
+        for count in (1, 5):
+            vehicles = [
+                create_vehicle(Vehicle.objects.count() + 1, create_driver(f'owner{i}-{count}'))
+                for i in range(count)
+            ]
+            with self.assertQueryBudget(3):
+                self.assertEqual(self.client.get('/api/drivers/vehicles/').status_code, 200)
+            with self.assertQueryBudget(2):
+                response = self.client.get(f'/api/drivers/vehicles/{vehicles[0].id}/')
+            self.assertEqual(response.status_code, 200)
+
+    def test_driver_list(self):
+        for i in range(5):
+            create_driver(f'extra{i}')
+        with self.assertQueryBudget(3):
+            self.assertEqual(self.client.get('/api/drivers/drivers/').status_code, 200)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(APITestMixin, TestCase):
+    def test_vehicle_detail_invalidated_by_assignment(self):
+        vehicle = create_vehicle(1)
+        url = f'/api/drivers/vehicles/{vehicle.id}/'
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        self.client.post(f'{url}assign_driver/', {'driver_id': self.driver.id})
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['assigned_driver'], self.driver.id)
+
+
+class SparseFieldsetTests(APITestMixin, TestCase):
+    def test_vehicle_fields_drop_the_driver_join(self):
+        create_vehicle(1, self.driver)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/drivers/vehicles/', {'fields': 'id,license_plate'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'license_plate'])
+        self.assertNotIn('JOIN', queries.captured_queries[-1]['sql'])
+
+        response = self.client.get('/api/drivers/vehicles/', {'omit': 'make,model'})
+        self.assertEqual(response.data['results'][0]['assigned_driver_name'], 'Test Driver1')
+        self.assertNotIn('make', response.data['results'][0])
+
+
+class FastReadPathTests(APITestMixin, TestCase):
+    def test_driver_list_parity(self):
+        create_driver('nameless', first_name='', last_name='', carrier_name='Acme Freight')
+        create_driver('inactive', is_active=False)
+        fast = self.client.get('/api/drivers/drivers/')
+        with mock.patch.object(DriverViewSet, 'fast_list', False):
+            slow = self.client.get('/api/drivers/drivers/')
+        self.assertEqual(fast.content, slow.content)
+        self.assertEqual(fast.data['results'][2]['full_name'], 'nameless')
@@ -3,6 +3,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import authenticate
+from driver_truck.caching import CachedReadMixin
+from driver_truck.conditional import ConditionalGetMixin
+from driver_truck.fastpath import FastListMixin
+from driver_truck.fieldsets import SparseFieldsetMixin
+from driver_truck.replicas import ReplicaReadMixin
+from trips.models import SyncChange
 from .models import Driver, Vehicle
 from .serializers import (
     DriverSerializer, DriverListSerializer,
@@ -10,12 +16,15 @@ from .serializers import (
 )
 
 
-class DriverViewSet(viewsets.ModelViewSet):
+class DriverViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedReadMixin, SparseFieldsetMixin, FastListMixin,
+                    viewsets.ModelViewSet):
     """
     ViewSet for Driver model
     """
     queryset = Driver.objects.all()
     permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for driver creation
+    cache_tag = 'driver'
+    change_log = SyncChange
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -77,12 +86,15 @@ class DriverViewSet(viewsets.ModelViewSet):
         return Response({'status': 'No active duty log'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedReadMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Vehicle model
     """
     queryset = Vehicle.objects.all()
     permission_classes = [IsAuthenticated]
+    cache_tag = 'vehicle'
+    change_log = SyncChange
+    cache_dependencies = ('drivers',)
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -90,7 +102,7 @@ class VehicleViewSet(viewsets.ModelViewSet):
         return VehicleSerializer
     
     def get_queryset(self):
-        queryset = Vehicle.objects.all()
+        queryset = Vehicle.objects.select_related('assigned_driver')
         
         # Filter by active status
         is_active = self.request.query_params.get('is_active')
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import DutyLog, HOSViolation
+
+
+@admin.register(DutyLog)
+class DutyLogAdmin(admin.ModelAdmin):
+    """
+    Admin for DutyLog model
+    """
+    list_display = ['driver', 'status', 'start_time', 'end_time', 'location', 'vehicle', 'trip']
+    list_filter = ['status', 'start_time']
+    search_fields = ['driver__username', 'location', 'notes']
+    raw_id_fields = ['driver', 'vehicle', 'trip']
+
+
+@admin.register(HOSViolation)
+class HOSViolationAdmin(admin.ModelAdmin):
+    """
+    Admin for HOSViolation model
+    """
+    list_display = ['driver', 'violation_type', 'occurred_at', 'hours', 'limit_hours', 'detected_at']
+    list_filter = ['violation_type', 'occurred_at']
+    search_fields = ['driver__username']
+    readonly_fields = ['detected_at']
@@ -0,0 +1,260 @@
+"""
+Hours-of-Service compliance engine (property-carrying drivers, 49 CFR 395.3)
+
+Duty logs are evaluated as arrays of intervals instead of log by log. Only
+on-duty intervals (driving, and on duty not driving) are kept; any time
+between them counts as off duty, whether it was logged as off duty,
+sleeper berth or not logged at all. With the intervals of a whole fleet
+sorted by driver and start time, every rule reduces to gaps between
+neighbours, segmented cumulative sums and sorted lookups:
+
+* 11-hour driving limit and 14-hour window: a shift starts after 10
+  consecutive hours off duty
+* 30-minute break: at most 8 hours of driving between two non-driving
+  periods of at least 30 consecutive minutes
+* 70 hours in 8 days: on-duty time in the trailing 192 hours, counted
+  from the last 34-hour restart
+
+Times are integer epoch seconds. Split sleeper berth pairings and the
+adverse driving conditions extension are not modelled.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+
+HOUR = 3600
+DRIVING_LIMIT = 11 * HOUR
+WINDOW_LIMIT = 14 * HOUR
+BREAK_AFTER = 8 * HOUR
+BREAK_LENGTH = 30 * 60
+SHIFT_RESET = 10 * HOUR
+CYCLE_LIMIT = 70 * HOUR
+CYCLE_LENGTH = 8 * 24 * HOUR
+CYCLE_RESTART = 34 * HOUR
+
+# History needed to evaluate a point in time: the cycle plus a restart
+LOOKBACK = CYCLE_LENGTH + CYCLE_RESTART
+
+ON_DUTY_STATUSES = ('driving', 'on_duty')
+
+DRIVING_11 = 'driving_11'
+WINDOW_14 = 'window_14'
+BREAK_30 = 'break_30'
+CYCLE_70 = 'cycle_70'
+
+LIMITS = {
+    DRIVING_11: DRIVING_LIMIT,
+    WINDOW_14: WINDOW_LIMIT,
+    BREAK_30: BREAK_AFTER,
+    CYCLE_70: CYCLE_LIMIT,
+}
+
+NO_GAP = np.iinfo(np.int64).max
+
+Violation = namedtuple('Violation', ['driver_id', 'violation_type', 'occurred_at', 'hours'])
+Clock = namedtuple('Clock', ['driving', 'window', 'break_due', 'cycle'])
+
+
+def segment_cumsum(values, new_segment):
+    """
+    Running total of ``values`` that restarts wherever ``new_segment`` is True
+    """
+    totals = np.cumsum(values)
+    segment = np.cumsum(new_segment) - 1
+    offsets = (totals - values)[new_segment]
+    return totals - offsets[segment]
+
+
+def first_per_segment(mask, segment):
+    """
+    Index of the first True entry of ``mask`` in each segment
+    """
+    candidates = np.flatnonzero(mask)
+    _, first = np.unique(segment[candidates], return_index=True)
+    return candidates[first]
+
+
+class DutyIntervals:
+    """
+    On-duty intervals of one or more drivers
+
+    ``driver_ids``, ``starts``, ``ends`` and ``driving`` are parallel
+    sequences; they are copied and sorted by driver then start time.
+    """
+
+    def __init__(self, driver_ids, starts, ends, driving):
+        driver_ids = np.asarray(driver_ids, dtype=np.int64)
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        driving = np.asarray(driving, dtype=bool)
+
+        order = np.lexsort((starts, driver_ids))
+        self.driver_ids = driver_ids[order]
+        self.starts = starts[order]
+        self.ends = np.maximum(ends[order], self.starts)
+        self.driving = driving[order]
+        self.durations = self.ends - self.starts
+
+        size = len(self.starts)
+        self.first = np.ones(size, dtype=bool)
+        self.first[1:] = self.driver_ids[1:] != self.driver_ids[:-1]
+        self.last = np.ones(size, dtype=bool)
+        self.last[:-1] = self.first[1:]
+
+        # Off-duty time before each interval
+        self.gaps = np.full(size, NO_GAP, dtype=np.int64)
+        self.gaps[1:] = np.where(self.first[1:], NO_GAP, self.starts[1:] - self.ends[:-1])
+
+        # Shifts (11/14-hour rules)
+        shift_start = self.first | (self.gaps >= SHIFT_RESET)
+        self.shift = np.cumsum(shift_start) - 1
+        self.shift_started_at = self.starts[shift_start][self.shift]
+        self.shift_driving = segment_cumsum(np.where(self.driving, self.durations, 0), shift_start)
+
+        self._index_cycle()
+        self._index_breaks()
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def from_rows(cls, rows, as_of):
+        """
+        Build from ``(driver_id, driving, start, end)`` integer rows
+
+        Times are epoch seconds; intervals running past ``as_of`` are cut
+        there. Rows must already be limited to on-duty statuses.
+        """
+        table = np.array(rows, dtype=np.int64).reshape(-1, 4)
+        return cls(table[:, 0], table[:, 2], np.minimum(table[:, 3], as_of), table[:, 1].astype(bool))
+
+    def _index_cycle(self):
+        """
+        Cumulative on-duty time on one axis shared by all drivers
+
+        Each driver's times are shifted into their own band so a single
+        searchsorted answers "on-duty seconds up to t" for any driver.
+        """
+        if not len(self):
+            self.band_starts = self.band_offsets = self.on_duty_before = self.restarted_at = self.starts
+            return
+        rank = np.cumsum(self.first) - 1
+        base = self.starts.min()
+        band = (self.ends.max() - base) + LOOKBACK + 1
+        self.band_offsets = rank * band - base
+        self.band_starts = self.starts + self.band_offsets
+        self.on_duty_before = np.cumsum(self.durations) - self.durations
+
+        restart = self.first | (self.gaps >= CYCLE_RESTART)
+        self.restarted_at = np.maximum.accumulate(np.where(restart, self.band_starts, 0))
+
+    def on_duty_until(self, band_times):
+        """
+        Cumulative on-duty seconds up to each banded time
+        """
+        index = np.maximum(np.searchsorted(self.band_starts, band_times, side='right') - 1, 0)
+        within = np.clip(band_times - self.band_starts[index], 0, self.durations[index])
+        return self.on_duty_before[index] + within
+
+    def cycle_used(self, times, index):
+        """
+        On-duty seconds in the 8 days before ``times``, for the drivers of intervals ``index``
+        """
+        band_times = times + self.band_offsets[index]
+        lower = np.maximum(band_times - CYCLE_LENGTH, self.restarted_at[index])
+        return self.on_duty_until(band_times) - self.on_duty_until(lower)
+
+    def _index_breaks(self):
+        """
+        Driving-only view for the 30-minute break rule
+        """
+        self.drive_index = np.flatnonzero(self.driving)
+        drive_starts = self.starts[self.drive_index]
+        drive_ends = self.ends[self.drive_index]
+        drivers = self.driver_ids[self.drive_index]
+
+        new_period = np.ones(len(self.drive_index), dtype=bool)
+        new_period[1:] = (drivers[1:] != drivers[:-1]) | (drive_starts[1:] - drive_ends[:-1] >= BREAK_LENGTH)
+        self.drive_period = np.cumsum(new_period) - 1
+        self.period_driving = segment_cumsum(self.durations[self.drive_index], new_period)
+
+    def violations(self):
+        """
+        First violation of each rule per shift (per driving period for breaks)
+        """
+        if not len(self):
+            return []
+        found = []
+
+        # 11 hours of driving per shift
+        driven_before = self.shift_driving - np.where(self.driving, self.durations, 0)
+        index = first_per_segment(self.driving & (self.shift_driving > DRIVING_LIMIT), self.shift)
+        found.append((DRIVING_11, index, self.starts[index] + np.maximum(DRIVING_LIMIT - driven_before[index], 0),
+                      self.shift_driving[index]))
+
+        # No driving after the 14th hour since the shift started
+        window_closes = self.shift_started_at + WINDOW_LIMIT
+        index = first_per_segment(self.driving & (self.ends > window_closes), self.shift)
+        found.append((WINDOW_14, index, np.maximum(self.starts[index], window_closes[index]),
+                      self.ends[index] - self.shift_started_at[index]))
+
+        # 30-minute break after 8 hours of driving
+        durations = self.durations[self.drive_index]
+        over = first_per_segment(self.period_driving > BREAK_AFTER, self.drive_period)
+        index = self.drive_index[over]
+        found.append((BREAK_30, index,
+                      self.starts[index] + np.maximum(BREAK_AFTER - (self.period_driving[over] - durations[over]), 0),
+                      self.period_driving[over]))
+
+        # 70 hours on duty in 8 days
+        used_at_start = self.cycle_used(self.starts, np.arange(len(self)))
+        used_at_end = self.cycle_used(self.ends, np.arange(len(self)))
+        index = first_per_segment(self.driving & (used_at_end > CYCLE_LIMIT), self.shift)
+        occurred = np.minimum(self.starts[index] + np.maximum(CYCLE_LIMIT - used_at_start[index], 0), self.ends[index])
+        found.append((CYCLE_70, index, occurred, used_at_end[index]))
+
+        return [
+            Violation(int(driver_id), violation_type, int(occurred_at), round(float(seconds) / HOUR, 2))
+            for violation_type, index, occurred, seconds in found
+            for driver_id, occurred_at, seconds in zip(self.driver_ids[index], occurred, seconds)
+        ]
+
+    def clocks(self, as_of):
+        """
+        Remaining hours per driver at ``as_of`` (epoch seconds), keyed by driver id
+        """
+        if not len(self):
+            return {}
+        last = np.flatnonzero(self.last)
+        rested = as_of - self.ends[last]
+
+        new_shift = rested >= SHIFT_RESET
+        driving_used = np.where(new_shift, 0, self.shift_driving[last])
+        window_used = np.where(new_shift, 0, as_of - self.shift_started_at[last])
+
+        # Driving since the last 30-minute break
+        since_break = np.zeros(len(last), dtype=np.int64)
+        drivers = self.driver_ids[self.drive_index]
+        last_drive = np.ones(len(self.drive_index), dtype=bool)
+        last_drive[:-1] = drivers[1:] != drivers[:-1]
+        last_drive = np.flatnonzero(last_drive)
+        slot = np.searchsorted(self.driver_ids[last], drivers[last_drive])
+        broke = as_of - self.ends[self.drive_index[last_drive]] >= BREAK_LENGTH
+        since_break[slot] = np.where(broke, 0, self.period_driving[last_drive])
+
+        cycle_used = np.where(rested >= CYCLE_RESTART, 0, self.cycle_used(np.full(len(last), as_of), last))
+
+        def remaining(limit, used):
+            return np.round(np.clip(limit - used, 0, limit) / HOUR, 2)
+
+        clocks = zip(
+            remaining(DRIVING_LIMIT, driving_used),
+            remaining(WINDOW_LIMIT, window_used),
+            remaining(BREAK_AFTER, since_break),
+            remaining(CYCLE_LIMIT, cycle_used),
+        )
+        return {
+            int(driver_id): Clock(*(float(value) for value in clock))
+            for driver_id, clock in zip(self.driver_ids[last], clocks)
+        }
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('drivers', '0001_initial'),
+        ('trips', '0005_last_known_positions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DutyLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('off_duty', 'Off Duty'), ('sleeper_berth', 'Sleeper Berth'), ('driving', 'Driving'), ('on_duty', 'On Duty')], max_length=20)),
+                ('start_time', models.DateTimeField(default=django.utils.timezone.now)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('odometer', models.PositiveIntegerField(blank=True, help_text='Odometer reading in miles', null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duty_logs', to=settings.AUTH_USER_MODEL)),
+                ('trip', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duty_logs', to='trips.trip')),
+                ('vehicle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duty_logs', to='drivers.vehicle')),
+            ],
+            options={
+                'verbose_name': 'Duty Log',
+                'verbose_name_plural': 'Duty Logs',
+                'db_table': 'duty_logs',
+                'ordering': ['-start_time'],
+                'indexes': [models.Index(fields=['driver', '-start_time'], name='duty_logs_driver_start_idx'), models.Index(fields=['driver', 'end_time'], name='duty_logs_driver_end_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HOSViolation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('violation_type', models.CharField(choices=[('driving_11', '11-Hour Driving Limit'), ('window_14', '14-Hour Window'), ('break_30', '30-Minute Break'), ('cycle_70', '70-Hour/8-Day Limit')], max_length=20)),
+                ('occurred_at', models.DateTimeField()),
+                ('hours', models.DecimalField(decimal_places=2, help_text='Hours counted against the limit when the violation was detected', max_digits=6)),
+                ('limit_hours', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hos_violations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'HOS Violation',
+                'verbose_name_plural': 'HOS Violations',
+                'db_table': 'hos_violations',
+                'ordering': ['-occurred_at'],
+                'indexes': [models.Index(fields=['driver', '-occurred_at'], name='hos_violations_driver_idx')],
+                'constraints': [models.UniqueConstraint(fields=('driver', 'violation_type', 'occurred_at'), name='hos_violation_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dutylog',
+            index=models.Index(fields=['status', 'start_time', 'end_time', 'driver'], name='duty_logs_hos_window_idx'),
+        ),
+    ]
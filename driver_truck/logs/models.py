@@ -0,0 +1,131 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from drivers.models import Vehicle
+from trips.models import Trip
+from . import hos
+
+Driver = get_user_model()
+
+
+class DutyStatus(models.TextChoices):
+    """
+    Record of Duty Status options
+    """
+    OFF_DUTY = 'off_duty', 'Off Duty'
+    SLEEPER_BERTH = 'sleeper_berth', 'Sleeper Berth'
+    DRIVING = 'driving', 'Driving'
+    ON_DUTY = 'on_duty', 'On Duty'
+
+
+class ViolationType(models.TextChoices):
+    """
+    Hours-of-Service rules checked by logs/hos.py
+    """
+    DRIVING_11 = hos.DRIVING_11, '11-Hour Driving Limit'
+    WINDOW_14 = hos.WINDOW_14, '14-Hour Window'
+    BREAK_30 = hos.BREAK_30, '30-Minute Break'
+    CYCLE_70 = hos.CYCLE_70, '70-Hour/8-Day Limit'
+
+
+class DutyLog(models.Model):
+    """
+    One duty status period of a driver; open while end_time is empty
+    """
+    driver = models.ForeignKey(
+        Driver,
+        on_delete=models.CASCADE,
+        related_name='duty_logs'
+    )
+    vehicle = models.ForeignKey(
+        Vehicle,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duty_logs'
+    )
+    trip = models.ForeignKey(
+        Trip,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duty_logs'
+    )
+    
+    status = models.CharField(max_length=20, choices=DutyStatus.choices)
+    start_time = models.DateTimeField(default=timezone.now)
+    end_time = models.DateTimeField(null=True, blank=True)
+    
+    location = models.CharField(max_length=200, blank=True)
+    odometer = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Odometer reading in miles"
+    )
+    notes = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'duty_logs'
+        verbose_name = 'Duty Log'
+        verbose_name_plural = 'Duty Logs'
+        ordering = ['-start_time']
+        indexes = [
+            models.Index(fields=['driver', '-start_time'], name='duty_logs_driver_start_idx'),
+            models.Index(fields=['driver', 'end_time'], name='duty_logs_driver_end_idx'),
+            # Covers the HOS engine's fleet-wide interval load
+            models.Index(fields=['status', 'start_time', 'end_time', 'driver'], name='duty_logs_hos_window_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.driver.username} - {self.get_status_display()} at {self.start_time}"
+    
+    @property
+    def is_current(self):
+        return self.end_time is None
+    
+    @property
+    def duration_hours(self):
+        """Hours in this status, up to now for the current log"""
+        end = self.end_time or timezone.now()
+        return round((end - self.start_time).total_seconds() / 3600, 2)
+
+
+class HOSViolation(models.Model):
+    """
+    Hours-of-Service violation found by the compliance engine
+    """
+    driver = models.ForeignKey(
+        Driver,
+        on_delete=models.CASCADE,
+        related_name='hos_violations'
+    )
+    violation_type = models.CharField(max_length=20, choices=ViolationType.choices)
+    occurred_at = models.DateTimeField()
+    hours = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        help_text="Hours counted against the limit when the violation was detected"
+    )
+    limit_hours = models.DecimalField(max_digits=5, decimal_places=2)
+    detected_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'hos_violations'
+        verbose_name = 'HOS Violation'
+        verbose_name_plural = 'HOS Violations'
+        ordering = ['-occurred_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['driver', 'violation_type', 'occurred_at'],
+                name='hos_violation_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['driver', '-occurred_at'], name='hos_violations_driver_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.driver.username} - {self.get_violation_type_display()} at {self.occurred_at}"
@@ -0,0 +1,90 @@
+from rest_framework import serializers
+from .models import DutyLog, HOSViolation
+
+
+class DutyLogSerializer(serializers.ModelSerializer):
+    """
+    Serializer for DutyLog model
+    """
+    driver_name = serializers.SerializerMethodField()
+    status_display = serializers.SerializerMethodField()
+    duration_hours = serializers.ReadOnlyField()
+    is_current = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = DutyLog
+        fields = [
+            'id', 'driver', 'driver_name', 'vehicle', 'trip',
+            'status', 'status_display', 'start_time', 'end_time',
+            'duration_hours', 'is_current', 'location', 'odometer', 'notes',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = ['created_at', 'updated_at']
+    
+    def get_driver_name(self, obj):
+        return obj.driver.get_full_name() or obj.driver.username
+    
+    def get_status_display(self, obj):
+        return obj.get_status_display()
+    
+    def validate(self, data):
+        """
+        Validate duty log data
+        """
+        start_time = data.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = data.get('end_time', getattr(self.instance, 'end_time', None))
+        
+        if start_time and end_time and end_time <= start_time:
+            raise serializers.ValidationError("End time must be after start time.")
+        
+        return data
+
+
+class DutyLogListSerializer(serializers.ModelSerializer):
+    """
+    Simplified serializer for duty log lists
+    """
+    driver_name = serializers.SerializerMethodField()
+    timestamp = serializers.DateTimeField(source='start_time', read_only=True)
+    
+    class Meta:
+        model = DutyLog
+        fields = [
+            'id', 'driver', 'driver_name', 'status', 'timestamp',
+            'start_time', 'end_time', 'location', 'notes'
+        ]
+    
+    def get_driver_name(self, obj):
+        return obj.driver.get_full_name() or obj.driver.username
+
+
+class HOSViolationSerializer(serializers.ModelSerializer):
+    """
+    Serializer for HOSViolation model
+    """
+    driver_name = serializers.SerializerMethodField()
+    violation_type_display = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = HOSViolation
+        fields = [
+            'id', 'driver', 'driver_name', 'violation_type', 'violation_type_display',
+            'occurred_at', 'hours', 'limit_hours', 'detected_at'
+        ]
+    
+    def get_driver_name(self, obj):
+        return obj.driver.get_full_name() or obj.driver.username
+    
+    def get_violation_type_display(self, obj):
+        return obj.get_violation_type_display()
+
+
+class HOSClockSerializer(serializers.Serializer):
+    """
+    Hours left before each HOS limit is reached
+    """
+    driver = serializers.IntegerField()
+    driving_hours_left = serializers.FloatField(source='driving')
+    window_hours_left = serializers.FloatField(source='window')
+    hours_until_break = serializers.FloatField(source='break_due')
+    cycle_hours_left = serializers.FloatField(source='cycle')
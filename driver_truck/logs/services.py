@@ -0,0 +1,111 @@
+"""
+Loading duty logs into the HOS engine and storing what it finds
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from driver_truck.expressions import EpochSeconds
+from . import hos
+from .models import DutyLog, DutyStatus, HOSViolation
+
+
+def load_intervals(since, until, driver_ids=None):
+    """
+    On-duty intervals overlapping [since, until) as hos.DutyIntervals
+    """
+    logs = DutyLog.objects.filter(status__in=hos.ON_DUTY_STATUSES, start_time__lt=until).filter(
+        Q(end_time__isnull=True) | Q(end_time__gt=since)
+    )
+    if driver_ids is not None:
+        logs = logs.filter(driver_id__in=driver_ids)
+    rows = logs.order_by().values_list(
+        'driver_id',
+        ExpressionWrapper(Q(status=DutyStatus.DRIVING), output_field=BooleanField()),
+        EpochSeconds('start_time'),
+        Coalesce(EpochSeconds('end_time'), Value(int(until.timestamp()))),
+    )
+    # All-integer rows straight from the cursor convert to one array at C speed
+    sql, params = rows.query.sql_with_params()
+    with connections[rows.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        return hos.DutyIntervals.from_rows(cursor.fetchall(), int(until.timestamp()))
+
+
+def from_epoch(seconds):
+    return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+
+
+def evaluate_violations(driver_ids=None, since=None, as_of=None):
+    """
+    Re-check HOS rules and sync HOSViolation rows occurring in [since, as_of]
+
+    History back to ``since - hos.LOOKBACK`` is loaded so rules near the
+    start of the period see the preceding shift and cycle. Stored
+    violations in the period that no longer hold (for example after a log
+    was corrected) are removed. Returns the hos.Violation tuples found in
+    the period.
+    """
+    as_of = as_of or timezone.now()
+    since = since or as_of - timedelta(days=8)
+    intervals = load_intervals(since - timedelta(seconds=hos.LOOKBACK), as_of, driver_ids)
+
+    # Compare on epoch seconds and only build model instances for new rows
+    violations = [
+        found for found in intervals.violations()
+        if since.timestamp() <= found.occurred_at <= as_of.timestamp()
+    ]
+    with transaction.atomic():
+        stored = HOSViolation.objects.filter(occurred_at__gte=since, occurred_at__lte=as_of)
+        if driver_ids is not None:
+            stored = stored.filter(driver_id__in=driver_ids)
+        stored = {
+            tuple(key): pk
+            for pk, *key in stored.order_by().values_list(
+                'pk', 'driver_id', 'violation_type', EpochSeconds('occurred_at')
+            )
+        }
+        current = {found[:3] for found in violations}
+        stale = [pk for key, pk in stored.items() if key not in current]
+        if stale:
+            HOSViolation.objects.filter(pk__in=stale).delete()
+        HOSViolation.objects.bulk_create(
+            [
+                HOSViolation(
+                    driver_id=found.driver_id,
+                    violation_type=found.violation_type,
+                    occurred_at=from_epoch(found.occurred_at),
+                    hours=Decimal(str(found.hours)),
+                    limit_hours=Decimal(hos.LIMITS[found.violation_type] // hos.HOUR),
+                )
+                for found in violations if found[:3] not in stored
+            ],
+            ignore_conflicts=True,
+        )
+    return violations
+
+
+def driver_clocks(driver_ids, as_of=None):
+    """
+    Remaining driving, window, break and cycle hours for each driver
+    """
+    as_of = as_of or timezone.now()
+    intervals = load_intervals(as_of - timedelta(seconds=hos.LOOKBACK), as_of, driver_ids)
+    clocks = intervals.clocks(int(as_of.timestamp()))
+    fresh = hos.Clock(*(hos.LIMITS[rule] / hos.HOUR for rule in (
+        hos.DRIVING_11, hos.WINDOW_14, hos.BREAK_30, hos.CYCLE_70
+    )))
+    return {driver_id: clocks.get(driver_id, fresh) for driver_id in driver_ids}
+
+
+def close_open_logs(driver_id, at):
+    """
+    End the driver's open duty log where the next status begins
+    """
+    return DutyLog.objects.filter(
+        driver_id=driver_id, end_time__isnull=True, start_time__lte=at
+    ).update(end_time=at, updated_at=timezone.now())
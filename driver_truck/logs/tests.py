@@ -0,0 +1,220 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from drivers.models import Driver
+from driver_truck.query_budget import QueryBudgetMixin
+from . import hos
+from .models import DutyLog, HOSViolation
+
+
+T0 = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=3)
+H = hos.HOUR
+
+
+def intervals(*spans, driver=1):
+    """
+    DutyIntervals from (start_hour, end_hour, status) tuples relative to T0
+    """
+    base = int(T0.timestamp())
+    spans = [span for span in spans if span[2] in hos.ON_DUTY_STATUSES]
+    return hos.DutyIntervals(
+        [driver] * len(spans),
+        [base + int(start * H) for start, _, _ in spans],
+        [base + int(end * H) for _, end, _ in spans],
+        [status == 'driving' for _, _, status in spans],
+    )
+
+
+def found(duty_intervals):
+    base = int(T0.timestamp())
+    return {(v.violation_type, (v.occurred_at - base) / H) for v in duty_intervals.violations()}
+
+
+def create_driver(username='driver1', **kwargs):
+    return Driver.objects.create(username=username, driver_license=f'DL-{username}', **kwargs)
+
+
+def create_log(driver, status, start_hour, end_hour=None, **kwargs):
+    return DutyLog.objects.create(
+        driver=driver,
+        status=status,
+        start_time=T0 + timedelta(hours=start_hour),
+        end_time=T0 + timedelta(hours=end_hour) if end_hour is not None else None,
+        **kwargs
+    )
+
+
+class HOSEngineTests(SimpleTestCase):
+    def test_compliant_day(self):
+        day = intervals(
+            (0, 1, 'on_duty'), (1, 6, 'driving'), (6, 6.5, 'off_duty'),
+            (6.5, 12.5, 'driving'), (12.5, 13, 'on_duty'),
+        )
+        self.assertEqual(found(day), set())
+
+    def test_eleven_hour_limit_reports_the_crossing(self):
+        day = intervals((0, 6, 'driving'), (6, 7, 'off_duty'), (7, 13, 'driving'))
+        self.assertIn((hos.DRIVING_11, 12), found(day))
+
+    def test_fourteen_hour_window_counts_breaks(self):
+        day = intervals((0, 4, 'driving'), (4, 9, 'off_duty'), (9, 15, 'driving'))
+        self.assertEqual(found(day), {(hos.WINDOW_14, 14)})
+
+    def test_ten_hours_off_starts_a_new_shift(self):
+        days = intervals((0, 8, 'driving'), (8, 18, 'sleeper_berth'), (18, 26, 'driving'))
+        self.assertEqual(found(days), set())
+
+    def test_break_needs_thirty_consecutive_minutes(self):
+        short_breaks = intervals((0, 4, 'driving'), (4.25, 8.5, 'driving'), (8.75, 9.5, 'driving'))
+        self.assertEqual(found(short_breaks), {(hos.BREAK_30, 8.25)})
+
+        on_duty_break = intervals((0, 5, 'driving'), (5, 5.5, 'on_duty'), (5.5, 10.5, 'driving'))
+        self.assertEqual(found(on_duty_break), set())
+
+    def test_seventy_hour_cycle_and_restart(self):
+        # 12 hours on duty (8 driving) per day, 10+ hours off between shifts
+        shifts = []
+        for day in range(6):
+            start = day * 24
+            shifts += [(start, start + 4, 'on_duty'), (start + 4, start + 12, 'driving')]
+        violations = found(intervals(*shifts))
+        self.assertEqual({kind for kind, _ in violations}, {hos.CYCLE_70})
+        # 60 hours used after five shifts; the sixth crosses 70 ten hours in
+        self.assertEqual(violations, {(hos.CYCLE_70, 5 * 24 + 10)})
+
+        restarted = shifts[:10] + [(5 * 24 + 24, 5 * 24 + 28, 'on_duty'), (5 * 24 + 28, 5 * 24 + 36, 'driving')]
+        self.assertEqual(found(intervals(*restarted)), set())
+
+    def test_drivers_are_evaluated_independently(self):
+        first = intervals((0, 12, 'driving'))
+        second = intervals((0, 6, 'driving'), driver=2)
+        combined = hos.DutyIntervals(
+            list(first.driver_ids) + list(second.driver_ids),
+            list(first.starts) + list(second.starts),
+            list(first.ends) + list(second.ends),
+            list(first.driving) + list(second.driving),
+        )
+        self.assertEqual({v.driver_id for v in combined.violations()}, {1})
+
+    def test_clocks(self):
+        day = intervals((0, 1, 'on_duty'), (1, 6, 'driving'))
+        as_of = int(T0.timestamp()) + 7 * H
+        clock = day.clocks(as_of)[1]
+        self.assertEqual(clock, hos.Clock(driving=6.0, window=7.0, break_due=8.0, cycle=64.0))
+
+        rested = day.clocks(as_of + 10 * H)[1]
+        self.assertEqual((rested.driving, rested.window), (11.0, 14.0))
+
+    def test_empty(self):
+        empty = hos.DutyIntervals([], [], [], [])
+        self.assertEqual(empty.violations(), [])
+        self.assertEqual(empty.clocks(0), {})
+
+
+class DutyLogAPITests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.driver = create_driver()
+        self.client = APIClient()
+        self.client.force_authenticate(self.driver)
+
+    def test_new_status_closes_the_open_log(self):
+        create_log(self.driver, 'on_duty', 0)
+        response = self.client.post('/api/logs/duty-logs/', {
+            'driver': self.driver.id,
+            'status': 'driving',
+            'start_time': (T0 + timedelta(hours=1)).isoformat(),
+            'location': 'Atlanta, GA',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        logs = list(DutyLog.objects.order_by('start_time'))
+        self.assertEqual(logs[0].end_time, T0 + timedelta(hours=1))
+        self.assertIsNone(logs[1].end_time)
+
+        response = self.client.get(f'/api/drivers/drivers/{self.driver.id}/current_status/')
+        self.assertEqual(response.data['status'], 'driving')
+
+    def test_new_status_without_start_time_starts_now(self):
+        open_log = create_log(self.driver, 'on_duty', 0)
+        before = timezone.now()
+        response = self.client.post('/api/logs/duty-logs/', {'driver': self.driver.id, 'status': 'off_duty'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        log = DutyLog.objects.get(pk=response.data['id'])
+        self.assertGreaterEqual(log.start_time, before)
+        self.assertLessEqual(log.start_time, timezone.now())
+        self.assertEqual(DutyLog.objects.get(pk=open_log.pk).end_time, log.start_time)
+
+    def test_list_budget(self):
+        for hour in range(5):
+            create_log(self.driver, 'driving' if hour % 2 else 'on_duty', hour, hour + 1)
+        with self.assertQueryBudget(2):
+            response = self.client.get('/api/logs/duty-logs/', {'driver': self.driver.id})
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(response.data['results'][0]['timestamp'], response.data['results'][0]['start_time'])
+
+    def test_last_representable_end_date_is_unbounded(self):
+        create_log(self.driver, 'on_duty', 0)
+        response = self.client.get('/api/logs/duty-logs/', {'end_date': '9999-12-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+
+    def test_violations_follow_log_corrections(self):
+        create_log(self.driver, 'driving', 0, 6)
+        response = self.client.post('/api/logs/duty-logs/', {
+            'driver': self.driver.id,
+            'status': 'driving',
+            'start_time': (T0 + timedelta(hours=6)).isoformat(),
+            'end_time': (T0 + timedelta(hours=12)).isoformat(),
+        }, format='json')
+        log_id = response.data['id']
+        self.assertEqual(
+            set(HOSViolation.objects.values_list('violation_type', flat=True)),
+            {hos.DRIVING_11, hos.BREAK_30},
+        )
+        violation = HOSViolation.objects.get(violation_type=hos.DRIVING_11)
+        self.assertEqual(violation.occurred_at, T0 + timedelta(hours=11))
+        self.assertEqual(violation.limit_hours, 11)
+
+        self.client.patch(f'/api/logs/duty-logs/{log_id}/', {
+            'start_time': (T0 + timedelta(hours=7)).isoformat(),
+            'end_time': (T0 + timedelta(hours=10)).isoformat(),
+        }, format='json')
+        self.assertFalse(HOSViolation.objects.exists())
+
+    def test_evaluate_and_list_violations(self):
+        other = create_driver('driver2')
+        create_log(self.driver, 'driving', 0, 12)
+        create_log(other, 'driving', 0, 5)
+        response = self.client.post('/api/logs/hos-violations/evaluate/', {'days': 31}, format='json')
+        self.assertEqual(response.data, {'violations': 2})
+
+        response = self.client.get('/api/logs/hos-violations/', {'driver': self.driver.id})
+        self.assertEqual(
+            {row['violation_type'] for row in response.data['results']},
+            {hos.DRIVING_11, hos.BREAK_30},
+        )
+        response = self.client.post('/api/logs/hos-violations/evaluate/', {'days': 0}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_hos_status(self):
+        create_log(self.driver, 'on_duty', 0, 1)
+        create_log(self.driver, 'driving', 1)
+        response = self.client.get('/api/logs/duty-logs/hos-status/', {
+            'driver': self.driver.id,
+            'as_of': (T0 + timedelta(hours=4)).isoformat(),
+        })
+        self.assertEqual(response.data, [{
+            'driver': self.driver.id,
+            'driving_hours_left': 8.0,
+            'window_hours_left': 10.0,
+            'hours_until_break': 5.0,
+            'cycle_hours_left': 66.0,
+        }])
+        self.assertEqual(self.client.get('/api/logs/duty-logs/hos-status/').status_code, 400)
+        for as_of in ('2024-13-45T00:00', '0001-01-01T00:00'):
+            response = self.client.get('/api/logs/duty-logs/hos-status/', {'driver': self.driver.id, 'as_of': as_of})
+            self.assertEqual(response.status_code, 400)
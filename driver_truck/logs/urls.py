@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import DutyLogViewSet, HOSViolationViewSet
+
+router = DefaultRouter()
+router.register(r'duty-logs', DutyLogViewSet)
+router.register(r'hos-violations', HOSViolationViewSet)
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,185 @@
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import date, datetime, timedelta
+from trips.views import local_day_start
+from .models import DutyLog, HOSViolation
+from .serializers import (
+    DutyLogSerializer, DutyLogListSerializer,
+    HOSViolationSerializer, HOSClockSerializer
+)
+from .services import close_open_logs, driver_clocks, evaluate_violations
+
+
+def parse_driver_ids(value):
+    """
+    Driver ids from ``?driver=1,2,3``, or None when absent or malformed
+    """
+    try:
+        return [int(part) for part in value.split(',')] if value else None
+    except ValueError:
+        return None
+
+
+class DutyLogViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for DutyLog model
+    """
+    queryset = DutyLog.objects.all()
+    permission_classes = [IsAuthenticated]
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return DutyLogListSerializer
+        return DutyLogSerializer
+    
+    def get_queryset(self):
+        queryset = DutyLog.objects.select_related('driver')
+        
+        # Filter by driver
+        driver_id = self.request.query_params.get('driver')
+        if driver_id:
+            queryset = queryset.filter(driver_id=driver_id)
+        
+        # Filter by status
+        status_param = self.request.query_params.get('status')
+        if status_param:
+            queryset = queryset.filter(status=status_param)
+        
+        # Filter by date range, as half-open local-midnight bounds
+        start_date = self.request.query_params.get('start_date')
+        if start_date:
+            try:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+                queryset = queryset.filter(start_time__gte=local_day_start(start_date))
+            except ValueError:
+                pass
+        
+        end_date = self.request.query_params.get('end_date')
+        if end_date:
+            try:
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+                if end_date < date.max:
+                    queryset = queryset.filter(start_time__lt=local_day_start(end_date + timedelta(days=1)))
+            except ValueError:
+                pass
+        
+        return queryset.order_by('-start_time')
+    
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        with transaction.atomic():
+            # A new open status ends the driver's current one
+            if data.get('end_time') is None:
+                start_time = data.get('start_time') or timezone.now()
+                serializer.validated_data['start_time'] = start_time
+                close_open_logs(data['driver'].pk, start_time)
+            log = serializer.save()
+        evaluate_violations([log.driver_id])
+    
+    def perform_update(self, serializer):
+        log = serializer.save()
+        evaluate_violations([log.driver_id])
+    
+    def perform_destroy(self, instance):
+        driver_id = instance.driver_id
+        instance.delete()
+        evaluate_violations([driver_id])
+    
+    @action(detail=False, methods=['get'])
+    def current(self, request):
+        """
+        Get the open duty log of each driver
+        """
+        logs = self.get_queryset().filter(end_time__isnull=True)
+        serializer = DutyLogListSerializer(logs, many=True)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'], url_path='hos-status')
+    def hos_status(self, request):
+        """
+        Hours left on each HOS clock for ``?driver=`` (comma-separated ids)
+        """
+        driver_ids = parse_driver_ids(request.query_params.get('driver'))
+        if not driver_ids:
+            return Response(
+                {'error': 'driver is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            as_of = parse_datetime(request.query_params.get('as_of') or '')
+        except ValueError:
+            # Well-formed but out of range, such as month 13
+            return Response(
+                {'error': 'as_of must be a valid ISO 8601 datetime'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if as_of and timezone.is_naive(as_of):
+            as_of = timezone.make_aware(as_of)
+        try:
+            clocks = driver_clocks(driver_ids, as_of)
+        except OverflowError:
+            # Too early to look back a full HOS cycle from
+            return Response(
+                {'error': 'as_of is out of range'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = HOSClockSerializer(
+            [{'driver': driver_id, **clock._asdict()} for driver_id, clock in clocks.items()],
+            many=True
+        )
+        return Response(serializer.data)
+
+
+class HOSViolationViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    ViewSet for HOS violations; rows are written by the compliance engine
+    """
+    queryset = HOSViolation.objects.all()
+    serializer_class = HOSViolationSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = HOSViolation.objects.select_related('driver')
+        
+        # Filter by driver
+        driver_id = self.request.query_params.get('driver')
+        if driver_id:
+            queryset = queryset.filter(driver_id=driver_id)
+        
+        # Filter by rule
+        violation_type = self.request.query_params.get('type')
+        if violation_type:
+            queryset = queryset.filter(violation_type=violation_type)
+        
+        # Filter by occurrence time
+        since = parse_datetime(self.request.query_params.get('since') or '')
+        if since:
+            queryset = queryset.filter(occurred_at__gte=since)
+        
+        return queryset.order_by('-occurred_at')
+    
+    @action(detail=False, methods=['post'])
+    def evaluate(self, request):
+        """
+        Re-check HOS rules over the last ``days`` (default 8) for ``driver`` or the whole fleet
+        """
+        driver_ids = parse_driver_ids(request.data.get('driver') and str(request.data['driver']))
+        try:
+            days = int(request.data.get('days', 8))
+        except (TypeError, ValueError):
+            days = 0
+        if not 1 <= days <= 31:
+            return Response(
+                {'error': 'days must be between 1 and 31'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        as_of = timezone.now()
+        violations = evaluate_violations(driver_ids, since=as_of - timedelta(days=days), as_of=as_of)
+        return Response({'violations': len(violations)})
@@ -0,0 +1,197 @@
+"""
+In-process fan-out broker for the trip event stream
+
+Writers (signal handlers, bulk ingestion, trip transitions) publish from
+any thread. Each subscriber owns a bounded asyncio.Queue on its event
+loop. A subscriber whose queue fills up is cut off instead of slowing
+everybody down; it reconnects with Last-Event-ID and replays the missed
+messages from the broker's history ring. Keep-alives come from one timer
+thread for all subscribers, so an idle stream costs no per-connection
+timer. Only subscribers connected to the
+same process see a message, so run writes and streams in one ASGI worker
+or put a shared bus in front of the broker.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+OVERFLOW = object()
+HEARTBEAT = object()
+
+
+def encode_frame(message_id, event, data):
+    """
+    Server-Sent Events wire format, encoded once and shared by all subscribers
+    """
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f'id: {message_id}\nevent: {event}\ndata: {payload}\n\n'.encode('utf-8')
+
+
+class Message:
+    __slots__ = ('id', 'event', 'frame', 'trip_id', 'driver_id', 'carrier')
+
+    def __init__(self, message_id, event, frame, trip_id=None, driver_id=None, carrier=None):
+        self.id = message_id
+        self.event = event
+        self.frame = frame
+        self.trip_id = trip_id
+        self.driver_id = driver_id
+        self.carrier = carrier
+
+
+class Subscription:
+    def __init__(self, loop, queue_size, trip_id=None, driver_id=None, carrier=None):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.trip_id = trip_id
+        self.driver_id = driver_id
+        self.carrier = carrier.lower() if carrier else None
+        self.closed = False
+
+    @property
+    def needs_owner(self):
+        return self.driver_id is not None or self.carrier is not None
+
+    def matches(self, message):
+        return (
+            (self.trip_id is None or message.trip_id == self.trip_id)
+            and (self.driver_id is None or message.driver_id == self.driver_id)
+            and (self.carrier is None or (message.carrier or '').lower() == self.carrier)
+        )
+
+    def offer(self, message):
+        """
+        Enqueue on the subscriber's loop; cut the subscriber off when full
+        """
+        if self.closed or (message is HEARTBEAT and not self.queue.empty()):
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+
+def deliver(message, subscriptions):
+    for subscription in subscriptions:
+        subscription.offer(message)
+
+
+class EventBroker:
+    """
+    Fan-out hub with a bounded replay history
+
+    Message IDs start from the wall clock so Last-Event-ID values stay
+    ordered across process restarts. Driver and carrier of a trip are only
+    looked up (through ``owner_resolver``) when a subscriber filters on them.
+    """
+
+    def __init__(self, history_size=None, queue_size=None, heartbeat_interval=None,
+                 owner_resolver=None, owner_cache_size=10000):
+        self.history = deque(maxlen=history_size or getattr(settings, 'EVENT_STREAM_HISTORY', 5000))
+        self.queue_size = queue_size or getattr(settings, 'EVENT_STREAM_QUEUE_SIZE', 256)
+        self.heartbeat_interval = heartbeat_interval or getattr(settings, 'EVENT_STREAM_HEARTBEAT', 15)
+        self.heartbeat_thread = None
+        self.owner_resolver = owner_resolver
+        self.owner_cache = OrderedDict()
+        self.owner_cache_size = owner_cache_size
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.ids = itertools.count(int(time.time() * 1000) * 1000)
+
+    def publish(self, event, data, trip_id=None, driver_id=None, carrier=None):
+        message = Message(None, event, b'', trip_id, driver_id, carrier)
+        with self.lock:
+            message.id = next(self.ids)
+            message.frame = encode_frame(message.id, event, data)
+            self.history.append(message)
+            subscribers = list(self.subscribers)
+
+        if any(sub.needs_owner for sub in subscribers):
+            self.resolve_owner(message)
+        self.dispatch(message, [sub for sub in subscribers if sub.matches(message)])
+        return message
+
+    def dispatch(self, message, subscriptions):
+        """
+        Hand ``message`` to each subscription's loop, one wake-up per loop
+        """
+        by_loop = {}
+        for subscription in subscriptions:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, targets in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(deliver, message, targets)
+            except RuntimeError:
+                # The loop closed without the stream unsubscribing
+                for subscription in targets:
+                    self.unsubscribe(subscription)
+
+    def heartbeat(self):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        self.dispatch(HEARTBEAT, subscribers)
+
+    def run_heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            self.heartbeat()
+
+    def subscribe(self, loop, trip_id=None, driver_id=None, carrier=None, last_event_id=None):
+        """
+        Register a subscriber whose queue lives on ``loop``
+
+        Returns the subscription and the matching history messages newer
+        than ``last_event_id``. May query the database, so async callers
+        should run it through sync_to_async.
+        """
+        subscription = Subscription(loop, self.queue_size, trip_id, driver_id, carrier)
+        with self.lock:
+            self.subscribers.add(subscription)
+            if self.heartbeat_thread is None:
+                self.heartbeat_thread = threading.Thread(
+                    target=self.run_heartbeat, name='event-stream-heartbeat', daemon=True
+                )
+                self.heartbeat_thread.start()
+            history = [m for m in self.history if last_event_id is not None and m.id > last_event_id]
+
+        if subscription.needs_owner:
+            for message in history:
+                self.resolve_owner(message)
+        return subscription, [message for message in history if subscription.matches(message)]
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+        subscription.closed = True
+
+    def resolve_owner(self, message):
+        if message.driver_id is not None or message.trip_id is None or self.owner_resolver is None:
+            return
+        with self.lock:
+            owner = self.owner_cache.get(message.trip_id)
+        if owner is None:
+            # Resolved outside the lock; it may query the database
+            owner = self.owner_resolver(message.trip_id)
+            with self.lock:
+                self.owner_cache[message.trip_id] = owner
+                while len(self.owner_cache) > self.owner_cache_size:
+                    self.owner_cache.popitem(last=False)
+        message.driver_id, message.carrier = owner
+
+    def forget_owner(self, trip_id):
+        with self.lock:
+            self.owner_cache.pop(trip_id, None)
+
+    @property
+    def subscriber_count(self):
+        return len(self.subscribers)
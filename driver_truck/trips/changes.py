@@ -0,0 +1,204 @@
+"""
+Change sequence for the delta-sync feed (``GET /api/sync/``)
+
+Every insert, update or delete of a Trip, TripStop, TripEvent, Vehicle or
+Driver replaces that row's SyncChange entry with a new one whose auto-increment
+id is higher than any before it. A client keeps the last id it saw as
+its token and later asks for entries above it. The answer is bounded by
+the number of rows changed since, not by history: a row changed ten
+times still has one entry.
+
+Entries carry the owning driver (the trip's driver, the vehicle's
+assigned driver, or the driver row itself). When a row moves to another driver, the previous owner
+gets a tombstone, so their copy disappears on the next sync.
+
+Signal handlers cover ``save()``/``delete()``. The bulk write paths
+(``record_events``, ``apply_checkpoints``, trip transitions and the fleet
+generator) call ``record_changes`` or ``record_inserted`` themselves.
+Writes are serialized on SQLite, so ids become visible in order. The
+latest id also serves as the database-wide change marker for conditional
+GET (driver_truck/conditional.py); driver rows are recorded for that
+alone and are not part of the feed.
+"""
+from contextvars import ContextVar
+
+from django.db import connections, transaction
+from django.db.models import Max, Value
+from django.utils import timezone
+
+from drivers.models import Driver, Vehicle
+from .models import SyncChange, Trip, TripEvent, TripStop
+
+
+LABELS = {Trip: 'trip', TripStop: 'trip_stop', TripEvent: 'trip_event', Vehicle: 'vehicle', Driver: 'driver'}
+OWNER_PATHS = {Trip: 'driver_id', TripStop: 'trip__driver_id', TripEvent: 'trip__driver_id',
+               Vehicle: 'assigned_driver_id', Driver: 'pk'}
+FEED_LABELS = ('trip', 'trip_stop', 'trip_event', 'vehicle')
+
+# (origin and transaction of the delete() call, {(label, pk)} of rows record_deletion covered)
+_recorded = ContextVar('sync_recorded_deletions', default=None)
+
+
+def owners(model, objs):
+    """
+    ``{pk: driver_id}`` for ``objs``; stops and events are owned through their trip
+    """
+    if model is Trip:
+        return {obj.pk: obj.driver_id for obj in objs}
+    if model is Vehicle:
+        return {obj.pk: obj.assigned_driver_id for obj in objs}
+    if model is Driver:
+        return {obj.pk: obj.pk for obj in objs}
+    drivers = {obj.trip_id: obj.trip.driver_id for obj in objs if model.trip.is_cached(obj)}
+    missing = {obj.trip_id for obj in objs} - drivers.keys()
+    if missing:
+        drivers.update(Trip.objects.filter(id__in=missing).values_list('id', 'driver_id'))
+    return {obj.pk: drivers.get(obj.trip_id) for obj in objs}
+
+
+def record_changes(model, objs, deleted=False, created=False, batch_size=2000):
+    """
+    Give saved (or just deleted) ``objs`` new entries at the end of the sequence
+
+    ``created`` skips looking up entries that new rows cannot have yet.
+    Stops and events follow a trip that moves to another driver.
+    """
+    objs = [obj for obj in objs if obj.pk is not None]
+    if not objs:
+        return
+    label = LABELS[model]
+    previous = []
+    if not created:
+        pks = [obj.pk for obj in objs]
+        for start in range(0, len(pks), batch_size):
+            previous.extend(
+                SyncChange.objects.filter(model=label, object_id__in=pks[start:start + batch_size])
+                .values_list('id', 'object_id', 'driver_id', 'deleted')
+            )
+    moved = set()
+    if deleted:
+        # Everyone who was shown the row gets a tombstone
+        audience = {(pk, driver) for _, pk, driver, gone in previous if not gone}
+        seen = {pk for _, pk, _, _ in previous}
+        audience.update(owners(model, [obj for obj in objs if obj.pk not in seen]).items())
+        entries = dict.fromkeys(audience, True)
+    else:
+        current = owners(model, objs)
+        entries = {(pk, driver): False for pk, driver in current.items()}
+        for _, pk, driver, gone in previous:
+            if not gone and driver != current[pk]:
+                entries[(pk, driver)] = True
+                moved.add(pk)
+
+    now = timezone.now()
+    stale = [entry_id for entry_id, pk, driver, _ in previous if (pk, driver) in entries]
+    with transaction.atomic(savepoint=False):
+        for start in range(0, len(stale), batch_size):
+            SyncChange.objects.filter(id__in=stale[start:start + batch_size]).delete()
+        SyncChange.objects.bulk_create(
+            [SyncChange(model=label, object_id=pk, driver_id=driver, deleted=gone, changed_at=now)
+             for (pk, driver), gone in entries.items()],
+            batch_size=batch_size,
+        )
+        if model is Trip and moved:
+            for child in (TripStop, TripEvent):
+                rows = (child.objects.filter(trip_id__in=moved).select_related('trip')
+                        .only('id', 'trip__driver_id').order_by())
+                record_changes(child, rows, batch_size=batch_size)
+
+
+def record_deletion(model, objs, origin=None, batch_size=2000):
+    """
+    Tombstones for Trips or Drivers about to be deleted and their whole cascade
+
+    Called from pre_delete with one query set per model, instead of the
+    two queries per row that post_delete would cost. ``origin`` is the
+    instance or queryset ``delete()`` was called on; rows already recorded
+    for the same call are skipped here and in post_delete (see
+    ``already_recorded``). A deleted driver's vehicles are left
+    unassigned, so its copies of them go too.
+    """
+    objs = list(objs)
+    # The delete() call's own transaction; a retry after a rollback gets a new one
+    connection = transaction.get_connection()
+    block = connection.atomic_blocks[-1] if connection.atomic_blocks else None
+    state = _recorded.get()
+    if state is None or state[0] is not origin or state[1] is not block:
+        state = (origin, block, set())
+        _recorded.set(state)
+    pending = state[2]
+    objs = [obj for obj in objs if (LABELS[model], obj.pk) not in pending]
+    if not objs:
+        return
+    groups = [(model, objs)]
+    trips, children = objs, {'trip__in': objs}
+    if model is Driver:
+        trips = list(Trip.objects.filter(driver__in=objs).only('id', 'driver_id').order_by())
+        groups.append((Trip, trips))
+        children = {'trip__driver__in': objs}
+    drivers = {trip.pk: trip.driver_id for trip in trips}
+    for child in (TripStop, TripEvent):
+        rows = list(child.objects.filter(**children).only('id', 'trip_id').order_by())
+        for row in rows:
+            # Owners without another query per model
+            row.trip = Trip(pk=row.trip_id, driver_id=drivers[row.trip_id])
+        groups.append((child, rows))
+
+    with transaction.atomic(savepoint=False):
+        for group_model, rows in groups:
+            record_changes(group_model, rows, deleted=True, batch_size=batch_size)
+            pending.update((LABELS[group_model], row.pk) for row in rows)
+        if model is Driver:
+            vehicles = list(Vehicle.objects.filter(assigned_driver__in=objs).only('id'))
+            for vehicle in vehicles:
+                vehicle.assigned_driver_id = None
+            record_changes(Vehicle, vehicles, batch_size=batch_size)
+
+
+def already_recorded(model, pk):
+    """
+    Whether ``record_deletion`` covered this row; forgets it either way
+    """
+    state = _recorded.get()
+    key = (LABELS[model], pk)
+    if state and key in state[2]:
+        state[2].discard(key)
+        return True
+    return False
+
+
+def record_inserted(model, queryset):
+    """
+    Entries for every row of ``queryset`` with one INSERT ... SELECT
+
+    For rows written in bulk that have no entries yet, such as a freshly
+    generated fleet.
+    """
+    select = queryset.order_by('pk').annotate(
+        sync_model=Value(LABELS[model]), sync_deleted=Value(False), sync_changed_at=Value(timezone.now()),
+    ).values_list('pk', OWNER_PATHS[model], 'sync_model', 'sync_deleted', 'sync_changed_at')
+    sql, params = select.query.sql_with_params()
+    connection = connections[SyncChange.objects.db]
+    columns = ', '.join(connection.ops.quote_name(column)
+                        for column in ('object_id', 'driver_id', 'model', 'deleted', 'changed_at'))
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {connection.ops.quote_name(SyncChange._meta.db_table)} ({columns}) {sql}', params)
+
+
+def current_token():
+    return SyncChange.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def changes_since(since, driver_id=None, limit=1000, live_only=False):
+    """
+    Up to ``limit`` entries after ``since``, oldest first, plus whether more remain
+
+    ``live_only`` leaves out tombstones, for snapshots.
+    """
+    entries = SyncChange.objects.filter(id__gt=since, model__in=FEED_LABELS).order_by('id')
+    if driver_id is not None:
+        entries = entries.filter(driver_id=driver_id)
+    if live_only:
+        entries = entries.filter(deleted=False)
+    entries = list(entries.values_list('id', 'model', 'object_id', 'deleted')[:limit + 1])
+    return entries[:limit], len(entries) > limit
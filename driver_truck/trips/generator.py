@@ -0,0 +1,360 @@
+"""
+Synthetic fleet generator behind ``manage.py generate_fleet``
+
+Every driver gets one assigned vehicle and a back-to-back sequence of
+trips between real city pairs. Each trip follows a gently curved route,
+with stops placed along it and, once started, a time-ordered trail of
+located events. All randomness for a driver comes from a generator
+seeded with ``(seed, driver index)``, and primary keys are derived from
+the same index, so the output does not depend on how drivers are split
+across worker processes.
+
+Worker processes build model instances and turn them into database
+values exactly as bulk_create would; the parent inserts those rows with
+executemany, one transaction per chunk of drivers. Signals do not fire,
+so ``finish`` brings the derived tables and the response cache up to
+date afterwards.
+"""
+import hashlib
+import math
+import multiprocessing
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from operator import attrgetter
+from typing import NamedTuple
+
+from django.core.management.color import no_style
+from django.db import connections, transaction
+
+from driver_truck.caching import invalidate
+from drivers.models import Driver, Vehicle
+from . import lanes, rollups
+from .changes import record_inserted
+from .geo import haversine_miles
+from .models import Trip, TripEvent, TripStop
+from .services import update_positions
+
+
+CITIES = [
+    ('Atlanta', 'GA', '30303', 33.748995, -84.387982),
+    ('Nashville', 'TN', '37201', 36.162664, -86.781602),
+    ('Chattanooga', 'TN', '37402', 35.045631, -85.309677),
+    ('Memphis', 'TN', '38103', 35.149534, -90.048980),
+    ('Charlotte', 'NC', '28202', 35.227087, -80.843127),
+    ('Raleigh', 'NC', '27601', 35.779590, -78.638179),
+    ('Columbia', 'SC', '29201', 34.000710, -81.034814),
+    ('Savannah', 'GA', '31401', 32.080899, -81.091203),
+    ('Jacksonville', 'FL', '32202', 30.332184, -81.655651),
+    ('Orlando', 'FL', '32801', 28.538336, -81.379234),
+    ('Tampa', 'FL', '33602', 27.950575, -82.457178),
+    ('Birmingham', 'AL', '35203', 33.518589, -86.810356),
+    ('Montgomery', 'AL', '36104', 32.366805, -86.299969),
+    ('Jackson', 'MS', '39201', 32.298757, -90.184810),
+    ('New Orleans', 'LA', '70112', 29.951066, -90.071532),
+    ('Louisville', 'KY', '40202', 38.252665, -85.758456),
+    ('Lexington', 'KY', '40507', 38.040584, -84.503716),
+    ('Cincinnati', 'OH', '45202', 39.103118, -84.512020),
+    ('Columbus', 'OH', '43215', 39.961176, -82.998794),
+    ('Indianapolis', 'IN', '46204', 39.768403, -86.158068),
+    ('St. Louis', 'MO', '63101', 38.627003, -90.199404),
+    ('Little Rock', 'AR', '72201', 34.746481, -92.289595),
+    ('Dallas', 'TX', '75201', 32.776664, -96.796988),
+    ('Houston', 'TX', '77002', 29.760427, -95.369803),
+    ('Richmond', 'VA', '23219', 37.540725, -77.436048),
+    ('Knoxville', 'TN', '37902', 35.960638, -83.920739),
+]
+
+STOP_TYPES = ['fuel', 'rest', 'inspection']
+TRAIL_EVENTS = (('other', 80), ('fuel', 8), ('delay', 7), ('inspection', 5))
+ROAD_FACTOR = 1.2
+MAKES = ['Freightliner', 'Kenworth', 'Peterbilt', 'Volvo', 'International', 'Mack']
+COORDINATE = Decimal('0.000001')
+
+
+class FleetSpec(NamedTuple):
+    """
+    Shape of the fleet and the primary keys its rows start from
+    """
+    drivers: int
+    trips_per_driver: int
+    stops_per_trip: int
+    events_per_trip: int
+    seed: int
+    start: datetime
+    prefix: str
+    bases: dict
+
+
+def coordinate(value):
+    return Decimal(value).quantize(COORDINATE)
+
+
+def route_point(origin, destination, bend, fraction):
+    """
+    Point at ``fraction`` along a route bowed sideways by ``bend`` degrees
+    """
+    lat = origin[3] + (destination[3] - origin[3]) * fraction
+    lon = origin[4] + (destination[4] - origin[4]) * fraction
+    dlat, dlon = destination[3] - origin[3], destination[4] - origin[4]
+    length = math.hypot(dlat, dlon) or 1.0
+    offset = bend * math.sin(math.pi * fraction)
+    return coordinate(lat - dlon / length * offset), coordinate(lon + dlat / length * offset)
+
+
+def vehicle_vin(prefix, index):
+    """
+    17-character VIN, unique per (prefix, index)
+
+    An X separates the prefix from the zero-padded index. Neither the digits
+    nor the digest contain an X, so no two prefixes can produce the same VIN.
+    A prefix too long to leave room for the index is replaced by a digest
+    of it, followed by a Z instead.
+    """
+    if len(prefix) <= 6:
+        head = f'{prefix}X'
+    else:
+        head = f'{hashlib.sha1(prefix.encode()).hexdigest()[:6].upper()}Z'
+    return f'{head}{index:0{17 - len(head)}d}'
+
+
+def vehicle_plate(prefix, index):
+    return f'{prefix}-{index:07d}'
+
+
+def driver_rows(spec, index):
+    """
+    Unsaved (driver, vehicle, trips, stops, events) for one driver
+    """
+    rng = random.Random(f'{spec.seed}:{index}')
+    bases = spec.bases
+    driver = Driver(
+        pk=bases['driver'] + index, username=f'{spec.prefix.lower()}{index:07d}', password='!',
+        driver_license=f'{spec.prefix}{index:09d}', first_name=rng.choice(['Alex', 'Sam', 'Jordan', 'Casey', 'Riley']),
+        last_name=f'Driver {index}', employee_id=f'{spec.prefix}-E{index:07d}', carrier_name=f'Carrier {index % 25}',
+        date_joined=spec.start,
+    )
+    vehicle = Vehicle(
+        pk=bases['vehicle'] + index, license_plate=vehicle_plate(spec.prefix, index), vin=vehicle_vin(spec.prefix, index),
+        make=rng.choice(MAKES), model='Tractor', year=rng.randint(2014, 2025), assigned_driver_id=driver.pk,
+    )
+
+    trips, stops, events = [], [], []
+    moment = spec.start + timedelta(hours=rng.randint(0, 48))
+    in_progress = max(spec.trips_per_driver - 2, 0)
+    for number in range(spec.trips_per_driver):
+        sequence = index * spec.trips_per_driver + number
+        origin, destination = rng.sample(CITIES, 2)
+        miles = float(haversine_miles(origin[3], origin[4], [destination[3]], [destination[4]])[0]) * ROAD_FACTOR
+        hours = miles / rng.uniform(45, 58) + 0.5 * spec.stops_per_trip
+        bend = rng.uniform(-0.4, 0.4)
+        if number < in_progress:
+            status = 'cancelled' if rng.random() < 0.04 else 'completed'
+        else:
+            status = 'in_progress' if number == in_progress else 'planned'
+
+        trip = Trip(
+            pk=bases['trip'] + sequence, driver_id=driver.pk, trip_number=f'{spec.prefix}{index:07d}-{number:04d}',
+            status=status,
+            origin_address=f'{rng.randint(100, 9999)} Industrial Blvd', origin_city=origin[0], origin_state=origin[1],
+            origin_zip=origin[2], origin_latitude=coordinate(origin[3]), origin_longitude=coordinate(origin[4]),
+            destination_address=f'{rng.randint(100, 9999)} Commerce Dr', destination_city=destination[0],
+            destination_state=destination[1], destination_zip=destination[2],
+            destination_latitude=coordinate(destination[3]), destination_longitude=coordinate(destination[4]),
+            planned_start_time=moment, planned_end_time=moment + timedelta(hours=hours),
+            estimated_distance=Decimal(miles).quantize(Decimal('0.01')),
+            load_description=rng.choice(['Dry goods', 'Refrigerated produce', 'Building materials', 'Paper products']),
+            load_weight=rng.randint(8000, 44000),
+        )
+        trip.update_grid_cells()
+        # Share of the route covered; an in-progress trip is somewhere along it
+        progress, duration = 0.0, timedelta(hours=hours)
+        if status in ('completed', 'in_progress'):
+            trip.actual_start_time = moment + timedelta(minutes=rng.randint(-20, 60))
+            progress = 1.0 if status == 'completed' else rng.uniform(0.2, 0.8)
+            duration *= rng.uniform(0.9, 1.2)
+        if status == 'completed':
+            trip.actual_end_time = trip.actual_start_time + duration
+            trip.actual_distance = (trip.estimated_distance * Decimal(rng.uniform(0.97, 1.08))).quantize(Decimal('0.01'))
+        trips.append(trip)
+
+        for order in range(1, spec.stops_per_trip + 1):
+            fraction = order / (spec.stops_per_trip + 1)
+            latitude, longitude = route_point(origin, destination, bend, fraction)
+            arrival = moment + timedelta(hours=hours) * fraction
+            near = origin if fraction < 0.5 else destination
+            stop = TripStop(
+                pk=bases['stop'] + sequence * spec.stops_per_trip + order - 1, trip_id=trip.pk,
+                stop_type=STOP_TYPES[rng.randrange(len(STOP_TYPES))], stop_order=order,
+                address=f'Exit {rng.randint(1, 400)}', city=near[0], state=near[1],
+                zip_code=near[2], latitude=latitude, longitude=longitude,
+                planned_arrival=arrival, planned_departure=arrival + timedelta(minutes=30),
+            )
+            if fraction <= progress:
+                stop.actual_arrival = trip.actual_start_time + duration * fraction
+                stop.actual_departure = stop.actual_arrival + timedelta(minutes=rng.randint(15, 45))
+                stop.is_completed = True
+            stop.update_grid_cell()
+            stops.append(stop)
+
+        count = round(spec.events_per_trip * progress)
+        types, weights = zip(*TRAIL_EVENTS)
+        for position in range(count):
+            fraction = position / max(spec.events_per_trip - 1, 1)
+            latitude, longitude = route_point(origin, destination, bend, fraction)
+            if position == 0:
+                event_type = 'start'
+            elif status == 'completed' and position == count - 1:
+                event_type = 'complete'
+            else:
+                event_type = rng.choices(types, weights)[0]
+            event = TripEvent(
+                pk=bases['event'] + sequence * spec.events_per_trip + position, trip_id=trip.pk,
+                event_type=event_type, event_time=trip.actual_start_time + duration * fraction,
+                location=f'{origin[0]} -> {destination[0]}', latitude=latitude, longitude=longitude,
+                description=dict(TripEvent.EVENT_TYPES)[event_type],
+                additional_data={'speed': rng.randint(0, 70), 'odometer': round(miles * fraction, 1)},
+            )
+            event.update_grid_cell()
+            events.append(event)
+
+        end = trip.actual_end_time or trip.planned_end_time
+        moment = end + timedelta(hours=rng.randint(10, 36))
+    return driver, vehicle, trips, stops, events
+
+
+# Insert order (parents first) and the names row counts are reported under
+MODELS = {Driver: 'drivers', Vehicle: 'vehicles', Trip: 'trips', TripStop: 'stops', TripEvent: 'events'}
+
+
+def prepare(model, objs):
+    """
+    Database-ready value tuples for ``objs``, in concrete field order
+
+    Does what bulk_create does per value (pre_save, then get_db_prep_save)
+    without building an INSERT statement per batch.
+    """
+    connection = connections[model.objects.db]
+    # Only auto_now(_add) fields do more in pre_save than read the attribute
+    getters = [
+        (lambda obj, field=field: field.pre_save(obj, True)) if getattr(field, 'auto_now_add', False)
+        or getattr(field, 'auto_now', False) else attrgetter(field.attname)
+        for field in model._meta.concrete_fields
+    ]
+    preparers = [(get, field.get_db_prep_save) for get, field in zip(getters, model._meta.concrete_fields)]
+    return [tuple(prep(get(obj), connection) for get, prep in preparers) for obj in objs]
+
+
+def prepare_chunk(spec, first, last):
+    """
+    Prepared rows per model for drivers ``first``..``last - 1``
+    """
+    rows = {model: [] for model in MODELS}
+    for index in range(first, last):
+        driver, vehicle, trips, stops, events = driver_rows(spec, index)
+        for model, objs in zip(MODELS, ([driver], [vehicle], trips, stops, events)):
+            rows[model].extend(prepare(model, objs))
+    return rows
+
+
+def insert(model, rows, batch_size=5000):
+    connection = connections[model.objects.db]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(model._meta.db_table),
+        ', '.join(connection.ops.quote_name(field.column) for field in model._meta.concrete_fields),
+        ', '.join(['%s'] * len(model._meta.concrete_fields)),
+    )
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[offset:offset + batch_size])
+
+
+def next_ids():
+    """
+    First free primary key per model, so a new fleet can be added to existing data
+    """
+    models = {'driver': Driver, 'vehicle': Vehicle, 'trip': Trip, 'stop': TripStop, 'event': TripEvent}
+    return {
+        name: (model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+        for name, model in models.items()
+    }
+
+
+def chunks(drivers, size):
+    return [(first, min(first + size, drivers)) for first in range(0, drivers, size)]
+
+
+def init_worker(databases):
+    """
+    Point a worker process at the parent's databases (spawned workers re-read settings)
+    """
+    import django
+    from django.conf import settings
+
+    settings.DATABASES = databases
+    django.setup()
+
+
+def _prepare_chunk(args):
+    return prepare_chunk(*args)
+
+
+def generate(spec, workers=1, chunk_size=50, batch_size=5000, progress=None):
+    """
+    Write the whole fleet; returns row counts per model name
+
+    Workers only build and prepare rows; this process inserts them, one
+    transaction per chunk and in chunk order, so SQLite never sees two
+    writers and the result is the same for any number of workers.
+    ``progress`` is called with the running totals after each chunk.
+    """
+    from django.conf import settings
+
+    totals = dict.fromkeys(MODELS.values(), 0)
+    tasks = [(spec, first, last) for first, last in chunks(spec.drivers, chunk_size)]
+    pool = None
+    if workers > 1:
+        connections.close_all()
+        pool = multiprocessing.Pool(workers, initializer=init_worker, initargs=(settings.DATABASES,))
+    try:
+        for rows in pool.imap(_prepare_chunk, tasks) if pool else map(_prepare_chunk, tasks):
+            with transaction.atomic():
+                for model, name in MODELS.items():
+                    insert(model, rows[model], batch_size)
+                    totals[name] += len(rows[model])
+            if progress:
+                progress(totals)
+    finally:
+        if pool:
+            pool.terminate()
+    return totals
+
+
+def finish(spec, rebuild_stats=True):
+    """
+    Work that signals would have done: sequences, positions, sync feed, rollups, cache
+    """
+    # Explicit primary keys leave sequences behind on backends that have them
+    connection = connections[Trip.objects.db]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), list(MODELS)):
+            cursor.execute(sql)
+
+    first_trip = spec.bases['trip']
+    active = Trip.objects.filter(
+        pk__gte=first_trip, pk__lt=first_trip + spec.drivers * spec.trips_per_driver, status='in_progress'
+    ).values_list('pk', flat=True)
+    trip_ids = list(active)
+    for offset in range(0, len(trip_ids), 500):
+        with transaction.atomic():
+            update_positions(list(TripEvent.objects.filter(trip_id__in=trip_ids[offset:offset + 500])))
+
+    # One INSERT ... SELECT per model puts the new rows on the sync feed
+    for model, base in ((Driver, 'driver'), (Vehicle, 'vehicle'), (Trip, 'trip'), (TripStop, 'stop'),
+                        (TripEvent, 'event')):
+        record_inserted(model, model.objects.filter(pk__gte=spec.bases[base]))
+
+    if rebuild_stats:
+        rollups.rebuild()
+        lanes.rebuild()
+    invalidate('drivers', 'vehicles', 'trips', 'trip_stops', 'trip_events')
@@ -0,0 +1,192 @@
+"""
+Grid-cell spatial index for plain-SQLite proximity queries
+
+Each coordinate pair is mapped to an integer cell on a fixed 0.1 degree
+grid (``row * LON_CELLS + col``). Cells of one grid row are contiguous
+integers, so any bounding box becomes one indexed BETWEEN per row. Cell
+matches are candidates only; ``near`` results are refined with a
+haversine test evaluated by the database in the same query.
+"""
+import math
+from functools import reduce
+from operator import or_
+
+import numpy as np
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Cast, Cos, Power, Radians, Sin
+from django.db.models.lookups import LessThanOrEqual
+
+
+CELL_DEGREES = 0.1
+LAT_CELLS = int(round(180 / CELL_DEGREES))
+LON_CELLS = int(round(360 / CELL_DEGREES))
+EARTH_RADIUS_MI = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+
+# Beyond this many grid rows the OR of ranges costs more than it saves
+MAX_CELL_ROWS = 120
+DEFAULT_RADIUS_MI = 25
+MAX_RADIUS_MI = 500
+
+
+def grid_cell(latitude, longitude):
+    """
+    Integer grid cell for a coordinate pair, or None if either is missing
+    """
+    if latitude is None or longitude is None:
+        return None
+    row = min(int(math.floor((float(latitude) + 90) / CELL_DEGREES)), LAT_CELLS - 1)
+    col = int(math.floor((float(longitude) + 180) / CELL_DEGREES)) % LON_CELLS
+    return max(row, 0) * LON_CELLS + col
+
+
+def cell_ranges(min_lat, min_lon, max_lat, max_lon):
+    """
+    Inclusive (low, high) cell ranges covering a bounding box
+
+    Returns None when the box spans too many rows to be worth pruning.
+    Boxes with min_lon > max_lon wrap across the antimeridian.
+    """
+    first_row = grid_cell(min_lat, 0) // LON_CELLS
+    last_row = grid_cell(max_lat, 0) // LON_CELLS
+    if last_row - first_row + 1 > MAX_CELL_ROWS:
+        return None
+
+    first_col = grid_cell(0, min_lon) % LON_CELLS
+    last_col = grid_cell(0, max_lon) % LON_CELLS
+    if first_col <= last_col:
+        spans = [(first_col, last_col)]
+    else:
+        spans = [(first_col, LON_CELLS - 1), (0, last_col)]
+
+    return [
+        (row * LON_CELLS + low, row * LON_CELLS + high)
+        for row in range(first_row, last_row + 1)
+        for low, high in spans
+    ]
+
+
+def bbox_around(latitude, longitude, radius_mi):
+    """
+    (min_lat, min_lon, max_lat, max_lon) enclosing a circle
+    """
+    lat_delta = radius_mi / MILES_PER_DEGREE_LAT
+    min_lat = max(latitude - lat_delta, -90.0)
+    max_lat = min(latitude + lat_delta, 90.0)
+    widest = max(abs(min_lat), abs(max_lat))
+    if widest >= 89.9:
+        return min_lat, -180.0, max_lat, 180.0
+    lon_delta = min(radius_mi / (MILES_PER_DEGREE_LAT * math.cos(math.radians(widest))), 180.0)
+    return min_lat, wrap_longitude(longitude - lon_delta), max_lat, wrap_longitude(longitude + lon_delta)
+
+
+def wrap_longitude(longitude):
+    if longitude < -180 or longitude > 180:
+        return (longitude + 180) % 360 - 180
+    return longitude
+
+
+def haversine_miles(latitude, longitude, latitudes, longitudes):
+    """
+    Great-circle distance from one point to arrays of points, in miles
+    """
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(longitudes, dtype=np.float64) - longitude)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MI * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bbox_filter(lat_field, lon_field, cell_field, min_lat, min_lon, max_lat, max_lon):
+    """
+    Q object for points inside a bounding box, pruned by grid cell
+    """
+    condition = Q(**{f'{lat_field}__gte': min_lat, f'{lat_field}__lte': max_lat})
+    if min_lon <= max_lon:
+        condition &= Q(**{f'{lon_field}__gte': min_lon, f'{lon_field}__lte': max_lon})
+    else:
+        condition &= Q(**{f'{lon_field}__gte': min_lon}) | Q(**{f'{lon_field}__lte': max_lon})
+
+    ranges = cell_ranges(min_lat, min_lon, max_lat, max_lon)
+    if ranges:
+        condition &= reduce(or_, (Q(**{f'{cell_field}__range': span}) for span in ranges))
+    return condition
+
+
+def near_filter(lat_field, lon_field, cell_field, latitude, longitude, radius_mi):
+    """
+    Q object for points within ``radius_mi`` of a point
+
+    The bounding box and grid cells prune with the index; the haversine
+    test then runs in SQL on the survivors, so no candidate list makes the
+    round trip through Python, however large the radius.
+    """
+    box = bbox_around(latitude, longitude, radius_mi)
+    lat = Radians(Cast(lat_field, FloatField()))
+    lon = Radians(Cast(lon_field, FloatField()))
+    origin_lat, origin_lon = math.radians(latitude), math.radians(longitude)
+    # haversine(d) <= haversine(radius) is the same test as d <= radius
+    # without asin/sqrt
+    half_chord = (
+        Power(Sin((lat - Value(origin_lat)) / Value(2.0)), 2)
+        + Value(math.cos(origin_lat)) * Cos(lat) * Power(Sin((lon - Value(origin_lon)) / Value(2.0)), 2)
+    )
+    limit = math.sin(min(radius_mi / EARTH_RADIUS_MI, math.pi) / 2) ** 2
+    return bbox_filter(lat_field, lon_field, cell_field, *box) & Q(LessThanOrEqual(half_chord, Value(limit)))
+
+
+def parse_near(params):
+    """
+    (lat, lon, radius_mi) from ``?near=lat,lon&radius_mi=``, or None
+    """
+    try:
+        latitude, longitude = (float(part) for part in params['near'].split(','))
+        radius = float(params.get('radius_mi', DEFAULT_RADIUS_MI))
+    except (KeyError, ValueError):
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or radius <= 0:
+        return None
+    return latitude, longitude, min(radius, MAX_RADIUS_MI)
+
+
+def parse_bbox(params):
+    """
+    (min_lat, min_lon, max_lat, max_lon) from ``?bbox=west,south,east,north``, or None
+    """
+    try:
+        west, south, east, north = (float(part) for part in params['bbox'].split(','))
+    except (KeyError, ValueError):
+        return None
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        return None
+    return south, west, north, east
+
+
+class SpatialFilterMixin:
+    """
+    ViewSet mixin adding ``?near=lat,lon&radius_mi=`` and ``?bbox=`` filters
+
+    ``spatial_points`` lists (latitude, longitude, grid cell) field names;
+    a row matches when any of its points does.
+    """
+    spatial_points = ()
+
+    def filter_spatial(self, queryset):
+        params = self.request.query_params
+        near = parse_near(params)
+        bbox = parse_bbox(params)
+
+        if bbox:
+            queryset = queryset.filter(reduce(or_, (
+                bbox_filter(lat_field, lon_field, cell_field, *bbox)
+                for lat_field, lon_field, cell_field in self.spatial_points
+            )))
+
+        if near:
+            queryset = queryset.filter(reduce(or_, (
+                near_filter(lat_field, lon_field, cell_field, *near)
+                for lat_field, lon_field, cell_field in self.spatial_points
+            )))
+
+        return queryset
@@ -0,0 +1,138 @@
+"""
+Lane analytics cube: completed-trip totals per origin -> destination
+
+``rebuild`` pulls completed trips as columns (durations already reduced
+to integer seconds by the database) and groups them with NumPy, once per
+state pair and once per city pair. Between rebuilds,
+``record_trip_completed`` increments the two rows a newly completed trip
+belongs to, in the caller's transaction.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from driver_truck.caching import invalidate
+from driver_truck.expressions import EpochSeconds
+from .models import LaneStats, Trip
+from .rollups import increment
+
+
+STATE_KEYS = ('origin_state', 'destination_state')
+CITY_KEYS = STATE_KEYS + ('origin_city', 'destination_city')
+MEASURES = ('total_miles', 'planned_seconds', 'actual_seconds', 'on_time_trips')
+CUBE_FIELDS = CITY_KEYS + ('trips', 'on_time_trips', 'total_miles', 'planned_seconds', 'actual_seconds')
+
+
+def extract():
+    """
+    Completed trips as a dict of column arrays, keyed by CITY_KEYS and MEASURES
+    """
+    trips = Trip.objects.filter(
+        status='completed', actual_start_time__isnull=False, actual_end_time__isnull=False
+    )
+    rows = trips.order_by().values_list(
+        *CITY_KEYS,
+        Coalesce('actual_distance', 'estimated_distance'),
+        EpochSeconds('planned_end_time') - EpochSeconds('planned_start_time'),
+        EpochSeconds('actual_end_time') - EpochSeconds('actual_start_time'),
+        ExpressionWrapper(Q(actual_end_time__lte=F('planned_end_time')), output_field=BooleanField()),
+    )
+    sql, params = rows.query.sql_with_params()
+    with connections[rows.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = list(zip(*cursor.fetchall())) or [()] * (len(CITY_KEYS) + len(MEASURES))
+
+    extracted = {key: np.array(column, dtype=str) for key, column in zip(CITY_KEYS, columns)}
+    for name, column, dtype in zip(MEASURES, columns[len(CITY_KEYS):], (float, np.int64, np.int64, np.int64)):
+        extracted[name] = np.array(column, dtype=dtype)
+    return extracted
+
+
+def group_totals(columns, keys):
+    """
+    Trip count and MEASURES sums per distinct combination of ``keys``
+
+    Returns ``(labels, counts, sums)``: one tuple of key values, one count
+    and one dict of sums per group.
+    """
+    size = len(columns[keys[0]])
+    groups = np.zeros(size, dtype=np.int64)
+    first = np.zeros(0, dtype=np.int64)
+    for key in keys:
+        # Fold each key into a dense group id; re-densifying after every
+        # key keeps the combined codes far from overflowing
+        values, codes = np.unique(columns[key], return_inverse=True)
+        _, first, groups = np.unique(groups * len(values) + codes.reshape(-1), return_index=True, return_inverse=True)
+        groups = groups.reshape(-1)
+
+    counts = np.bincount(groups, minlength=len(first))
+    sums = {name: np.bincount(groups, weights=columns[name], minlength=len(first)) for name in MEASURES}
+    labels = list(zip(*(columns[key][first].tolist() for key in keys))) if size else []
+    return labels, counts, sums
+
+
+def build(columns):
+    """
+    Cube rows as tuples in CUBE_FIELDS order, state lanes first
+    """
+    cube = []
+    for keys in (STATE_KEYS, CITY_KEYS):
+        labels, counts, sums = group_totals(columns, keys)
+        blanks = ('',) * (len(CITY_KEYS) - len(keys))
+        cube.extend(zip(
+            (label + blanks for label in labels),
+            counts.tolist(),
+            sums['on_time_trips'].astype(np.int64).tolist(),
+            (Decimal(str(miles)) for miles in np.round(sums['total_miles'], 2).tolist()),
+            sums['planned_seconds'].astype(np.int64).tolist(),
+            sums['actual_seconds'].astype(np.int64).tolist(),
+        ))
+    return [(*label, *values) for label, *values in cube]
+
+
+def rebuild(batch_size=1000):
+    """
+    Replace the whole cube from the trips table; returns the number of rows
+
+    Rows go in through executemany rather than bulk_create, which spends
+    most of its time preparing values one field at a time.
+    """
+    cube = build(extract())
+    connection = connections[LaneStats.objects.db]
+    updated_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(LaneStats._meta.db_table),
+        ', '.join(connection.ops.quote_name(field) for field in CUBE_FIELDS + ('updated_at',)),
+        ', '.join(['%s'] * (len(CUBE_FIELDS) + 1)),
+    )
+    with transaction.atomic(using=connection.alias):
+        LaneStats.objects.all().delete()
+        with connection.cursor() as cursor:
+            for offset in range(0, len(cube), batch_size):
+                cursor.executemany(sql, [row + (updated_at,) for row in cube[offset:offset + batch_size]])
+        invalidate('lanes')
+    return len(cube)
+
+
+def record_trip_completed(trip):
+    if not (trip.actual_start_time and trip.actual_end_time):
+        return
+    miles = trip.actual_distance if trip.actual_distance is not None else trip.estimated_distance
+    changes = {
+        'trips': 1,
+        'on_time_trips': int(trip.actual_end_time <= trip.planned_end_time),
+        'total_miles': Decimal(str(miles)),
+        # Whole seconds, truncated the way EpochSeconds truncates
+        'planned_seconds': int(trip.planned_end_time.timestamp()) - int(trip.planned_start_time.timestamp()),
+        'actual_seconds': int(trip.actual_end_time.timestamp()) - int(trip.actual_start_time.timestamp()),
+    }
+    now = timezone.now()
+    for keys in (STATE_KEYS, CITY_KEYS):
+        lookup = {key: getattr(trip, key) for key in CITY_KEYS}
+        lookup.update({key: '' for key in CITY_KEYS if key not in keys})
+        increment(LaneStats, lookup, changes, now)
+    invalidate('lanes')
@@ -0,0 +1,81 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from drivers.models import Driver, Vehicle
+from trips.generator import FleetSpec, finish, generate, next_ids, vehicle_plate, vehicle_vin
+
+
+def parse_day(value):
+    try:
+        return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}, expected YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic fleet: drivers, vehicles, trips, stops and event trails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drivers', type=int, default=1000)
+        parser.add_argument('--trips-per-driver', type=int, default=50)
+        parser.add_argument('--stops-per-trip', type=int, default=3)
+        parser.add_argument('--events-per-trip', type=int, default=20,
+                            help='Trail length of a completed trip; in-progress trips get part of it')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--start', type=parse_day, help='Day the first trips start (YYYY-MM-DD)')
+        parser.add_argument('--prefix', default='GEN', help='Prefix for usernames, plates and trip numbers')
+        parser.add_argument('--workers', type=int, default=1, help='Processes generating rows in parallel')
+        parser.add_argument('--chunk-size', type=int, default=50, help='Drivers per transaction')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument('--skip-stats', action='store_true',
+                            help='Do not rebuild daily rollups and the lane cube afterwards')
+
+    def handle(self, *args, **options):
+        for name in ('drivers', 'trips_per_driver', 'workers', 'chunk_size', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1")
+        prefix = options['prefix']
+        if not prefix.isalnum():
+            raise CommandError('--prefix must be alphanumeric')
+        if Driver.objects.filter(username__regex=rf'^{prefix.lower()}[0-9]{{7}}$').exists():
+            raise CommandError(f'A fleet with prefix {prefix!r} already exists; pass another --prefix')
+        # Vehicles created by hand may already hold one of the generated identifiers
+        for first in range(0, options['drivers'], 500):
+            indexes = range(first, min(first + 500, options['drivers']))
+            taken = Vehicle.objects.filter(
+                Q(vin__in=[vehicle_vin(prefix, index) for index in indexes])
+                | Q(license_plate__in=[vehicle_plate(prefix, index) for index in indexes])
+            ).values_list('license_plate', flat=True).first()
+            if taken is not None:
+                raise CommandError(f'Vehicle {taken} already uses a VIN or plate from prefix {prefix!r}; pass another --prefix')
+
+        spec = FleetSpec(
+            drivers=options['drivers'],
+            trips_per_driver=options['trips_per_driver'],
+            stops_per_trip=options['stops_per_trip'],
+            events_per_trip=options['events_per_trip'],
+            seed=options['seed'],
+            start=options['start'] or parse_day('2025-01-06'),
+            prefix=prefix,
+            bases=next_ids(),
+        )
+        started = time.perf_counter()
+
+        def progress(totals):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{totals['drivers']}/{spec.drivers} drivers, {totals['trips']} trips, "
+                f"{totals['events']} events ({totals['events'] / elapsed:,.0f} events/s)"
+            )
+
+        totals = generate(spec, workers=options['workers'], chunk_size=options['chunk_size'],
+                          batch_size=options['batch_size'], progress=progress if options['verbosity'] > 1 else None)
+        finish(spec, rebuild_stats=not options['skip_stats'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {totals['drivers']} drivers, {totals['vehicles']} vehicles, {totals['trips']} trips, "
+            f"{totals['stops']} stops and {totals['events']} events in {time.perf_counter() - started:.1f}s"
+        ))
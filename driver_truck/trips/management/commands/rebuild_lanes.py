@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from trips.lanes import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the lane analytics cube from completed trips'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size=1000, **options):
+        rows = rebuild(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} lane rows'))
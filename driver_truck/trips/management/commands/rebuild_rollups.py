@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trips.rollups import rebuild
+
+
+def parse_day(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}, expected YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Recompute DriverDailyStats rollups from trips, stops and events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=parse_day, help='First local day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', type=parse_day, help='Last local day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--driver', type=int, action='append', dest='drivers',
+                            help='Only rebuild this driver; may be repeated')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, start=None, end=None, drivers=None, batch_size=1000, **options):
+        if start and end and start > end:
+            raise CommandError('--start must not be after --end')
+        rows = rebuild(start, end, drivers, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily rollup rows'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from driver_truck.replicas import replica_aliases, replicate
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database onto the read replicas (local stand-in for replication)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', action='append', dest='aliases',
+                            help='Replica alias to refresh; defaults to every DATABASE_REPLICAS entry')
+        parser.add_argument('--interval', type=float,
+                            help='Keep copying every this many seconds instead of once')
+
+    def handle(self, *args, aliases=None, interval=None, **options):
+        aliases = aliases or replica_aliases() or ['replica']
+        unknown = [alias for alias in aliases if alias not in connections.settings]
+        if unknown:
+            raise CommandError(f"Unknown database alias {unknown[0]!r}")
+        while True:
+            started = time.perf_counter()
+            replicate(aliases)
+            if options['verbosity'] > 1 or interval is None:
+                self.stdout.write(f"Replicated to {', '.join(aliases)} in {time.perf_counter() - started:.3f}s")
+            if interval is None:
+                return
+            time.sleep(interval)
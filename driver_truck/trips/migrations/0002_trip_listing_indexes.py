@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['driver', '-planned_start_time'], name='trips_driver_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['status', '-planned_start_time'], name='trips_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tripevent',
+            index=models.Index(fields=['trip', '-event_time'], name='trip_events_trip_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tripstop',
+            index=models.Index(fields=['trip', 'stop_order', 'is_completed'], name='trip_stops_order_done_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0002_trip_listing_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['-planned_start_time', '-id'], name='trips_start_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tripevent',
+            index=models.Index(fields=['-event_time', '-id'], name='trip_events_keyset_idx'),
+        ),
+    ]
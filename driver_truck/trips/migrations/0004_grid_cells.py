@@ -0,0 +1,68 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:24
+
+from django.db import migrations, models
+
+from trips.geo import grid_cell
+
+
+def backfill(model, fields, assign, rows, batch_size=2000):
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        assign(row)
+        batch.append(row)
+        if len(batch) >= batch_size:
+            model.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, fields)
+
+
+def backfill_grid_cells(apps, schema_editor):
+    Trip = apps.get_model('trips', 'Trip')
+
+    def assign_trip(trip):
+        trip.origin_grid_cell = grid_cell(trip.origin_latitude, trip.origin_longitude)
+        trip.destination_grid_cell = grid_cell(trip.destination_latitude, trip.destination_longitude)
+
+    backfill(
+        Trip, ['origin_grid_cell', 'destination_grid_cell'], assign_trip,
+        Trip.objects.exclude(origin_latitude=None, destination_latitude=None),
+    )
+
+    def assign_point(row):
+        row.grid_cell = grid_cell(row.latitude, row.longitude)
+
+    for name in ('TripStop', 'TripEvent'):
+        model = apps.get_model('trips', name)
+        backfill(model, ['grid_cell'], assign_point, model.objects.exclude(latitude=None))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='destination_grid_cell',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='origin_grid_cell',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tripevent',
+            name='grid_cell',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tripstop',
+            name='grid_cell',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_grid_cells, migrations.RunPython.noop),
+    ]
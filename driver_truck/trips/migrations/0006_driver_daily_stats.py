@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:55
+
+import datetime
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0005_last_known_positions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriverDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('trips_completed', models.PositiveIntegerField(default=0)),
+                ('planned_miles', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=10)),
+                ('actual_miles', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=10)),
+                ('actual_duration', models.DurationField(default=datetime.timedelta(0))),
+                ('stops_completed', models.PositiveIntegerField(default=0)),
+                ('delay_events', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Driver Daily Stats',
+                'verbose_name_plural': 'Driver Daily Stats',
+                'db_table': 'driver_daily_stats',
+                'ordering': ['-day', 'driver'],
+                'indexes': [models.Index(fields=['day', 'driver'], name='driver_daily_stats_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('driver', 'day'), name='driver_daily_stats_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:58
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0006_driver_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LaneStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origin_state', models.CharField(max_length=50)),
+                ('destination_state', models.CharField(max_length=50)),
+                ('origin_city', models.CharField(blank=True, max_length=100)),
+                ('destination_city', models.CharField(blank=True, max_length=100)),
+                ('trips', models.PositiveIntegerField(default=0)),
+                ('on_time_trips', models.PositiveIntegerField(default=0)),
+                ('total_miles', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('planned_seconds', models.BigIntegerField(default=0)),
+                ('actual_seconds', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Lane Stats',
+                'verbose_name_plural': 'Lane Stats',
+                'db_table': 'trip_lane_stats',
+                'ordering': ['-trips'],
+                'constraints': [models.UniqueConstraint(fields=('origin_state', 'destination_state', 'origin_city', 'destination_city'), name='trip_lane_stats_unique')],
+            },
+        ),
+    ]
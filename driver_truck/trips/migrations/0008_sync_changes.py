@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0007_lane_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('trip', 'Trip'), ('trip_stop', 'Trip Stop'), ('trip_event', 'Trip Event'), ('vehicle', 'Vehicle')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('driver_id', models.BigIntegerField(blank=True, null=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Sync Change',
+                'verbose_name_plural': 'Sync Changes',
+                'db_table': 'sync_changes',
+                'indexes': [models.Index(fields=['model', 'object_id'], name='sync_changes_object_idx'), models.Index(fields=['driver_id', 'id'], name='sync_changes_driver_seq_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0008_sync_changes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='syncchange',
+            name='model',
+            field=models.CharField(choices=[('trip', 'Trip'), ('trip_stop', 'Trip Stop'), ('trip_event', 'Trip Event'), ('vehicle', 'Vehicle'), ('driver', 'Driver')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:40
+
+from django.db import migrations
+from django.db.models import Exists, OuterRef, Value
+from django.utils import timezone
+
+
+SYNCED = [
+    ('drivers', 'Driver', 'driver', 'pk'),
+    ('drivers', 'Vehicle', 'vehicle', 'assigned_driver_id'),
+    ('trips', 'Trip', 'trip', 'driver_id'),
+    ('trips', 'TripStop', 'trip_stop', 'trip__driver_id'),
+    ('trips', 'TripEvent', 'trip_event', 'trip__driver_id'),
+]
+
+
+def backfill_sync_changes(apps, schema_editor):
+    """
+    Entries for rows that existed before the change log, so snapshots include them
+    """
+    SyncChange = apps.get_model('trips', 'SyncChange')
+    quote = schema_editor.connection.ops.quote_name
+    columns = ', '.join(quote(column) for column in ('object_id', 'driver_id', 'model', 'deleted', 'changed_at'))
+    now = timezone.now()
+    for app_label, name, label, owner in SYNCED:
+        model = apps.get_model(app_label, name)
+        recorded = SyncChange.objects.filter(model=label, object_id=OuterRef('pk'))
+        select = model.objects.filter(~Exists(recorded)).order_by('pk').annotate(
+            sync_model=Value(label), sync_deleted=Value(False), sync_changed_at=Value(now),
+        ).values_list('pk', owner, 'sync_model', 'sync_deleted', 'sync_changed_at')
+        sql, params = select.query.sql_with_params()
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'INSERT INTO {quote(SyncChange._meta.db_table)} ({columns}) {sql}', params)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0001_initial'),
+        ('trips', '0009_sync_changes_drivers'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sync_changes, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,9 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+from datetime import timedelta
 from decimal import Decimal
+from .geo import grid_cell
 
 Driver = get_user_model()
 
@@ -17,6 +19,15 @@ class TripStatus(models.TextChoices):
     CANCELLED = 'cancelled', 'Cancelled'
 
 
+def with_grid_fields(update_fields, dependencies):
+    """
+    Add grid cell columns to ``update_fields`` when their coordinates change
+    """
+    update_fields = set(update_fields)
+    update_fields.update(cell for field, cell in dependencies.items() if field in update_fields)
+    return update_fields
+
+
 class Trip(models.Model):
     """
     Main trip/route model
@@ -67,6 +78,10 @@ class Trip(models.Model):
         blank=True
     )
     
+    # Spatial index cells (see trips/geo.py), maintained on save
+    origin_grid_cell = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
+    destination_grid_cell = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
+    
     # Trip timing
     planned_start_time = models.DateTimeField()
     planned_end_time = models.DateTimeField()
@@ -115,10 +130,31 @@ class Trip(models.Model):
         verbose_name = 'Trip'
         verbose_name_plural = 'Trips'
         ordering = ['-planned_start_time']
+        indexes = [
+            models.Index(fields=['driver', '-planned_start_time'], name='trips_driver_start_idx'),
+            models.Index(fields=['status', '-planned_start_time'], name='trips_status_start_idx'),
+            models.Index(fields=['-planned_start_time', '-id'], name='trips_start_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"Trip {self.trip_number} - {self.driver.username}"
     
+    def save(self, *args, **kwargs):
+        self.update_grid_cells()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = with_grid_fields(update_fields, {
+                'origin_latitude': 'origin_grid_cell',
+                'origin_longitude': 'origin_grid_cell',
+                'destination_latitude': 'destination_grid_cell',
+                'destination_longitude': 'destination_grid_cell',
+            })
+        super().save(*args, **kwargs)
+    
+    def update_grid_cells(self):
+        self.origin_grid_cell = grid_cell(self.origin_latitude, self.origin_longitude)
+        self.destination_grid_cell = grid_cell(self.destination_latitude, self.destination_longitude)
+    
     @property
     def is_active(self):
         """Check if trip is currently in progress"""
@@ -193,6 +229,7 @@ class TripStop(models.Model):
         null=True, 
         blank=True
     )
+    grid_cell = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
     
     # Timing
     planned_arrival = models.DateTimeField()
@@ -215,10 +252,24 @@ class TripStop(models.Model):
         verbose_name_plural = 'Trip Stops'
         ordering = ['trip', 'stop_order']
         unique_together = ['trip', 'stop_order']
+        indexes = [
+            models.Index(fields=['trip', 'stop_order', 'is_completed'], name='trip_stops_order_done_idx'),
+        ]
     
     def __str__(self):
         return f"{self.trip.trip_number} - Stop {self.stop_order} ({self.get_stop_type_display()})"
     
+    def save(self, *args, **kwargs):
+        self.update_grid_cell()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = with_grid_fields(
+                kwargs['update_fields'], {'latitude': 'grid_cell', 'longitude': 'grid_cell'}
+            )
+        super().save(*args, **kwargs)
+    
+    def update_grid_cell(self):
+        self.grid_cell = grid_cell(self.latitude, self.longitude)
+    
     @property
     def full_address(self):
         """Get formatted full address"""
@@ -263,6 +314,7 @@ class TripEvent(models.Model):
         null=True, 
         blank=True
     )
+    grid_cell = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
     
     # Event details
     description = models.TextField()
@@ -281,6 +333,200 @@ class TripEvent(models.Model):
         verbose_name = 'Trip Event'
         verbose_name_plural = 'Trip Events'
         ordering = ['-event_time']
+        indexes = [
+            models.Index(fields=['trip', '-event_time'], name='trip_events_trip_time_idx'),
+            models.Index(fields=['-event_time', '-id'], name='trip_events_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.trip.trip_number} - {self.get_event_type_display()} - {self.event_time.strftime('%Y-%m-%d %H:%M')}"
+    
+    def save(self, *args, **kwargs):
+        self.update_grid_cell()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = with_grid_fields(
+                kwargs['update_fields'], {'latitude': 'grid_cell', 'longitude': 'grid_cell'}
+            )
+        super().save(*args, **kwargs)
+    
+    def update_grid_cell(self):
+        self.grid_cell = grid_cell(self.latitude, self.longitude)
+
+
+class LastKnownPosition(models.Model):
+    """
+    Latest reported coordinates per trip, denormalized from TripEvent
+
+    Maintained on every event insert so the fleet map can be drawn with a
+    single indexed query instead of scanning each trip's event history.
+    """
+    trip = models.OneToOneField(
+        Trip,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='last_position'
+    )
+    driver = models.ForeignKey(
+        Driver,
+        on_delete=models.CASCADE,
+        related_name='last_positions'
+    )
+    event = models.ForeignKey(
+        TripEvent,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    
+    latitude = models.DecimalField(max_digits=9, decimal_places=6)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    event_time = models.DateTimeField()
+    
+    # Server time of the last move, used by ?since= pollers
+    updated_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        db_table = 'trip_last_positions'
+        verbose_name = 'Last Known Position'
+        verbose_name_plural = 'Last Known Positions'
+    
+    def __str__(self):
+        return f"Trip {self.trip_id} @ {self.latitude},{self.longitude}"
+
+
+class DriverDailyStats(models.Model):
+    """
+    Per-driver, per-day totals maintained incrementally (see trips/rollups.py)
+
+    Days are local dates in settings.TIME_ZONE: trips count on the day they
+    were completed, stops on the day of departure, delays on the day of the
+    event. ``rebuild_rollups`` recomputes them from the raw rows.
+    """
+    driver = models.ForeignKey(
+        Driver,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    day = models.DateField()
+    
+    trips_completed = models.PositiveIntegerField(default=0)
+    planned_miles = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0'))
+    actual_miles = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0'))
+    actual_duration = models.DurationField(default=timedelta(0))
+    stops_completed = models.PositiveIntegerField(default=0)
+    delay_events = models.PositiveIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'driver_daily_stats'
+        verbose_name = 'Driver Daily Stats'
+        verbose_name_plural = 'Driver Daily Stats'
+        ordering = ['-day', 'driver']
+        constraints = [
+            models.UniqueConstraint(fields=['driver', 'day'], name='driver_daily_stats_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'driver'], name='driver_daily_stats_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.driver_id} on {self.day}"
+    
+    @property
+    def actual_hours(self):
+        return round(self.actual_duration.total_seconds() / 3600, 2)
+
+
+class LaneStats(models.Model):
+    """
+    Completed-trip totals for one origin -> destination lane (see trips/lanes.py)
+
+    State lanes leave both city fields blank; city-pair rows drill down
+    into them. Averages are derived from the sums so rows can be updated
+    by increment.
+    """
+    origin_state = models.CharField(max_length=50)
+    destination_state = models.CharField(max_length=50)
+    origin_city = models.CharField(max_length=100, blank=True)
+    destination_city = models.CharField(max_length=100, blank=True)
+    
+    trips = models.PositiveIntegerField(default=0)
+    on_time_trips = models.PositiveIntegerField(default=0)
+    total_miles = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    planned_seconds = models.BigIntegerField(default=0)
+    actual_seconds = models.BigIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'trip_lane_stats'
+        verbose_name = 'Lane Stats'
+        verbose_name_plural = 'Lane Stats'
+        ordering = ['-trips']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['origin_state', 'destination_state', 'origin_city', 'destination_city'],
+                name='trip_lane_stats_unique'
+            ),
+        ]
+    
+    def __str__(self):
+        if self.origin_city:
+            return f"{self.origin_city}, {self.origin_state} -> {self.destination_city}, {self.destination_state}"
+        return f"{self.origin_state} -> {self.destination_state}"
+    
+    @property
+    def avg_miles(self):
+        return round(self.total_miles / self.trips, 2) if self.trips else Decimal('0')
+    
+    @property
+    def avg_planned_hours(self):
+        return round(self.planned_seconds / self.trips / 3600, 2) if self.trips else 0
+    
+    @property
+    def avg_actual_hours(self):
+        return round(self.actual_seconds / self.trips / 3600, 2) if self.trips else 0
+    
+    @property
+    def on_time_rate(self):
+        return round(self.on_time_trips / self.trips, 4) if self.trips else 0
+
+
+class SyncChange(models.Model):
+    """
+    Latest change of one synced row, for the delta-sync feed (see trips/changes.py)
+
+    The auto-increment ``id`` is the change sequence: every insert, update
+    or delete replaces the row's entry with a new, higher one, so the
+    table holds one entry per row (plus tombstones), not the history.
+    ``driver_id`` is the owner the change is shown to; it is a plain
+    integer so entries outlive the driver rows they point at.
+    """
+    MODELS = [
+        ('trip', 'Trip'),
+        ('trip_stop', 'Trip Stop'),
+        ('trip_event', 'Trip Event'),
+        ('vehicle', 'Vehicle'),
+        ('driver', 'Driver'),
+    ]
+    
+    model = models.CharField(max_length=20, choices=MODELS)
+    object_id = models.BigIntegerField()
+    driver_id = models.BigIntegerField(null=True, blank=True)
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'sync_changes'
+        verbose_name = 'Sync Change'
+        verbose_name_plural = 'Sync Changes'
+        indexes = [
+            models.Index(fields=['model', 'object_id'], name='sync_changes_object_idx'),
+            models.Index(fields=['driver_id', 'id'], name='sync_changes_driver_seq_idx'),
+        ]
+    
+    def __str__(self):
+        action = 'deleted' if self.deleted else 'changed'
+        return f"#{self.id} {self.model} {self.object_id} {action}"
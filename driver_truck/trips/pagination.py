@@ -0,0 +1,248 @@
+import base64
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a composite, unique ordering key
+
+    Each page is fetched with ``WHERE key < last_seen_key`` instead of
+    ``OFFSET``, so deep pages cost the same as the first one, and no
+    ``COUNT(*)`` is issued. Cursors are opaque base64 tokens holding the
+    boundary row's key values and the paging direction.
+    """
+    ordering = ('-id',)
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.row_fields = list(queryset.query.values_select)
+
+        values, reverse = self.decode_cursor(request)
+        ordering = self.reversed_ordering() if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(ordering, values))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_extra = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Moving forward: a previous page exists if we came from a cursor.
+        # Moving backward: a next page always exists (the page we came from).
+        if reverse:
+            self.has_previous, self.has_next = has_extra, values is not None
+        else:
+            self.has_previous, self.has_next = values is not None, has_extra
+
+        self.first_key = self.key_for(rows[0]) if rows else None
+        self.last_key = self.key_for(rows[-1]) if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size) if self.max_page_size else size
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next or self.last_key is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.last_key, False))
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_key is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.first_key, True))
+
+    def field_names(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def reversed_ordering(self):
+        return tuple(name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering)
+
+    def key_for(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name in self.field_names()]
+        if isinstance(row, tuple):
+            return [row[self.row_fields.index(name)] for name in self.field_names()]
+        return [getattr(row, name) for name in self.field_names()]
+
+    def seek_filter(self, ordering, values):
+        """
+        Build ``(a, b, c) > (x, y, z)`` as an OR of prefix-equality terms
+        """
+        terms = []
+        for position, name in enumerate(ordering):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            equal = [Q(**{prev.lstrip('-'): values[i]}) for i, prev in enumerate(ordering[:position])]
+            terms.append(reduce(and_, equal + [Q(**{f'{field}__{lookup}': values[position]})]))
+        return reduce(or_, terms)
+
+    def encode_cursor(self, key, reverse):
+        payload = {'k': [self.encode_value(value) for value in key]}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            raw_values = payload['k']
+            if len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.decode_value(self.model._meta.get_field(name), value)
+                for name, value in zip(self.field_names(), raw_values)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(payload.get('r'))
+
+    def encode_value(self, value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def decode_value(self, field, value):
+        # Key columns are never null, and anything but a scalar is a forged cursor
+        if isinstance(value, bool) or not isinstance(value, (str, int)):
+            raise TypeError
+        value = field.to_python(value)
+        if value is None or (isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63):
+            raise ValueError
+        return value
+
+
+class TripKeysetPagination(KeysetPagination):
+    ordering = ('-planned_start_time', '-id')
+
+
+class TripEventKeysetPagination(KeysetPagination):
+    ordering = ('-event_time', '-id')
+
+
+class TripStopKeysetPagination(KeysetPagination):
+    ordering = ('trip_id', 'stop_order')
+
+
+class PageNumberOrKeysetPagination(BasePagination):
+    """
+    Page-number pagination by default, keyset pagination on request
+
+    Clients opt in with ``?pagination=cursor`` and then follow the returned
+    ``next``/``previous`` links, which carry a ``cursor`` parameter.
+    Existing ``?page=`` clients see no change.
+    """
+    keyset_class = KeysetPagination
+    page_number_class = PageNumberPagination
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.paginator = None
+
+    def uses_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.uses_keyset(request):
+            self.paginator = self.keyset_class()
+        else:
+            self.paginator = self.page_number_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_class().get_paginated_response_schema(schema)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return data['results']
+
+    def get_schema_operation_parameters(self, view):
+        return self.page_number_class().get_schema_operation_parameters(view) + [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to "cursor" for keyset pagination without a total count.',
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+            {
+                'name': self.keyset_class.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor value from a previous keyset page.',
+                'schema': {'type': 'string'},
+            },
+        ]
+
+
+class TripPagination(PageNumberOrKeysetPagination):
+    keyset_class = TripKeysetPagination
+
+
+class TripEventPagination(PageNumberOrKeysetPagination):
+    keyset_class = TripEventKeysetPagination
+
+
+class TripStopPagination(PageNumberOrKeysetPagination):
+    keyset_class = TripStopKeysetPagination
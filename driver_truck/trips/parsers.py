@@ -0,0 +1,50 @@
+import orjson
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+
+class MalformedLine:
+    """
+    Placeholder for an NDJSON line that could not be decoded
+
+    Kept in place of the item so a single bad line is reported against its
+    own index instead of rejecting the whole batch.
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+
+class BlankLine:
+    """
+    Placeholder for an empty NDJSON line
+
+    Kept so every later item's index stays its zero-based line number.
+    """
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON into a list with one item per line
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        items = []
+        for raw_line in stream:
+            try:
+                line = raw_line.decode(encoding).strip()
+            except UnicodeDecodeError as exc:
+                items.append(MalformedLine(f'Invalid {encoding} - {exc}'))
+                continue
+            if not line:
+                items.append(BlankLine())
+                continue
+            try:
+                items.append(orjson.loads(line))
+            except ValueError as exc:
+                items.append(MalformedLine(f'JSON parse error - {exc}'))
+        return items
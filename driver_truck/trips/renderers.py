@@ -0,0 +1,26 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Declares text/csv for content negotiation on streaming exports
+
+    Export views return a StreamingHttpResponse directly, so render() is
+    only reached for error payloads.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return str(data).encode(self.charset)
+
+
+class NDJSONRenderer(CSVRenderer):
+    """
+    Declares application/x-ndjson for content negotiation on streaming exports
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
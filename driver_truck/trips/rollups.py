@@ -0,0 +1,199 @@
+"""
+Incremental maintenance of the DriverDailyStats rollup
+
+Writers call the ``record_*`` hooks inside their own transaction, so a
+rollup row never disagrees with the trip, stop or event that changed it.
+Each hook costs one UPDATE per touched (driver, day) row, plus an INSERT
+the first time that row is needed. Deletions and edits of historical rows
+are not tracked; ``rebuild`` (and the ``rebuild_rollups`` command)
+recomputes any range from the raw tables.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from driver_truck.caching import invalidate
+from .models import DriverDailyStats, Trip, TripEvent, TripStop
+
+
+COUNTERS = {
+    'trips_completed': 0,
+    'planned_miles': Decimal('0'),
+    'actual_miles': Decimal('0'),
+    'actual_duration': timedelta(0),
+    'stops_completed': 0,
+    'delay_events': 0,
+}
+
+
+def stats_day(moment):
+    return timezone.localdate(moment)
+
+
+def increment(model, lookup, changes, now):
+    """
+    Add ``changes`` to the counters of the ``model`` row matching ``lookup``
+
+    One UPDATE when the row exists; otherwise it is inserted with
+    ``changes`` as its starting values.
+    """
+    rows = model.objects.filter(**lookup)
+    increments = {field: F(field) + amount for field, amount in changes.items()}
+    if rows.update(updated_at=now, **increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **changes)
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(updated_at=now, **increments)
+
+
+def apply_deltas(deltas):
+    """
+    Add ``{(driver_id, day): {counter: amount}}`` to the rollup rows
+    """
+    if not deltas:
+        return
+    now = timezone.now()
+    for (driver_id, day), changes in deltas.items():
+        increment(DriverDailyStats, {'driver_id': driver_id, 'day': day}, changes, now)
+    invalidate('driver_stats')
+
+
+def record_trip_completed(trip):
+    duration = timedelta(0)
+    if trip.actual_start_time and trip.actual_end_time:
+        duration = trip.actual_end_time - trip.actual_start_time
+    apply_deltas({
+        (trip.driver_id, stats_day(trip.actual_end_time)): {
+            'trips_completed': 1,
+            'planned_miles': Decimal(str(trip.estimated_distance)),
+            'actual_miles': Decimal(str(trip.actual_distance or 0)),
+            'actual_duration': duration,
+        }
+    })
+
+
+def record_stop_departed(stop):
+    record_stops_departed([stop])
+
+
+def record_stops_departed(stops):
+    deltas = defaultdict(lambda: {'stops_completed': 0})
+    for stop in stops:
+        deltas[(stop.trip.driver_id, stats_day(stop.actual_departure))]['stops_completed'] += 1
+    apply_deltas(deltas)
+
+
+def record_delays(events):
+    """
+    Count new delay events; other event types are ignored
+    """
+    delays = [event for event in events if event.event_type == 'delay']
+    if not delays:
+        return
+    drivers = {event.trip_id: event.trip.driver_id for event in delays if TripEvent.trip.is_cached(event)}
+    missing = {event.trip_id for event in delays} - drivers.keys()
+    if missing:
+        drivers.update(Trip.objects.filter(id__in=missing).values_list('id', 'driver_id'))
+
+    deltas = defaultdict(lambda: {'delay_events': 0})
+    for event in delays:
+        deltas[(drivers[event.trip_id], stats_day(event.event_time))]['delay_events'] += 1
+    apply_deltas(deltas)
+
+
+def local_day_bounds(start=None, end=None):
+    """
+    Aware datetimes for [start, end] local dates, either may be None
+    """
+    lower = timezone.make_aware(datetime.combine(start, time.min)) if start else None
+    upper = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)) if end else None
+    return lower, upper
+
+
+def grouped(queryset, moment_field, driver_field, lower, upper, driver_ids, **aggregates):
+    """
+    Aggregate ``queryset`` per driver and local day of ``moment_field``
+    """
+    if lower:
+        queryset = queryset.filter(**{f'{moment_field}__gte': lower})
+    if upper:
+        queryset = queryset.filter(**{f'{moment_field}__lt': upper})
+    if driver_ids:
+        queryset = queryset.filter(**{f'{driver_field}__in': driver_ids})
+    return (
+        queryset.annotate(stats_day=TruncDate(moment_field))
+        .values_list(driver_field, 'stats_day')
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def rebuild(start=None, end=None, driver_ids=None, batch_size=1000):
+    """
+    Recompute rollup rows for local days in [start, end] from the raw tables
+
+    Three grouped aggregate queries, then the range is replaced in one
+    transaction. Returns the number of rows written.
+    """
+    lower, upper = local_day_bounds(start, end)
+    totals = defaultdict(dict)
+
+    trips = grouped(
+        Trip.objects.filter(status='completed', actual_end_time__isnull=False),
+        'actual_end_time', 'driver_id', lower, upper, driver_ids,
+        trips_completed=Count('id'),
+        planned_miles=Sum('estimated_distance'),
+        actual_miles=Sum(Coalesce('actual_distance', Value(Decimal('0')))),
+        actual_duration=Sum(ExpressionWrapper(
+            F('actual_end_time') - F('actual_start_time'), output_field=DurationField()
+        )),
+    )
+    for driver_id, day, *values in trips:
+        totals[(driver_id, day)].update(zip(
+            ['trips_completed', 'planned_miles', 'actual_miles', 'actual_duration'], values
+        ))
+
+    stops = grouped(
+        TripStop.objects.filter(is_completed=True, actual_departure__isnull=False),
+        'actual_departure', 'trip__driver_id', lower, upper, driver_ids,
+        stops_completed=Count('id'),
+    )
+    for driver_id, day, count in stops:
+        totals[(driver_id, day)]['stops_completed'] = count
+
+    delays = grouped(
+        TripEvent.objects.filter(event_type='delay'),
+        'event_time', 'trip__driver_id', lower, upper, driver_ids,
+        delay_events=Count('id'),
+    )
+    for driver_id, day, count in delays:
+        totals[(driver_id, day)]['delay_events'] = count
+
+    rows = [
+        DriverDailyStats(
+            driver_id=driver_id,
+            day=day,
+            **{field: values.get(field) or default for field, default in COUNTERS.items()}
+        )
+        for (driver_id, day), values in totals.items()
+    ]
+    with transaction.atomic():
+        stale = DriverDailyStats.objects.all()
+        if start:
+            stale = stale.filter(day__gte=start)
+        if end:
+            stale = stale.filter(day__lte=end)
+        if driver_ids:
+            stale = stale.filter(driver_id__in=driver_ids)
+        stale.delete()
+        DriverDailyStats.objects.bulk_create(rows, batch_size=batch_size)
+        invalidate('driver_stats')
+    return len(rows)
@@ -1,9 +1,30 @@
 from rest_framework import serializers
-from .models import Trip, TripStop, TripEvent
+from .models import Trip, TripStop, TripEvent, LastKnownPosition, DriverDailyStats, LaneStats
 from drivers.serializers import DriverListSerializer
+from driver_truck.fastpath import choice_display, display_name
+from driver_truck.fieldsets import SparseFieldsMixin
+from .parsers import BlankLine, MalformedLine
 
 
-class TripSerializer(serializers.ModelSerializer):
+class IncludeRelatedMixin:
+    """
+    Embeds prefetched stops/events when the view passes ``include`` in context
+
+    Events are read from the ``included_events`` prefetch so the view can
+    cap them per trip.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        include = self.context.get('include', ())
+        if 'stops' in include:
+            fields['stops'] = TripStopSerializer(many=True, read_only=True)
+        if 'events' in include:
+            fields['events'] = TripEventSerializer(source='included_events', many=True, read_only=True)
+        return fields
+
+
+class TripSerializer(SparseFieldsMixin, IncludeRelatedMixin, serializers.ModelSerializer):
     """
     Serializer for Trip model
     """
@@ -15,6 +36,20 @@ class TripSerializer(serializers.ModelSerializer):
     destination_full_address = serializers.ReadOnlyField()
     is_active = serializers.ReadOnlyField()
     
+    field_sources = {
+        'driver_name': ('driver__first_name', 'driver__last_name', 'driver__username'),
+        'status_display': ('status',),
+        'duration_planned_hours': ('planned_start_time', 'planned_end_time'),
+        'duration_actual_hours': ('actual_start_time', 'actual_end_time'),
+        'origin_full_address': ('origin_address', 'origin_city', 'origin_state', 'origin_zip'),
+        'destination_full_address': (
+            'destination_address', 'destination_city', 'destination_state', 'destination_zip'
+        ),
+        'is_active': ('status',),
+        'stops': (),
+        'events': (),
+    }
+    
     class Meta:
         model = Trip
         fields = [
@@ -67,7 +102,7 @@ class TripCreateSerializer(serializers.ModelSerializer):
         return data
 
 
-class TripListSerializer(serializers.ModelSerializer):
+class TripListSerializer(SparseFieldsMixin, IncludeRelatedMixin, serializers.ModelSerializer):
     """
     Simplified serializer for trip list views
     """
@@ -75,6 +110,21 @@ class TripListSerializer(serializers.ModelSerializer):
     status_display = serializers.SerializerMethodField()
     origin_destination = serializers.SerializerMethodField()
     
+    field_sources = {
+        'driver_name': ('driver__first_name', 'driver__last_name', 'driver__username'),
+        'status_display': ('status',),
+        'origin_destination': ('origin_city', 'origin_state', 'destination_city', 'destination_state'),
+        'stops': (),
+        'events': (),
+    }
+    fast_fields = {
+        'driver_name': display_name,
+        'status_display': choice_display(Trip, 'status'),
+        'origin_destination': lambda origin_city, origin_state, destination_city, destination_state: (
+            f"{origin_city}, {origin_state} → {destination_city}, {destination_state}"
+        ),
+    }
+    
     class Meta:
         model = Trip
         fields = [
@@ -93,7 +143,7 @@ class TripListSerializer(serializers.ModelSerializer):
         return f"{obj.origin_city}, {obj.origin_state} → {obj.destination_city}, {obj.destination_state}"
 
 
-class TripStopSerializer(serializers.ModelSerializer):
+class TripStopSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for TripStop model
     """
@@ -101,6 +151,17 @@ class TripStopSerializer(serializers.ModelSerializer):
     full_address = serializers.ReadOnlyField()
     trip_number = serializers.SerializerMethodField()
     
+    field_sources = {
+        'stop_type_display': ('stop_type',),
+        'full_address': ('address', 'city', 'state', 'zip_code'),
+        'trip_number': ('trip__trip_number',),
+    }
+    fast_fields = {
+        'stop_type_display': choice_display(TripStop, 'stop_type'),
+        'full_address': lambda address, city, state, zip_code: f"{address}, {city}, {state} {zip_code}",
+        'trip_number': str,
+    }
+    
     class Meta:
         model = TripStop
         fields = [
@@ -146,13 +207,22 @@ class TripStopCreateSerializer(serializers.ModelSerializer):
         return data
 
 
-class TripEventSerializer(serializers.ModelSerializer):
+class TripEventSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for TripEvent model
     """
     event_type_display = serializers.SerializerMethodField()
     trip_number = serializers.SerializerMethodField()
     
+    field_sources = {
+        'event_type_display': ('event_type',),
+        'trip_number': ('trip__trip_number',),
+    }
+    fast_fields = {
+        'event_type_display': choice_display(TripEvent, 'event_type'),
+        'trip_number': str,
+    }
+    
     class Meta:
         model = TripEvent
         fields = [
@@ -177,4 +247,155 @@ class TripEventCreateSerializer(serializers.ModelSerializer):
         fields = [
             'trip', 'event_type', 'event_time', 'location',
             'latitude', 'longitude', 'description', 'additional_data'
-        ]
\ No newline at end of file
+        ]
+
+
+class TripEventBulkSerializer(serializers.ListSerializer):
+    """
+    Validates a whole bulk event upload in one pass
+
+    Unlike ``is_valid()``, a bad item does not fail the batch:
+    ``partition()`` returns the validated items and the errors of the
+    rest, each paired with the item's index.
+    """
+
+    def partition(self, items):
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            if isinstance(item, BlankLine):
+                continue
+            if isinstance(item, MalformedLine):
+                errors.append({'index': index, 'errors': {'non_field_errors': [item.message]}})
+                continue
+            try:
+                valid.append((index, self.child.run_validation(item)))
+            except serializers.ValidationError as exc:
+                errors.append({'index': index, 'errors': serializers.as_serializer_error(exc)})
+        return valid, errors
+
+
+class TripEventBulkItemSerializer(serializers.Serializer):
+    """
+    Validates one item of a bulk event upload
+
+    The trip is taken as a plain ID so validation never touches the
+    database; the bulk endpoint checks every trip ID in a single query.
+    """
+    trip = serializers.IntegerField(min_value=1)
+    event_type = serializers.ChoiceField(choices=TripEvent.EVENT_TYPES)
+    event_time = serializers.DateTimeField(required=False)
+    location = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    latitude = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
+    longitude = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
+    description = serializers.CharField()
+    additional_data = serializers.JSONField(required=False)
+
+    class Meta:
+        list_serializer_class = TripEventBulkSerializer
+
+
+class TripStopCheckpointSerializer(serializers.Serializer):
+    """
+    Validates one stop arrival/departure of an offline sync batch
+    """
+    stop = serializers.IntegerField(min_value=1)
+    action = serializers.ChoiceField(choices=['arrive', 'depart'])
+    at = serializers.DateTimeField()
+
+
+class LastKnownPositionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for the fleet live-position feed
+    """
+    trip_number = serializers.CharField(source='trip.trip_number', read_only=True)
+    driver_name = serializers.SerializerMethodField()
+    
+    field_sources = {
+        'driver_name': ('driver__first_name', 'driver__last_name', 'driver__username'),
+    }
+    
+    class Meta:
+        model = LastKnownPosition
+        fields = [
+            'trip', 'trip_number', 'driver', 'driver_name', 'event',
+            'latitude', 'longitude', 'event_time', 'updated_at'
+        ]
+    
+    def get_driver_name(self, obj):
+        return obj.driver.get_full_name() or obj.driver.username
+
+
+class DriverDailyStatsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for per-driver daily rollups
+    """
+    driver_name = serializers.SerializerMethodField()
+    actual_hours = serializers.ReadOnlyField()
+    
+    field_sources = {
+        'driver_name': ('driver__first_name', 'driver__last_name', 'driver__username'),
+        'actual_hours': ('actual_duration',),
+    }
+    
+    class Meta:
+        model = DriverDailyStats
+        fields = [
+            'driver', 'driver_name', 'day', 'trips_completed',
+            'planned_miles', 'actual_miles', 'actual_hours',
+            'stops_completed', 'delay_events', 'updated_at'
+        ]
+    
+    def get_driver_name(self, obj):
+        return obj.driver.get_full_name() or obj.driver.username
+
+
+class DriverStatsSummarySerializer(serializers.Serializer):
+    """
+    Rollup totals of one driver over a date range
+    """
+    driver = serializers.IntegerField()
+    days = serializers.IntegerField()
+    trips_completed = serializers.IntegerField()
+    planned_miles = serializers.DecimalField(max_digits=12, decimal_places=2)
+    actual_miles = serializers.DecimalField(max_digits=12, decimal_places=2)
+    actual_hours = serializers.SerializerMethodField()
+    stops_completed = serializers.IntegerField()
+    delay_events = serializers.IntegerField()
+    
+    def get_actual_hours(self, obj):
+        return round(obj['actual_duration'].total_seconds() / 3600, 2)
+
+
+class LaneStatsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for state-to-state lane analytics
+    """
+    avg_miles = serializers.ReadOnlyField()
+    avg_planned_hours = serializers.ReadOnlyField()
+    avg_actual_hours = serializers.ReadOnlyField()
+    on_time_rate = serializers.ReadOnlyField()
+    
+    field_sources = {
+        'avg_miles': ('trips', 'total_miles'),
+        'avg_planned_hours': ('trips', 'planned_seconds'),
+        'avg_actual_hours': ('trips', 'actual_seconds'),
+        'on_time_rate': ('trips', 'on_time_trips'),
+    }
+    
+    class Meta:
+        model = LaneStats
+        fields = [
+            'origin_state', 'destination_state', 'trips', 'avg_miles',
+            'avg_planned_hours', 'avg_actual_hours', 'on_time_rate', 'updated_at'
+        ]
+
+
+class LaneCityStatsSerializer(LaneStatsSerializer):
+    """
+    Serializer for city-pair drill-down of a lane
+    """
+    
+    class Meta(LaneStatsSerializer.Meta):
+        fields = ['origin_city', 'origin_state', 'destination_city', 'destination_state'] + [
+            field for field in LaneStatsSerializer.Meta.fields if not field.endswith('_state')
+        ]
@@ -0,0 +1,164 @@
+from django.db import transaction
+from django.utils import timezone
+
+from driver_truck.caching import invalidate
+from .changes import record_changes
+from .models import Trip, TripEvent, TripStop, LastKnownPosition
+from .rollups import record_delays, record_stops_departed
+from .streams import publish_events, publish_stop_status
+
+
+def record_events(events, batch_size=500):
+    """
+    Insert unsaved TripEvent instances in one transaction
+
+    Single entry point for multi-row event writes, so follow-up work that
+    would otherwise hang off post_save (which bulk_create does not send)
+    has one place to live.
+    """
+    for event in events:
+        event.update_grid_cell()
+    
+    with transaction.atomic():
+        created = TripEvent.objects.bulk_create(events, batch_size=batch_size)
+        update_positions(created)
+        record_delays(created)
+        record_changes(TripEvent, created, created=True)
+        publish_events(created)
+        invalidate('trip_events', *{f'trip:{event.trip_id}' for event in created})
+    return created
+
+
+def stop_event(stop):
+    """
+    Unsaved TripEvent recording that ``stop`` was completed
+    """
+    return TripEvent(
+        trip=stop.trip,
+        event_type='stop',
+        event_time=stop.actual_departure,
+        description=f'Completed {stop.get_stop_type_display()} at {stop.city}, {stop.state}',
+    )
+
+
+def without_stored(events):
+    """
+    ``events`` minus those already stored (same trip, type and time)
+    """
+    if not events:
+        return []
+    stored = set(TripEvent.objects.filter(
+        trip_id__in={event.trip_id for event in events},
+        event_time__in={event.event_time for event in events},
+    ).values_list('trip_id', 'event_type', 'event_time'))
+    fresh = []
+    for event in events:
+        key = (event.trip_id, event.event_type, event.event_time)
+        if key not in stored:
+            stored.add(key)
+            fresh.append(event)
+    return fresh
+
+
+def apply_checkpoints(checkpoints, events=()):
+    """
+    Apply client-timestamped stop arrivals/departures plus new events
+
+    ``checkpoints`` are ``{'stop': id, 'action': 'arrive'|'depart', 'at':
+    datetime}`` in the order they happened on the device. Replays are
+    merged rather than repeated: the earliest arrival wins, departing a
+    completed stop changes nothing, and events already stored with the
+    same trip, type and time are dropped. Changed stops are written with
+    one bulk_update; departure events and ``events`` (unsaved TripEvents)
+    with one bulk_create, all in one transaction.
+
+    Returns one result per checkpoint (``'applied'``, ``'unchanged'`` or
+    an error message), the affected stops by ID and the created events.
+    """
+    with transaction.atomic():
+        stops = TripStop.objects.select_related('trip').select_for_update().in_bulk(
+            {checkpoint['stop'] for checkpoint in checkpoints}
+        )
+        results, changed, departed = [], {}, []
+        for checkpoint in checkpoints:
+            stop, at = stops.get(checkpoint['stop']), checkpoint['at']
+            if stop is None:
+                results.append(f"Stop {checkpoint['stop']} does not exist.")
+            elif checkpoint['action'] == 'arrive':
+                if stop.actual_departure is not None and at > stop.actual_departure:
+                    results.append('Arrival is after the recorded departure.')
+                elif stop.actual_arrival is not None and stop.actual_arrival <= at:
+                    results.append('unchanged')
+                else:
+                    stop.actual_arrival = at
+                    changed[stop.pk] = stop
+                    results.append('applied')
+            elif stop.is_completed:
+                results.append('unchanged')
+            elif stop.actual_arrival is not None and at < stop.actual_arrival:
+                results.append('Departure is before the recorded arrival.')
+            else:
+                stop.actual_departure, stop.is_completed = at, True
+                changed[stop.pk] = stop
+                departed.append(stop)
+                results.append('applied')
+
+        if changed:
+            TripStop.objects.bulk_update(changed.values(), ['actual_arrival', 'actual_departure', 'is_completed'])
+            record_stops_departed(departed)
+            record_changes(TripStop, changed.values())
+            for stop in changed.values():
+                publish_stop_status(stop)
+            invalidate('trip_stops', *{f'trip:{stop.trip_id}' for stop in changed.values()})
+        created = [stop_event(stop) for stop in departed] + without_stored(events)
+        if created:
+            created = record_events(created)
+    return results, stops, created
+
+
+def update_positions(events):
+    """
+    Advance each trip's LastKnownPosition to its newest located event
+
+    Costs at most two reads and one upsert no matter how many events or
+    trips are involved. Events older than the stored position are ignored, so
+    out-of-order uploads never move a truck backwards.
+    """
+    newest = {}
+    for event in events:
+        if event.latitude is None or event.longitude is None:
+            continue
+        current = newest.get(event.trip_id)
+        if current is None or (event.event_time, event.pk or 0) > (current.event_time, current.pk or 0):
+            newest[event.trip_id] = event
+    if not newest:
+        return
+    
+    stored = dict(
+        LastKnownPosition.objects.filter(trip_id__in=newest).values_list('trip_id', 'event_time')
+    )
+    drivers = {trip_id: event.trip.driver_id for trip_id, event in newest.items() if TripEvent.trip.is_cached(event)}
+    missing = newest.keys() - drivers.keys()
+    if missing:
+        drivers.update(Trip.objects.filter(id__in=missing).values_list('id', 'driver_id'))
+    now = timezone.now()
+    
+    positions = [
+        LastKnownPosition(
+            trip_id=trip_id,
+            driver_id=drivers[trip_id],
+            event_id=event.pk,
+            latitude=event.latitude,
+            longitude=event.longitude,
+            event_time=event.event_time,
+            updated_at=now,
+        )
+        for trip_id, event in newest.items()
+        if trip_id in drivers and (trip_id not in stored or event.event_time >= stored[trip_id])
+    ]
+    LastKnownPosition.objects.bulk_create(
+        positions,
+        update_conflicts=True,
+        unique_fields=['trip'],
+        update_fields=['driver', 'event', 'latitude', 'longitude', 'event_time', 'updated_at'],
+    )
@@ -0,0 +1,67 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from driver_truck.caching import invalidate
+from drivers.models import Driver, Vehicle
+from .changes import already_recorded, record_changes, record_deletion
+from .models import Trip, TripStop, TripEvent
+from .rollups import record_delays
+from .services import update_positions
+from .streams import broker, publish_events
+
+
+@receiver([post_save, post_delete], sender=Trip)
+def invalidate_trip(sender, instance, **kwargs):
+    invalidate(f'trip:{instance.pk}', 'trips')
+    broker.forget_owner(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=TripStop)
+def invalidate_trip_stop(sender, instance, **kwargs):
+    invalidate(f'trip:{instance.trip_id}', 'trip_stops')
+
+
+@receiver([post_save, post_delete], sender=TripEvent)
+def invalidate_trip_event(sender, instance, **kwargs):
+    invalidate(f'trip:{instance.trip_id}', 'trip_events')
+
+
+@receiver(post_save, sender=TripEvent)
+def track_new_event(sender, instance, created, **kwargs):
+    if created:
+        update_positions([instance])
+        record_delays([instance])
+        publish_events([instance])
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_save, sender=TripStop)
+@receiver(post_save, sender=TripEvent)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=Driver)
+def record_saved_change(sender, instance, created, **kwargs):
+    record_changes(sender, [instance], created=created)
+
+
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=TripStop)
+@receiver(post_delete, sender=TripEvent)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=Driver)
+def record_deleted_change(sender, instance, **kwargs):
+    if not already_recorded(sender, instance.pk):
+        record_changes(sender, [instance], deleted=True)
+
+
+@receiver(pre_delete, sender=Trip)
+@receiver(pre_delete, sender=Driver)
+def record_cascade_deletion(sender, instance, origin=None, **kwargs):
+    # The collector signals trips before their driver, so the first signal
+    # records everything the delete() call removes
+    model, roots = sender, [instance]
+    if isinstance(origin, (Driver, Trip)):
+        model, roots = type(origin), [origin]
+    elif isinstance(origin, QuerySet) and origin.model in (Driver, Trip):
+        model, roots = origin.model, origin
+    record_deletion(model, roots, origin=origin)
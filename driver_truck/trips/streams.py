@@ -0,0 +1,127 @@
+"""
+Server-Sent Events stream of trip events and status transitions
+
+Served by an async view, so it needs an ASGI server (for example
+``uvicorn driver_truck.asgi:application``). Under WSGI every open stream
+would hold a worker thread.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
+
+from .broker import HEARTBEAT, OVERFLOW, EventBroker
+from .models import Trip
+
+
+def trip_owner(trip_id):
+    row = Trip.objects.filter(id=trip_id).values_list('driver_id', 'driver__carrier_name').first()
+    return row or (None, '')
+
+
+broker = EventBroker(owner_resolver=trip_owner)
+
+
+def event_payload(event):
+    return {
+        'id': event.pk,
+        'trip': event.trip_id,
+        'event_type': event.event_type,
+        'event_time': event.event_time,
+        'location': event.location,
+        'latitude': event.latitude,
+        'longitude': event.longitude,
+        'description': event.description,
+        'additional_data': event.additional_data,
+    }
+
+
+def publish_events(events):
+    """
+    Publish newly created TripEvents once the transaction commits
+    """
+    events = list(events)
+    transaction.on_commit(lambda: [
+        broker.publish('trip_event', event_payload(event), trip_id=event.trip_id)
+        for event in events
+    ])
+
+
+def publish_trip_status(trip):
+    payload = {
+        'trip': trip.pk,
+        'trip_number': trip.trip_number,
+        'status': trip.status,
+        'actual_start_time': trip.actual_start_time,
+        'actual_end_time': trip.actual_end_time,
+    }
+    driver = trip.driver
+    transaction.on_commit(lambda: broker.publish(
+        'trip_status', payload, trip_id=trip.pk, driver_id=driver.pk, carrier=driver.carrier_name
+    ))
+
+
+def publish_stop_status(stop):
+    payload = {
+        'stop': stop.pk,
+        'trip': stop.trip_id,
+        'stop_order': stop.stop_order,
+        'is_completed': stop.is_completed,
+        'actual_arrival': stop.actual_arrival,
+        'actual_departure': stop.actual_departure,
+    }
+    transaction.on_commit(lambda: broker.publish('stop_status', payload, trip_id=stop.trip_id))
+
+
+def parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def event_stream(subscription, backlog):
+    try:
+        yield b'retry: 3000\n\n'
+        for message in backlog:
+            yield message.frame
+        while True:
+            message = await subscription.queue.get()
+            if message is OVERFLOW:
+                # Too slow to keep up; the client resumes from Last-Event-ID
+                return
+            if message is HEARTBEAT:
+                yield b': keep-alive\n\n'
+            else:
+                yield message.frame
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def trip_event_stream(request):
+    """
+    Stream trip events and status changes, filtered by trip, driver or carrier
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponseForbidden('Authentication credentials were not provided.')
+
+    params = request.GET
+    for name in ('trip', 'driver'):
+        # A bad filter must not silently widen the stream to the whole fleet
+        if params.get(name) and parse_id(params[name]) is None:
+            return HttpResponseBadRequest(f'{name} must be an integer id.')
+    last_event_id = parse_id(request.headers.get('Last-Event-ID') or params.get('last_event_id'))
+    subscription, backlog = await sync_to_async(broker.subscribe)(
+        asyncio.get_running_loop(),
+        trip_id=parse_id(params.get('trip')),
+        driver_id=parse_id(params.get('driver')),
+        carrier=params.get('carrier') or None,
+        last_event_id=last_event_id,
+    )
+
+    response = StreamingHttpResponse(event_stream(subscription, backlog), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
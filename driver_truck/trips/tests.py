@@ -1,3 +1,1509 @@
-from django.test import TestCase
+import asyncio
+import base64
+import gzip
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection, connections, router, transaction
+from django.db.models import Sum
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.functional import lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from drivers.models import Driver, Vehicle
+from driver_truck import renderers
+from driver_truck.caching import cache_stats, get_cache
+from driver_truck.compression import available_encoders, negotiate_encoding
+from driver_truck.database import sqlite_database
+from driver_truck.replicas import STICKY_COOKIE, copy_database, read_from
+from driver_truck.profiling import profiling_stats, reset_profiling_stats
+from driver_truck.query_budget import QueryBudgetExceeded, QueryBudgetMixin, query_budget
+from .broker import OVERFLOW, EventBroker
+from .serializers import TripListSerializer
+from .views import TripViewSet, TripStopViewSet, TripEventViewSet
+from .generator import FleetSpec, next_ids, prepare_chunk, vehicle_vin
+from .geo import grid_cell, haversine_miles
+from .models import Trip, TripStop, TripEvent, LastKnownPosition, DriverDailyStats, LaneStats, SyncChange
+from . import changes, lanes, transitions
+from .rollups import rebuild, stats_day
+from .streams import broker
+
+
+def create_driver(username='driver1', **kwargs):
+    defaults = {
+        'driver_license': f'DL-{username}',
+        'first_name': 'Test',
+        'last_name': username.title(),
+    }
+    defaults.update(kwargs)
+    return Driver.objects.create(username=username, **defaults)
+
+
+def create_trip(driver, number, start=None, **kwargs):
+    start = start or timezone.now() + timedelta(days=1)
+    defaults = {
+        'driver': driver,
+        'trip_number': f'T-{number}',
+        'origin_address': '1 Main St',
+        'origin_city': 'Atlanta',
+        'origin_state': 'GA',
+        'origin_zip': '30301',
+        'destination_address': '2 Market St',
+        'destination_city': 'Nashville',
+        'destination_state': 'TN',
+        'destination_zip': '37201',
+        'planned_start_time': start,
+        'planned_end_time': start + timedelta(hours=5),
+        'estimated_distance': Decimal('250.00'),
+    }
+    defaults.update(kwargs)
+    return Trip.objects.create(**defaults)
+
+
+def create_stop(trip, order, **kwargs):
+    defaults = {
+        'trip': trip,
+        'stop_type': 'fuel',
+        'stop_order': order,
+        'address': '5 Truck Stop Rd',
+        'city': 'Chattanooga',
+        'state': 'TN',
+        'zip_code': '37401',
+        'planned_arrival': trip.planned_start_time + timedelta(hours=order),
+        'planned_departure': trip.planned_start_time + timedelta(hours=order, minutes=30),
+    }
+    defaults.update(kwargs)
+    return TripStop.objects.create(**defaults)
+
+
+def create_event(trip, **kwargs):
+    defaults = {'trip': trip, 'event_type': 'other', 'description': 'Ping'}
+    defaults.update(kwargs)
+    return TripEvent.objects.create(**defaults)
+
+
+class APITestMixin:
+    def setUp(self):
+        get_cache().clear()
+        self.driver = create_driver()
+        self.client = APIClient()
+        self.client.force_authenticate(self.driver)
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestMixin, TestCase):
+    """
+    Every list and detail path must run in a constant number of queries
+
+    Budgets include the single aggregate used for ETag/Last-Modified.
+    """
+
+    def populate(self, trips):
+        created = []
+        offset = Trip.objects.count()
+        for i in range(offset, offset + trips):
+            trip = create_trip(self.driver, i)
+            for order in range(1, 4):
+                create_stop(trip, order)
+            for _ in range(3):
+                create_event(trip)
+            created.append(trip)
+        return created
+
+    def assertConstantQueries(self, budget, url_for):
+        for rows in (1, 5):
+            trips = self.populate(rows)
+            with self.assertQueryBudget(budget):
+                response = self.client.get(url_for(trips[0]))
+            self.assertEqual(response.status_code, 200)
+
+    def test_trip_list(self):
+        self.assertConstantQueries(3, lambda trip: '/api/trips/trips/')
+
+    def test_trip_detail(self):
+        self.assertConstantQueries(2, lambda trip: f'/api/trips/trips/{trip.id}/')
+
+    def test_trip_nested_stops_and_events(self):
+        self.assertConstantQueries(2, lambda trip: f'/api/trips/trips/{trip.id}/stops/')
+        self.assertConstantQueries(2, lambda trip: f'/api/trips/trips/{trip.id}/events/')
+
+    def test_stop_and_event_lists(self):
+        self.assertConstantQueries(3, lambda trip: '/api/trips/stops/')
+        self.assertConstantQueries(3, lambda trip: '/api/trips/events/')
+
+    def test_driver_trips(self):
+        self.assertConstantQueries(2, lambda trip: f'/api/drivers/drivers/{self.driver.id}/trips/')
+
+    def test_budget_guard_fails_when_exceeded(self):
+        self.populate(2)
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(1):
+                list(Trip.objects.all())
+                list(TripStop.objects.all())
+
+
+class TripDateFilterTests(APITestMixin, TestCase):
+    def test_date_range_is_inclusive_of_whole_local_days(self):
+        tz = timezone.get_current_timezone()
+        edges = {
+            'before': datetime(2025, 3, 31, 23, 59),
+            'first': datetime(2025, 4, 1, 0, 0),
+            'last': datetime(2025, 4, 2, 23, 59),
+            'after': datetime(2025, 4, 3, 0, 0),
+        }
+        for name, moment in edges.items():
+            create_trip(self.driver, name, start=timezone.make_aware(moment, tz))
+
+        response = self.client.get('/api/trips/trips/', {'start_date': '2025-04-01', 'end_date': '2025-04-02'})
+        numbers = {row['trip_number'] for row in response.data['results']}
+        self.assertEqual(numbers, {'T-first', 'T-last'})
+
+    def test_last_representable_end_date_is_unbounded(self):
+        create_trip(self.driver, 'any')
+        response = self.client.get('/api/trips/trips/', {'end_date': '9999-12-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+
+
+class KeysetPaginationTests(APITestMixin, TestCase):
+    def walk(self, url, params):
+        seen, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(row['id'] for row in response.data['results'])
+            pages += 1
+            if not response.data['next']:
+                return seen, pages, response
+            response = self.client.get(response.data['next'])
+
+    def test_trips_walk_forward_with_tied_start_times(self):
+        start = timezone.now()
+        trips = [create_trip(self.driver, i, start=start - timedelta(hours=i // 3)) for i in range(7)]
+        expected = [t.id for t in sorted(trips, key=lambda t: (t.planned_start_time, t.id), reverse=True)]
+
+        seen, pages, last = self.walk('/api/trips/trips/', {'pagination': 'cursor', 'page_size': 3})
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 3)
+
+        previous = self.client.get(last.data['previous'])
+        self.assertEqual([row['id'] for row in previous.data['results']], expected[3:6])
+
+    def test_events_and_stops_keyset_order(self):
+        trip = create_trip(self.driver, 1)
+        moment = timezone.now()
+        events = [create_event(trip, event_time=moment - timedelta(minutes=i // 2)) for i in range(5)]
+        stops = [create_stop(trip, order) for order in (3, 1, 2)]
+
+        seen, _, _ = self.walk('/api/trips/events/', {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(seen, [e.id for e in sorted(events, key=lambda e: (e.event_time, e.id), reverse=True)])
+
+        seen, _, _ = self.walk('/api/trips/stops/', {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(seen, [s.id for s in sorted(stops, key=lambda s: s.stop_order)])
+
+    def test_page_number_clients_unchanged(self):
+        create_trip(self.driver, 1)
+        response = self.client.get('/api/trips/trips/', {'page': 1})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/trips/trips/', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_forged_cursor_values(self):
+        create_trip(self.driver, 'one')
+        for key in ([None, None], ['2025-01-01T00:00:00+00:00', None], [{}, 1], [[1], 1],
+                    ['2025-01-01T00:00:00+00:00', 2 ** 70], [True, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps({'k': key}).encode()).decode()
+            with self.subTest(key=key):
+                response = self.client.get('/api/trips/trips/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class BulkEventIngestTests(QueryBudgetMixin, APITestMixin, TestCase):
+    url = '/api/trips/events/bulk/'
+
+    def setUp(self):
+        super().setUp()
+        self.trips = [create_trip(self.driver, i) for i in range(3)]
+
+    def test_json_array_with_partial_failures(self):
+        payload = [
+            {'trip': self.trips[0].id, 'event_type': 'other', 'description': 'ping', 'latitude': '33.7490', 'longitude': '-84.3880'},
+            {'trip': 999999, 'event_type': 'other', 'description': 'unknown trip'},
+            {'trip': self.trips[1].id, 'event_type': 'bogus', 'description': 'bad type'},
+            {'trip': self.trips[2].id, 'event_type': 'fuel', 'description': 'fuel', 'event_time': '2025-05-01T10:00:00Z'},
+        ]
+        # Trip lookup, one INSERT, position upkeep (two reads and an upsert)
+        # and a savepoint pair, independent of batch size
+        with self.assertQueryBudget(7):
+            response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertIn('trip', response.data['errors'][0]['errors'])
+        self.assertIn('event_type', response.data['errors'][1]['errors'])
+        self.assertEqual(TripEvent.objects.count(), 2)
+
+    def test_ndjson_body(self):
+        lines = [
+            f'{{"trip": {self.trips[0].id}, "event_type": "delay", "description": "traffic"}}'.encode(),
+            b'',
+            b'{not json',
+            b'{"description": "caf\xe9"}',
+            b'[1]',
+            f'{{"trip": {self.trips[1].id}, "event_type": "other", "description": "ping"}}'.encode(),
+        ]
+        response = self.client.post(self.url, b'\n'.join(lines), content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        # Indexes are line numbers, blank lines included
+        self.assertEqual([error['index'] for error in response.data['errors']], [2, 3, 4])
+        self.assertTrue(response.data['errors'][1]['errors']['non_field_errors'][0].startswith('Invalid utf-8'))
+
+    def test_rejects_non_list_body(self):
+        response = self.client.post(self.url, {'trip': self.trips[0].id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        other = create_driver('driver2')
+        self.trip = create_trip(self.driver, 1, notes='mine')
+        create_trip(other, 2)
+        create_event(self.trip, additional_data={'gallons': 80}, latitude=Decimal('33.749000'))
+
+    def content(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_trip_csv_honors_filters(self):
+        response = self.client.get('/api/trips/trips/export/', {'driver': self.driver.id, 'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = self.content(response).splitlines()
+        self.assertTrue(lines[0].startswith('id,trip_number,driver,'))
+        self.assertEqual(len(lines), 2)
+        self.assertIn('T-1', lines[1])
+
+    def test_event_ndjson(self):
+        response = self.client.get('/api/trips/events/export/', {'format': 'ndjson'})
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['trip_number'], 'T-1')
+        self.assertEqual(rows[0]['additional_data'], {'gallons': 80})
+        self.assertEqual(rows[0]['latitude'], '33.749000')
+
+
+class IncludeRelatedTests(QueryBudgetMixin, APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.trips = []
+        for i in range(4):
+            trip = create_trip(self.driver, i)
+            for order in range(1, 3):
+                create_stop(trip, order)
+            for minute in range(5):
+                create_event(trip, event_time=timezone.now() - timedelta(minutes=minute))
+            self.trips.append(trip)
+
+    def test_list_embeds_collections_in_bounded_queries(self):
+        # validators + count + trips + stops + events
+        with self.assertQueryBudget(5):
+            response = self.client.get('/api/trips/trips/', {'include': 'stops,events', 'events_limit': 2})
+        for row in response.data['results']:
+            self.assertEqual([stop['stop_order'] for stop in row['stops']], [1, 2])
+            self.assertEqual(len(row['events']), 2)
+            self.assertEqual(row['events'][0]['trip_number'], row['trip_number'])
+
+    def test_events_are_capped_by_default(self):
+        with mock.patch.object(TripViewSet, 'default_events_limit', 3):
+            response = self.client.get('/api/trips/trips/', {'include': 'events'})
+        for row in response.data['results']:
+            self.assertEqual(len(row['events']), 3)
+
+    def test_events_limit_is_clamped(self):
+        response = self.client.get('/api/trips/trips/', {'include': 'events', 'events_limit': 10 ** 20})
+        self.assertEqual(response.status_code, 200)
+        for row in response.data['results']:
+            self.assertEqual(len(row['events']), 5)
+
+    def test_retrieve_embeds_only_requested(self):
+        with self.assertQueryBudget(3):
+            response = self.client.get(f'/api/trips/trips/{self.trips[0].id}/', {'include': 'stops'})
+        self.assertEqual(len(response.data['stops']), 2)
+        self.assertNotIn('events', response.data)
+
+    def test_without_include_shape_is_unchanged(self):
+        response = self.client.get(f'/api/trips/trips/{self.trips[0].id}/')
+        self.assertNotIn('stops', response.data)
+
+
+# The suite runs in one process, where the locmem cache is coherent
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(QueryBudgetMixin, APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.trip = create_trip(self.driver, 1)
+        self.stop = create_stop(self.trip, 1)
+        self.detail = f'/api/trips/trips/{self.trip.id}/'
+
+    def assertCached(self, url, params=None):
+        self.client.get(url, params)
+        # Only the conditional GET validator query reaches the database
+        with self.assertQueryBudget(1):
+            response = self.client.get(url, params)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        return response
+
+    @override_settings(RESPONSE_CACHE_ENABLED=None)
+    def test_per_process_cache_is_off_unless_forced(self):
+        self.client.get(self.detail)
+        self.assertFalse(self.client.get(self.detail).has_header('X-Cache'))
+        with mock.patch('driver_truck.caching.versions_shared', return_value=True):
+            self.assertCached(self.detail)
+
+    def test_repeat_reads_are_served_from_cache(self):
+        hits = cache_stats()['hits']
+        self.assertCached(self.detail)
+        self.assertCached('/api/trips/trips/')
+        self.assertEqual(cache_stats()['hits'], hits + 2)
+
+    def test_transitions_invalidate(self):
+        self.assertCached(self.detail)
+        self.client.post(f'{self.detail}start_trip/')
+        response = self.client.get(self.detail)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['status'], 'in_progress')
+
+        self.assertCached('/api/trips/trips/', {'include': 'stops'})
+        self.client.post(f'/api/trips/stops/{self.stop.id}/depart/')
+        response = self.client.get('/api/trips/trips/', {'include': 'stops'})
+        self.assertTrue(response.data['results'][0]['stops'][0]['is_completed'])
+
+    def test_bulk_events_and_driver_changes_invalidate(self):
+        self.assertCached(self.detail, {'include': 'events'})
+        self.client.post('/api/trips/events/bulk/', [
+            {'trip': self.trip.id, 'event_type': 'other', 'description': 'ping'},
+        ], format='json')
+        response = self.client.get(self.detail, {'include': 'events'})
+        self.assertEqual(len(response.data['events']), 1)
+
+        self.assertCached('/api/trips/trips/')
+        self.driver.first_name = 'Renamed'
+        self.driver.save()
+        response = self.client.get('/api/trips/trips/')
+        self.assertEqual(response.data['results'][0]['driver_name'], 'Renamed Driver1')
+
+    def test_stats_endpoint(self):
+        response = self.client.get('/api/cache/stats/')
+        self.assertTrue({'hits', 'misses', 'hit_rate'} <= set(response.json()))
+
+
+class ConditionalGetTests(QueryBudgetMixin, APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.trip = create_trip(self.driver, 1, status='in_progress')
+        self.stop = create_stop(self.trip, 1)
+
+    def assertRevalidates(self, url, params=None):
+        first = self.client.get(url, params)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', first)
+        # Validators only: nothing is fetched or serialized
+        with self.assertQueryBudget(1):
+            second = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        return first
+
+    def test_trip_list_and_detail(self):
+        params = {'driver': self.driver.id, 'status': 'in_progress'}
+        first = self.assertRevalidates('/api/trips/trips/', params)
+        self.assertRevalidates(f'/api/trips/trips/{self.trip.id}/')
+
+        self.client.post(f'/api/trips/trips/{self.trip.id}/complete_trip/')
+        response = self.client.get('/api/trips/trips/', params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 0)
+
+    def test_if_modified_since(self):
+        first = self.client.get(f'/api/trips/trips/{self.trip.id}/')
+        response = self.client.get(
+            f'/api/trips/trips/{self.trip.id}/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_stop_changes_replace_version_marker(self):
+        first = self.assertRevalidates('/api/trips/stops/', {'trip': self.trip.id})
+        self.client.post(f'/api/trips/stops/{self.stop.id}/arrive/')
+        response = self.client.get('/api/trips/stops/', {'trip': self.trip.id}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data['results'][0]['actual_arrival'])
+
+    def test_event_list_and_missing_object(self):
+        create_event(self.trip)
+        self.assertRevalidates('/api/trips/events/')
+        self.assertEqual(self.client.get('/api/trips/trips/999999/').status_code, 404)
+
+    def test_writes_from_other_workers_change_validators(self):
+        first = self.assertRevalidates('/api/trips/stops/', {'trip': self.trip.id})
+        drivers = self.client.get('/api/drivers/drivers/')
+        # Another worker's write bumps that worker's per-process version tokens only
+        with mock.patch('trips.signals.invalidate'), mock.patch('drivers.signals.invalidate'):
+            self.stop.notes = 'Dock 4'
+            self.stop.save()
+            self.driver.first_name = 'Renamed'
+            self.driver.save()
+        response = self.client.get('/api/trips/stops/', {'trip': self.trip.id}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/drivers/drivers/', HTTP_IF_NONE_MATCH=drivers['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_malformed_lookup_is_not_found(self):
+        for url in ('/api/trips/trips/abc/', '/api/trips/stops/abc/', '/api/trips/events/abc/',
+                    '/api/drivers/drivers/abc/', '/api/drivers/vehicles/abc/'):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+
+class SpatialFilterTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.trip = create_trip(
+            self.driver, 1,
+            origin_latitude=Decimal('33.748995'), origin_longitude=Decimal('-84.387982'),
+            destination_latitude=Decimal('36.162664'), destination_longitude=Decimal('-86.781602'),
+        )
+        # Atlanta, ~20 mi north of Atlanta, Chattanooga
+        self.atlanta = create_event(self.trip, latitude=Decimal('33.748995'), longitude=Decimal('-84.387982'))
+        self.north = create_event(self.trip, latitude=Decimal('34.040000'), longitude=Decimal('-84.330000'))
+        self.chattanooga = create_stop(self.trip, 1, latitude=Decimal('35.045631'), longitude=Decimal('-85.309677'))
+
+    def ids(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['results']}
+
+    def test_grid_cell_maintained_on_save_and_bulk(self):
+        self.assertEqual(self.atlanta.grid_cell, grid_cell(33.748995, -84.387982))
+        self.assertEqual(self.trip.destination_grid_cell, grid_cell(36.162664, -86.781602))
+        self.client.post('/api/trips/events/bulk/', [
+            {'trip': self.trip.id, 'event_type': 'other', 'description': 'ping',
+             'latitude': '34.000000', 'longitude': '-84.000000'},
+        ], format='json')
+        self.assertEqual(TripEvent.objects.latest('id').grid_cell, grid_cell(34, -84))
+
+    def test_near_refines_candidates_by_distance(self):
+        url = '/api/trips/events/'
+        self.assertEqual(self.ids(url, {'near': '33.75,-84.39', 'radius_mi': 5}), {self.atlanta.id})
+        self.assertEqual(self.ids(url, {'near': '33.75,-84.39', 'radius_mi': 30}), {self.atlanta.id, self.north.id})
+
+    def test_near_refines_in_sql_without_candidate_lists(self):
+        # SQLite caps bound variables (32766 by default), so candidates must
+        # not come back as a pk IN (...) list however large the radius
+        TripEvent.objects.bulk_create([
+            TripEvent(trip=self.trip, event_type='other', description='ping', event_time=timezone.now(),
+                      latitude=Decimal('33.700000'), longitude=Decimal('-84.400000'), grid_cell=grid_cell(33.7, -84.4))
+            for _ in range(300)
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/trips/events/', {'near': '33.75,-84.39', 'radius_mi': 500})
+        self.assertEqual(response.data['count'], 302)
+        self.assertFalse([query for query in queries if '"trip_events"."id" IN' in query['sql']])
+
+    def test_near_on_trips_matches_either_endpoint_and_stops(self):
+        self.assertEqual(self.ids('/api/trips/trips/', {'near': '36.16,-86.78', 'radius_mi': 10}), {self.trip.id})
+        self.assertEqual(self.ids('/api/trips/trips/', {'near': '40.71,-74.00', 'radius_mi': 10}), set())
+        self.assertEqual(self.ids('/api/trips/stops/', {'near': '35.0,-85.3', 'radius_mi': 10}), {self.chattanooga.id})
+
+    def test_bbox(self):
+        ids = self.ids('/api/trips/events/', {'bbox': '-84.5,33.5,-84.2,33.9'})
+        self.assertEqual(ids, {self.atlanta.id})
+
+    def test_haversine(self):
+        distance = haversine_miles(33.748995, -84.387982, [36.162664], [-86.781602])[0]
+        self.assertAlmostEqual(distance, 214, delta=2)
+        self.assertIsNone(grid_cell(None, -84))
+
+
+class FleetPositionTests(QueryBudgetMixin, APITestMixin, TestCase):
+    url = '/api/trips/fleet/positions/'
+
+    def setUp(self):
+        super().setUp()
+        self.trips = [create_trip(create_driver(f'fleet{i}'), i, status='in_progress') for i in range(3)]
+
+    def test_positions_follow_newest_event(self):
+        now = timezone.now()
+        trip = self.trips[0]
+        create_event(trip, latitude=Decimal('33.000000'), longitude=Decimal('-84.000000'), event_time=now)
+        create_event(trip, latitude=Decimal('32.000000'), longitude=Decimal('-83.000000'),
+                     event_time=now - timedelta(minutes=5))
+        create_event(trip, description='no fix')
+
+        position = LastKnownPosition.objects.get(trip=trip)
+        self.assertEqual(position.latitude, Decimal('33.000000'))
+        self.assertEqual(position.driver_id, trip.driver_id)
+
+    def test_bulk_path_and_single_query_feed(self):
+        self.client.post('/api/trips/events/bulk/', [
+            {'trip': trip.id, 'event_type': 'other', 'description': 'ping',
+             'latitude': f'3{i}.500000', 'longitude': '-84.000000'}
+            for i, trip in enumerate(self.trips)
+        ], format='json')
+        Trip.objects.filter(id=self.trips[2].id).update(status='completed')
+
+        with self.assertQueryBudget(1):
+            response = self.client.get(self.url)
+        self.assertEqual([row['trip'] for row in response.data['positions']], [t.id for t in self.trips[:2]])
+
+        since = response.data['as_of'].isoformat()
+        self.assertEqual(self.client.get(self.url, {'since': since}).data['positions'], [])
+
+        create_event(self.trips[1], latitude=Decimal('35.000000'), longitude=Decimal('-85.000000'))
+        moved = self.client.get(self.url, {'since': since}).data['positions']
+        self.assertEqual([row['trip'] for row in moved], [self.trips[1].id])
+
+
+class TripEventStreamTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.trip = create_trip(self.driver, 1)
+        self.other = create_trip(create_driver('driver2', carrier_name='Other Freight'), 2)
+
+    def test_writes_publish_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            event = create_event(self.trip, description='gps')
+            self.client.post(f'/api/trips/trips/{self.trip.id}/start_trip/')
+        published = [(m.event, m.trip_id) for m in list(broker.history)[-3:]]
+        self.assertEqual(published, [('trip_event', self.trip.id)] * 2 + [('trip_status', self.trip.id)])
+        self.assertIn(f'"id":{event.id}'.encode(), list(broker.history)[-3].frame)
+
+    def test_slow_subscriber_is_cut_off(self):
+        async def scenario():
+            local = EventBroker(queue_size=2)
+            subscription, _ = local.subscribe(asyncio.get_running_loop())
+            for i in range(3):
+                local.publish('trip_event', {'n': i}, trip_id=1)
+            await asyncio.sleep(0)
+            return subscription.queue.get_nowait()
+        self.assertIs(asyncio.run(scenario()), OVERFLOW)
+
+    async def test_stream_filters_and_resumes_from_last_event_id(self):
+        missed = broker.publish('trip_event', {'n': 1}, trip_id=self.trip.id)
+        broker.publish('trip_event', {'n': 2}, trip_id=self.other.id)
+        since = missed.id - 1
+
+        client = AsyncClient()
+        await client.aforce_login(self.driver)
+        response = await client.get(
+            '/api/trips/stream/', {'trip': self.trip.id}, headers={'Last-Event-ID': str(since)}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        self.assertEqual(await anext(stream), missed.frame)
+
+        filtered = await client.get('/api/trips/stream/', {'driver': self.other.driver_id},
+                                    headers={'Last-Event-ID': str(since)})
+        stream = aiter(filtered.streaming_content)
+        await anext(stream)
+        self.assertIn(b'"n":2', await anext(stream))
+
+    async def test_malformed_filter_is_rejected(self):
+        client = AsyncClient()
+        await client.aforce_login(self.driver)
+        for params in ({'trip': 'abc'}, {'driver': '1.5'}):
+            with self.subTest(params=params):
+                response = await client.get('/api/trips/stream/', params)
+                self.assertEqual(response.status_code, 400)
+
+    async def test_requires_authentication(self):
+        response = await AsyncClient().get('/api/trips/stream/')
+        self.assertEqual(response.status_code, 403)
+
+
+class DriverDailyStatsTests(QueryBudgetMixin, APITestMixin, TestCase):
+    url = '/api/trips/driver-stats/'
+
+    def snapshot(self):
+        return list(DriverDailyStats.objects.order_by('driver', 'day').values(
+            'driver', 'day', 'trips_completed', 'planned_miles', 'actual_miles',
+            'actual_duration', 'stops_completed', 'delay_events',
+        ))
+
+    def test_writes_update_rollup_in_their_transaction(self):
+        trip = create_trip(
+            self.driver, 1, status='in_progress',
+            actual_start_time=timezone.now() - timedelta(hours=3),
+        )
+        stop = create_stop(trip, 1)
+        self.client.post(f'/api/trips/stops/{stop.id}/depart/')
+        self.client.post('/api/trips/events/', {
+            'trip': trip.id, 'event_type': 'delay', 'description': 'traffic',
+        }, format='json')
+        self.client.post('/api/trips/events/bulk/', [
+            {'trip': trip.id, 'event_type': 'delay', 'description': 'weigh station'},
+            {'trip': trip.id, 'event_type': 'other', 'description': 'ping'},
+        ], format='json')
+        self.client.post(f'/api/trips/trips/{trip.id}/complete_trip/', {'actual_distance': '240.50'}, format='json')
+
+        stats = DriverDailyStats.objects.get(driver=self.driver, day=stats_day(timezone.now()))
+        self.assertEqual(stats.trips_completed, 1)
+        self.assertEqual(stats.planned_miles, Decimal('250.00'))
+        self.assertEqual(stats.actual_miles, Decimal('240.50'))
+        self.assertAlmostEqual(stats.actual_hours, 3, places=1)
+        self.assertEqual(stats.stops_completed, 1)
+        self.assertEqual(stats.delay_events, 2)
+
+        # A full rebuild from the raw tables agrees with the incremental rows
+        incremental = self.snapshot()
+        rebuild()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_list_and_summary(self):
+        other = create_driver('driver2')
+        today = stats_day(timezone.now())
+        for day, driver, trips in [(0, self.driver, 2), (1, self.driver, 1), (0, other, 4), (9, self.driver, 5)]:
+            DriverDailyStats.objects.create(
+                driver=driver, day=today - timedelta(days=day), trips_completed=trips,
+                planned_miles=Decimal('100.00') * trips, actual_duration=timedelta(hours=trips),
+            )
+        params = {'start_date': (today - timedelta(days=1)).isoformat(), 'end_date': today.isoformat()}
+
+        with self.assertQueryBudget(3):
+            response = self.client.get(self.url, {**params, 'driver': self.driver.id})
+        self.assertEqual([row['trips_completed'] for row in response.data['results']], [2, 1])
+        self.assertEqual(response.data['results'][0]['actual_hours'], 2.0)
+
+        response = self.client.get(f'{self.url}summary/', params)
+        self.assertEqual(
+            [(row['driver'], row['days'], row['trips_completed'], row['actual_hours']) for row in response.data],
+            [(self.driver.id, 2, 3, 3.0), (other.id, 1, 4, 4.0)],
+        )
+        self.assertEqual(response.data[0]['planned_miles'], '300.00')
+
+    def test_rebuild_command_replaces_only_the_range(self):
+        day = stats_day(timezone.now())
+        trip = create_trip(
+            self.driver, 1, status='completed',
+            actual_start_time=timezone.now() - timedelta(hours=2), actual_end_time=timezone.now(),
+        )
+        # The delay event creates today's row through the incremental path
+        create_event(trip, event_type='delay', event_time=trip.actual_end_time)
+        DriverDailyStats.objects.filter(day=day).update(trips_completed=99)
+        DriverDailyStats.objects.create(driver=self.driver, day=day - timedelta(days=5), trips_completed=7)
+
+        call_command('rebuild_rollups', '--start', day.isoformat(), '--end', day.isoformat(), stdout=StringIO())
+
+        rebuilt = DriverDailyStats.objects.get(day=day)
+        self.assertEqual((rebuilt.trips_completed, rebuilt.delay_events), (1, 1))
+        self.assertEqual(DriverDailyStats.objects.get(day=day - timedelta(days=5)).trips_completed, 7)
+
+
+class LaneStatsTests(QueryBudgetMixin, APITestMixin, TestCase):
+    url = '/api/trips/lanes/'
+
+    def complete(self, number, hours, distance=None, late=False, **kwargs):
+        started = timezone.now() - timedelta(hours=hours)
+        trip = create_trip(
+            self.driver, number, start=started, status='in_progress', actual_start_time=started,
+            planned_end_time=started + timedelta(hours=hours - 1 if late else hours + 1), **kwargs
+        )
+        data = {'actual_distance': distance} if distance else {}
+        self.client.post(f'/api/trips/trips/{trip.id}/complete_trip/', data, format='json')
+        return trip
+
+    def snapshot(self):
+        return sorted(LaneStats.objects.values_list(
+            'origin_state', 'destination_state', 'origin_city', 'destination_city',
+            'trips', 'on_time_trips', 'total_miles', 'planned_seconds', 'actual_seconds',
+        ))
+
+    def test_completion_updates_cube_and_matches_rebuild(self):
+        self.complete(1, 4, distance='240.00')
+        self.complete(2, 6, late=True)
+        self.complete(3, 3, destination_city='Knoxville')
+        self.complete(4, 5, origin_city='Macon', destination_state='AL', destination_city='Mobile')
+
+        response = self.client.get(self.url, {'origin_state': 'GA', 'destination_state': 'TN'})
+        lane = response.data['results'][0]
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(lane['trips'], 3)
+        self.assertEqual(lane['avg_miles'], Decimal('246.67'))
+        self.assertEqual(lane['on_time_rate'], round(2 / 3, 4))
+
+        with self.assertQueryBudget(3):
+            response = self.client.get(f'{self.url}cities/', {'origin_state': 'GA', 'destination_state': 'TN'})
+        self.assertEqual(
+            [(row['origin_city'], row['destination_city'], row['trips']) for row in response.data['results']],
+            [('Atlanta', 'Nashville', 2), ('Atlanta', 'Knoxville', 1)],
+        )
+
+        incremental = self.snapshot()
+        self.assertEqual(lanes.rebuild(), 5)
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_group_totals(self):
+        columns = {
+            'origin_state': np.array(['GA', 'GA', 'TX', 'GA']),
+            'destination_state': np.array(['TN', 'TN', 'TN', 'AL']),
+            'total_miles': np.array([100.0, 200.0, 50.0, 10.0]),
+            'planned_seconds': np.array([3600, 7200, 60, 1]),
+            'actual_seconds': np.array([3600, 3600, 60, 1]),
+            'on_time_trips': np.array([1, 0, 1, 1]),
+        }
+        labels, counts, sums = lanes.group_totals(columns, lanes.STATE_KEYS)
+        totals = {label: (int(count), sums['total_miles'][i]) for i, (label, count) in enumerate(zip(labels, counts))}
+        self.assertEqual(totals, {('GA', 'AL'): (1, 10.0), ('GA', 'TN'): (2, 300.0), ('TX', 'TN'): (1, 50.0)})
+        self.assertEqual(lanes.build(lanes.extract()), [])
+
+
+class SparseFieldsetTests(QueryBudgetMixin, APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.trips = [create_trip(self.driver, i, notes='x' * 500) for i in range(3)]
+
+    def page_sql(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        # The last query fetches the page itself
+        return response, queries.captured_queries[-1]['sql']
+
+    def test_fields_limit_output_and_columns(self):
+        response, sql = self.page_sql('/api/trips/trips/', {'fields': 'id,trip_number,status'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'trip_number', 'status'])
+        self.assertNotIn('"notes"', sql)
+        self.assertNotIn('JOIN', sql)
+
+        response, sql = self.page_sql('/api/trips/trips/', {'fields': 'trip_number,driver_name'})
+        self.assertEqual(response.data['results'][0]['driver_name'], 'Test Driver1')
+        self.assertIn('JOIN', sql)
+        self.assertNotIn('"date_joined"', sql)
+
+    def test_omit(self):
+        response, sql = self.page_sql(f'/api/trips/trips/{self.trips[0].id}/', {'omit': 'notes,driver_name'})
+        self.assertNotIn('notes', response.data)
+        self.assertNotIn('driver_name', response.data)
+        self.assertIn('origin_full_address', response.data)
+        self.assertNotIn('"notes"', sql)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/trips/trips/', {'fields': 'id,bogus'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('bogus', response.data['fields'])
+
+    def test_keyset_pages_and_related_fields_stay_within_budget(self):
+        event = create_event(self.trips[0], event_type='fuel')
+        with self.assertQueryBudget(3):
+            response = self.client.get('/api/trips/events/', {'fields': 'id,trip_number'})
+        self.assertEqual(response.data['results'][0], {'id': event.id, 'trip_number': 'T-0'})
+
+        params = {'fields': 'id', 'pagination': 'cursor', 'page_size': 2}
+        with self.assertQueryBudget(2):
+            first = self.client.get('/api/trips/trips/', params)
+        second = self.client.get(first.data['next'])
+        ids = [row['id'] for row in first.data['results'] + second.data['results']]
+        self.assertEqual(sorted(ids), sorted(trip.id for trip in self.trips))
+
+    def test_writes_ignore_fields(self):
+        response = self.client.post('/api/trips/events/?fields=id', {
+            'trip': self.trips[0].id, 'event_type': 'other', 'description': 'ping',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('description', response.data)
+
+
+class FastReadPathTests(APITestMixin, TestCase):
+    """
+    Compiled list responses must match the DRF serializers byte for byte
+    """
+
+    def setUp(self):
+        super().setUp()
+        other = create_driver('driver2', first_name='', last_name='')
+        winter = timezone.make_aware(datetime(2025, 1, 15, 8, 30, 15, 123456))
+        summer = timezone.make_aware(datetime(2025, 7, 4, 23, 59, 59))
+        trips = [
+            create_trip(self.driver, 1, start=winter, status='completed', actual_start_time=winter,
+                        actual_end_time=winter + timedelta(hours=6), actual_distance=Decimal('301.50'),
+                        load_description='Crème brûlée'),
+            create_trip(other, 2, start=summer, status='in_progress', estimated_distance=Decimal('0.10'),
+                        load_weight=Decimal('42000.00')),
+            create_trip(other, 3, status='cancelled', notes='No notes'),
+        ]
+        for i, trip in enumerate(trips):
+            create_stop(trip, 1, stop_type='pickup', latitude=Decimal('33.748995'), longitude=Decimal('-84.387982'))
+            create_stop(trip, 2, actual_arrival=summer if i else None, is_completed=bool(i))
+            create_event(trip, event_type='delay', event_time=winter, additional_data={'minutes': 45, 'why': ['traffic']})
+            create_event(trip, event_time=summer, location='I-75', latitude=Decimal('34.000000'))
+
+    def assertSameBytes(self, viewset, url, params=None):
+        fast = self.client.get(url, params)
+        with mock.patch.object(viewset, 'fast_list', False):
+            slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_trip_list_parity(self):
+        with mock.patch.object(TripListSerializer, 'to_representation', side_effect=AssertionError):
+            self.assertEqual(self.client.get('/api/trips/trips/').status_code, 200)
+        response = self.assertSameBytes(TripViewSet, '/api/trips/trips/')
+        self.assertEqual(response.data['count'], 3)
+        self.assertSameBytes(TripViewSet, '/api/trips/trips/', {'fields': 'id,driver_name,estimated_distance'})
+        self.assertSameBytes(TripViewSet, '/api/trips/trips/', {'pagination': 'cursor', 'page_size': 2})
+
+    def test_stop_and_event_list_parity(self):
+        self.assertSameBytes(TripStopViewSet, '/api/trips/stops/')
+        self.assertSameBytes(TripStopViewSet, '/api/trips/stops/', {'pagination': 'cursor', 'omit': 'notes'})
+        self.assertSameBytes(TripEventViewSet, '/api/trips/events/')
+        self.assertSameBytes(TripEventViewSet, '/api/trips/events/', {'event_type': 'delay'})
+
+    def test_nested_includes_use_the_serializer(self):
+        response = self.assertSameBytes(TripViewSet, '/api/trips/trips/', {'include': 'stops'})
+        self.assertEqual(len(response.data['results'][0]['stops']), 2)
+
+
+class RenderingTests(APITestMixin, TestCase):
+    def test_fast_json_matches_drf(self):
+        moment = timezone.make_aware(datetime(2025, 3, 9, 1, 59, 59, 987654))
+        data = {
+            'when': moment, 'utc': moment.astimezone(timezone.get_fixed_timezone(0)), 'day': moment.date(), 'clock': moment.time(),
+            'miles': Decimal('301.50'), 'ratio': 0.1, 'big': 2 ** 62, 'none': None, 'flag': True,
+            'label': lazy(str, str)('Delay'), 'text': 'Crème brûlée \u2028 line', 'nested': [{'lat': Decimal('33.748995')}],
+            'array': np.array([1, 2]), 7: 'int key',
+        }
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(renderers.FastJSONRenderer().render(None), b'')
+
+        create_trip(self.driver, 1, load_description='Crème brûlée')
+        response = self.client.get('/api/trips/trips/')
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        indented = self.client.get('/api/trips/trips/', HTTP_ACCEPT='application/json; indent=2')
+        self.assertIn(b'\n  ', indented.content)
+
+    def test_fast_json_parser(self):
+        trip = create_trip(self.driver, 1)
+        response = self.client.post(
+            '/api/trips/events/bulk/', json.dumps([{'trip': trip.id, 'event_type': 'other', 'description': 'é'}]),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(TripEvent.objects.get().description, 'é')
+        response = self.client.post('/api/trips/events/bulk/', '[{"trip": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['detail'].startswith('JSON parse error'))
+
+    @unittest.skipUnless(renderers.msgpack, 'msgpack is not installed')
+    def test_msgpack_round_trip(self):
+        create_trip(self.driver, 1)
+        response = self.client.get('/api/trips/trips/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(renderers.msgpack.unpackb(response.content), json.loads(JSONRenderer().render(response.data)))
+
+    def test_negotiate_encoding(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(negotiate_encoding('gzip;q=0, *'), 'br' if 'br' in available_encoders() else None)
+        self.assertEqual(negotiate_encoding('br;q=0.5, gzip;q=0.8'), 'gzip')
+        self.assertIsNone(negotiate_encoding('identity'))
+        self.assertIsNone(negotiate_encoding(''))
+
+    def test_compression_threshold_and_opt_out(self):
+        for i in range(10):
+            create_trip(self.driver, i)
+        plain = self.client.get('/api/trips/trips/')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        compressed = self.client.get('/api/trips/trips/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertLess(len(compressed.content), len(plain.content))
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+
+        small = self.client.get('/api/trips/trips/', {'fields': 'id', 'page_size': 1}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+        with mock.patch.object(TripViewSet, 'compress_responses', False, create=True):
+            opted_out = self.client.get('/api/trips/trips/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(opted_out.has_header('Content-Encoding'))
+        export = self.client.get('/api/trips/trips/export/', HTTP_ACCEPT='text/csv', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(export.has_header('Content-Encoding'))
+
+
+class FleetGeneratorTests(TestCase):
+    def generate(self, *args):
+        call_command('generate_fleet', '--drivers', '3', '--trips-per-driver', '4', '--events-per-trip', '6',
+                     '--prefix', 'T', *args, stdout=StringIO())
+
+    def test_generates_consistent_fleet(self):
+        self.generate()
+        self.assertEqual(Driver.objects.filter(username__startswith='t').count(), 3)
+        self.assertEqual(Trip.objects.count(), 12)
+        self.assertEqual(TripStop.objects.count(), 36)
+        self.assertEqual(set(Trip.objects.filter(trip_number__endswith='-0003').values_list('status', flat=True)), {'planned'})
+        in_progress = Trip.objects.filter(status='in_progress')
+        self.assertEqual(in_progress.count(), 3)
+        self.assertEqual(LastKnownPosition.objects.count(), 3)
+        for trip in Trip.objects.filter(status__in=['completed', 'in_progress']):
+            events = list(trip.events.order_by('pk'))
+            self.assertEqual([event.event_time for event in events], sorted(event.event_time for event in events))
+            self.assertEqual(events[0].event_type, 'start')
+            if trip.status == 'completed':
+                self.assertEqual(len(events), 6)
+                self.assertEqual(events[-1].event_type, 'complete')
+        self.assertFalse(TripEvent.objects.filter(trip__status='planned').exists())
+        self.assertEqual(DriverDailyStats.objects.aggregate(total=Sum('trips_completed'))['total'],
+                         Trip.objects.filter(status='completed').count())
+
+        with self.assertRaises(CommandError):
+            self.generate()
+        self.generate('--prefix', 'U', '--skip-stats')
+        self.assertEqual(Trip.objects.count(), 24)
+        last = Trip.objects.order_by('-pk').first().pk
+        self.assertEqual(create_trip(Driver.objects.first(), 'next').pk, last + 1)
+
+    def test_vehicle_identifiers_do_not_collide_across_prefixes(self):
+        self.assertEqual(len(vehicle_vin('GEN', 1)), 17)
+        self.assertEqual(len(vehicle_vin('LONGPREFIX', 1)), 17)
+        prefixes = ['GEN', 'GEN2', 'GEN0', 'GENX', 'GENXX0', 'LONGPREFIX', 'LONGPREFIX2']
+        vins = {vehicle_vin(prefix, index) for prefix in prefixes for index in (0, 1, 20, 2000000)}
+        self.assertEqual(len(vins), len(prefixes) * 4)
+
+        self.generate('--prefix', 'GEN')
+        self.generate('--prefix', 'GEN2')
+        self.assertEqual(Vehicle.objects.values('vin').distinct().count(), 6)
+
+        Vehicle.objects.create(license_plate='HAND-1', vin=vehicle_vin('GEN3', 1), make='Volvo', model='VNL', year=2022)
+        with self.assertRaisesMessage(CommandError, 'HAND-1'):
+            self.generate('--prefix', 'GEN3')
+        self.assertFalse(Driver.objects.filter(username__startswith='gen3').exists())
+
+    def test_rows_are_deterministic(self):
+        spec = FleetSpec(drivers=2, trips_per_driver=3, stops_per_trip=2, events_per_trip=5, seed=7,
+                         start=timezone.make_aware(datetime(2025, 1, 6)), prefix='T', bases=next_ids())
+        # Only the created/updated audit columns depend on the clock
+        with mock.patch('django.utils.timezone.now', return_value=spec.start):
+            first, second = prepare_chunk(spec, 0, 2), prepare_chunk(spec, 0, 2)
+        self.assertEqual(first, second)
+        self.assertNotEqual(prepare_chunk(spec._replace(seed=8), 0, 2), first)
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True, RESPONSE_CACHE_ENABLED=True)
+class RequestProfilingTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        reset_profiling_stats()
+
+    def timings(self, response):
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing_log_and_summary(self):
+        for i in range(3):
+            create_trip(self.driver, i)
+        with self.assertLogs('driver_truck.profiling', 'INFO') as logs, CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/trips/trips/')
+        metrics, executed = self.timings(response), len(queries)
+        self.assertEqual(set(metrics), {'sql', 'serialize', 'render', 'total', 'size'})
+        self.assertEqual(metrics['sql']['desc'], f'"{executed} queries"')
+        self.assertEqual(metrics['size']['desc'], f'"{len(response.content)} bytes"')
+        self.assertGreater(float(metrics['render']['dur']), 0)
+        self.assertGreater(float(metrics['serialize']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['sql']['dur']))
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['endpoint'], line['status'], line['sql_queries']), ('GET trip-list', 200, executed))
+        self.assertEqual(line['duplicates'], 0)
+
+        with self.assertLogs('driver_truck.profiling', 'INFO'):
+            cached = self.timings(self.client.get('/api/trips/trips/'))
+            stats = self.client.get('/api/profiling/stats/').json()
+        cached_queries = int(cached['sql']['desc'].strip('"').split()[0])
+        self.assertLess(cached_queries, executed)
+        self.assertEqual(stats['GET trip-list']['requests'], 2)
+        self.assertEqual(stats['GET trip-list']['n_plus_one'], 0)
+        self.assertEqual(stats['GET trip-list']['avg_sql_queries'], (executed + cached_queries) / 2)
+
+        with override_settings(REQUEST_PROFILING_ENABLED=False):
+            self.assertFalse(self.client.get('/api/trips/trips/').has_header('Server-Timing'))
+
+    def test_disabled_profiling_leaves_serializers_alone(self):
+        with override_settings(REQUEST_PROFILING_ENABLED=False), \
+                mock.patch('driver_truck.profiling.install_serializer_timer') as install:
+            self.assertEqual(self.client.get('/api/trips/trips/').status_code, 200)
+        install.assert_not_called()
+
+        with mock.patch('driver_truck.profiling.install_serializer_timer') as install, \
+                self.assertLogs('driver_truck.profiling', 'INFO'):
+            self.client.get('/api/trips/trips/')
+        install.assert_called_once_with()
+
+    def test_flags_repeated_queries(self):
+        for i in range(6):
+            create_stop(create_trip(self.driver, i), 1)
+        unjoined = mock.patch.object(TripStopViewSet, 'get_queryset', lambda view: TripStop.objects.order_by('pk'))
+        with unjoined, mock.patch.object(TripStopViewSet, 'fast_list', False), \
+                self.assertLogs('driver_truck.profiling', 'INFO') as logs:
+            response = self.client.get('/api/trips/stops/')
+        self.assertEqual(self.timings(response)['nplus1']['desc'], '"1 repeated query shapes"')
+        warning, = [record for record in logs.records if record.levelname == 'WARNING']
+        flagged = json.loads(warning.getMessage())
+        self.assertEqual(flagged['executions'], 6)
+        self.assertIn('FROM "trips" WHERE', flagged['possible_n_plus_one'])
+
+        with self.assertLogs('driver_truck.profiling', 'INFO') as logs:
+            response = self.client.get('/api/trips/stops/')
+        self.assertNotIn('nplus1', self.timings(response))
+        self.assertEqual(profiling_stats()['GET tripstop-list']['n_plus_one'], 1)
+
+
+class TripTransitionTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.trip = create_trip(self.driver, 1)
+        self.url = f'/api/trips/trips/{self.trip.id}/'
+
+    def test_transition_is_one_conditional_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'{self.url}start_trip/')
+        self.assertEqual(response.data['status'], 'in_progress')
+        update, = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "trips"')]
+        self.assertIn('"status" IN', update)
+        self.assertNotIn('origin_address', update)
+        self.assertEqual(list(self.trip.events.values_list('event_type', flat=True)), ['start'])
+
+        response = self.client.post(f'{self.url}start_trip/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Trip can only be started from planned status')
+        self.assertEqual(self.trip.events.count(), 1)
+        self.assertEqual(self.client.post('/api/trips/trips/999999/start_trip/').status_code, 404)
+
+    def test_cancel_and_resume(self):
+        self.client.post(f'{self.url}cancel_trip/')
+        self.assertEqual(self.client.post(f'{self.url}resume_trip/').data['status'], 'planned')
+        self.client.post(f'{self.url}start_trip/')
+        self.assertEqual(self.client.post(f'{self.url}cancel_trip/').data['status'], 'cancelled')
+        self.assertEqual(self.client.post(f'{self.url}complete_trip/').status_code, 400)
+        self.assertEqual(self.client.post(f'{self.url}resume_trip/').data['status'], 'in_progress')
+        self.assertEqual(self.client.post(f'{self.url}resume_trip/').data['error'],
+                         'Trip can only be resumed from cancelled status')
+
+    def test_complete_validates_distance(self):
+        self.client.post(f'{self.url}start_trip/')
+        response = self.client.post(f'{self.url}complete_trip/', {'actual_distance': 'far'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('actual_distance', response.data)
+        response = self.client.post(f'{self.url}complete_trip/', {'actual_distance': '240.50'}, format='json')
+        self.assertEqual((response.data['status'], response.data['actual_distance']), ('completed', '240.50'))
+        self.assertEqual(DriverDailyStats.objects.get().trips_completed, 1)
+        self.assertEqual(LaneStats.objects.filter(origin_city='Atlanta').count(), 1)
+
+
+def retry_locked(func, *args):
+    """
+    Retry like a client would while SQLite reports a lock instead of waiting
+
+    The shared-cache in-memory test database fails a second writer at
+    once, where a file database would wait out its busy timeout.
+    """
+    while True:
+        try:
+            return func(*args)
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            time.sleep(0.001)
+
+
+class TripTransitionConcurrencyTests(TransactionTestCase):
+    """
+    Parallel transitions against the test database: shared-cache SQLite
+    here, row locks when the suite runs on PostgreSQL
+    """
+
+    def run_parallel(self, threads, target):
+        barrier = threading.Barrier(threads)
+
+        def run(number):
+            try:
+                barrier.wait()
+                target(number)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=run, args=(number,)) for number in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def test_parallel_starts_have_one_winner(self):
+        trip = create_trip(create_driver(), 1)
+        outcomes = []
+
+        def start(number):
+            try:
+                retry_locked(transitions.start, trip.pk)
+                outcomes.append('started')
+            except transitions.InvalidTransition:
+                outcomes.append('rejected')
+
+        self.run_parallel(8, start)
+        self.assertEqual(sorted(outcomes), ['rejected'] * 7 + ['started'])
+        self.assertEqual(list(trip.events.values_list('event_type', flat=True)), ['start'])
+
+    def test_random_transitions_keep_history_consistent(self):
+        driver = create_driver()
+        trip_ids = [create_trip(driver, i).pk for i in range(3)]
+        applied = []
+
+        def churn(number):
+            rng = random.Random(number)
+            for _ in range(40):
+                name = rng.choice(list(transitions.TRANSITIONS))
+                try:
+                    retry_locked(transitions.transition, rng.choice(trip_ids), name)
+                    applied.append(name)
+                except transitions.InvalidTransition:
+                    pass
+
+        self.run_parallel(8, churn)
+        descriptions = {spec.description: name for name, spec in transitions.TRANSITIONS.items()}
+        self.assertEqual(TripEvent.objects.count(), len(applied))
+        for trip in Trip.objects.filter(pk__in=trip_ids):
+            # Replaying the event log through the state machine ends where the row is
+            current, started = 'planned', False
+            for description in trip.events.order_by('pk').values_list('description', flat=True):
+                name = descriptions[description]
+                self.assertIn(current, transitions.TRANSITIONS[name].sources)
+                started = started or name == 'start'
+                current = {'start': 'in_progress', 'complete': 'completed', 'cancel': 'cancelled',
+                           'resume': 'in_progress' if started else 'planned'}[name]
+            self.assertEqual(trip.status, current)
+        completed = Trip.objects.filter(status='completed').count()
+        self.assertEqual(applied.count('complete'), completed)
+        self.assertEqual(DriverDailyStats.objects.aggregate(total=Sum('trips_completed'))['total'] or 0, completed)
+
+
+class OfflineSyncTests(QueryBudgetMixin, APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.trip = create_trip(self.driver, 1, status='in_progress')
+        self.stops = [create_stop(self.trip, order) for order in range(1, 4)]
+        self.at = timezone.now() - timedelta(hours=3)
+
+    def minutes(self, minutes):
+        return (self.at + timedelta(minutes=minutes)).isoformat()
+
+    def sync(self, checkpoints, events=()):
+        return self.client.post('/api/trips/stops/sync/', {'checkpoints': checkpoints, 'events': list(events)},
+                                format='json')
+
+    def test_applies_device_times_once(self):
+        first, second, _ = self.stops
+        checkpoints = [
+            {'stop': first.id, 'action': 'arrive', 'at': self.minutes(0)},
+            {'stop': first.id, 'action': 'depart', 'at': self.minutes(20)},
+            {'stop': second.id, 'action': 'arrive', 'at': self.minutes(90)},
+        ]
+        events = [{'trip': self.trip.id, 'event_type': 'delay', 'event_time': self.minutes(45),
+                   'latitude': '35.1', 'longitude': '-85.3', 'description': 'traffic'}]
+        with self.assertQueryBudget(24):
+            response = self.sync(checkpoints, events)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['applied'], response.data['unchanged'], response.data['failed']), (3, 0, 0))
+        self.assertEqual(response.data['events_created'], 2)
+        self.assertEqual([stop['is_completed'] for stop in response.data['stops']], [True, False, False])
+
+        first.refresh_from_db()
+        self.assertEqual((first.actual_arrival, first.actual_departure),
+                         (self.at, self.at + timedelta(minutes=20)))
+        stop_event = self.trip.events.get(event_type='stop')
+        self.assertEqual(stop_event.event_time, first.actual_departure)
+        self.assertEqual(LastKnownPosition.objects.get(trip=self.trip).event_time, self.at + timedelta(minutes=45))
+        stats = DriverDailyStats.objects.get(driver=self.driver, day=stats_day(self.at + timedelta(minutes=20)))
+        self.assertEqual((stats.stops_completed, stats.delay_events), (1, 1))
+
+        # A retried upload changes nothing
+        response = self.sync(checkpoints, events)
+        self.assertEqual((response.data['applied'], response.data['unchanged'], response.data['events_created']), (0, 3, 0))
+        self.assertEqual(self.trip.events.count(), 2)
+        self.assertEqual(DriverDailyStats.objects.get(pk=stats.pk).stops_completed, 1)
+
+    def test_queries_do_not_grow_with_batch(self):
+        trip = create_trip(self.driver, 2, status='in_progress')
+        stops = self.stops + [create_stop(trip, order) for order in range(1, 4)]
+        checkpoints = [
+            {'stop': stop.id, 'action': action, 'at': self.minutes(10 * number + offset)}
+            for number, stop in enumerate(stops) for offset, action in enumerate(['arrive', 'depart'])
+        ]
+        with self.assertQueryBudget(24):
+            response = self.sync(checkpoints)
+        self.assertEqual(response.data['applied'], 12)
+        self.assertEqual(len(response.data['stops']), 6)
+
+    def test_invalid_items_are_reported(self):
+        first = self.stops[0]
+        response = self.sync([
+            {'stop': first.id, 'action': 'arrive', 'at': self.minutes(30)},
+            {'stop': first.id, 'action': 'depart', 'at': self.minutes(10)},
+            {'stop': 999999, 'action': 'arrive', 'at': self.minutes(10)},
+            {'stop': first.id, 'action': 'wave'},
+        ], [{'trip': 999999, 'event_type': 'other', 'description': 'ping'}, 'ping'])
+        self.assertEqual((response.data['applied'], response.data['failed']), (1, 5))
+        errors = {(next(iter(error)), error[next(iter(error))]): error['errors'] for error in response.data['errors']}
+        self.assertEqual(errors[('checkpoint', 1)]['non_field_errors'], ['Departure is before the recorded arrival.'])
+        self.assertEqual(errors[('checkpoint', 2)]['non_field_errors'], ['Stop 999999 does not exist.'])
+        self.assertEqual(set(errors[('checkpoint', 3)]), {'action', 'at'})
+        self.assertIn('trip', errors[('event', 0)])
+        self.assertIn(('event', 1), errors)
+        self.assertEqual(self.sync({'stop': first.id}).status_code, 400)
+
+    def test_single_actions_take_device_time(self):
+        first = self.stops[0]
+        url = f'/api/trips/stops/{first.id}/'
+        self.assertEqual(self.client.post(f'{url}arrive/', {'at': self.minutes(0)}, format='json').status_code, 200)
+        response = self.client.post(f'{url}depart/', {'at': self.minutes(-5)}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(f'{url}depart/')
+        self.assertTrue(response.data['is_completed'])
+        self.client.post(f'{url}depart/')
+        self.assertEqual(self.trip.events.filter(event_type='stop').count(), 1)
+
+
+class SyncFeedTests(QueryBudgetMixin, APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = create_driver('driver2')
+        self.trip = create_trip(self.driver, 1)
+        self.stops = [create_stop(self.trip, order) for order in range(1, 3)]
+        self.vehicle = Vehicle.objects.create(license_plate='SYNC-1', vin='1HGBH41JXMN109186', make='Volvo',
+                                              model='VNL', year=2022, assigned_driver=self.driver)
+        self.event = create_event(self.trip)
+        create_trip(self.other, 2)
+
+    def sync(self, since=None, **params):
+        if since is not None:
+            params['since'] = since
+        response = self.client.get('/api/sync/', {'driver': self.driver.id, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def ids(self, data, name):
+        return [row['id'] for row in data['changes'][name]]
+
+    def test_snapshot_then_only_changes(self):
+        snapshot = self.sync()
+        self.assertEqual(self.ids(snapshot, 'trips'), [self.trip.id])
+        self.assertEqual(self.ids(snapshot, 'stops'), [stop.id for stop in self.stops])
+        self.assertEqual(self.ids(snapshot, 'vehicles'), [self.vehicle.id])
+        self.assertEqual(self.sync(snapshot['next'])['next'], snapshot['next'])
+
+        for _ in range(3):
+            self.trip.notes = 'Gate code 1234'
+            self.trip.save()
+        removed = self.stops[1].id
+        self.stops[1].delete()
+        create_trip(self.other, 3)
+        with self.assertQueryBudget(6):
+            delta = self.sync(snapshot['next'])
+        self.assertEqual(self.ids(delta, 'trips'), [self.trip.id])
+        self.assertEqual(self.ids(delta, 'stops'), [])
+        self.assertEqual(delta['deleted']['stops'], [removed])
+        self.assertGreater(delta['next'], snapshot['next'])
+        self.assertFalse(delta['has_more'])
+        self.assertEqual(SyncChange.objects.filter(model='trip', object_id=self.trip.id).count(), 1)
+
+    def test_reassignment_tombstones_previous_owner(self):
+        token = self.sync()['next']
+        self.vehicle.assigned_driver = self.other
+        self.vehicle.save()
+        self.trip.driver = self.other
+        self.trip.save()
+        delta = self.sync(token)
+        self.assertEqual(delta['deleted']['vehicles'], [self.vehicle.id])
+        self.assertEqual(delta['deleted']['trips'], [self.trip.id])
+        self.assertEqual(delta['deleted']['stops'], [stop.id for stop in self.stops])
+        self.assertEqual(delta['deleted']['events'], [self.event.id])
+        delta = self.sync(token, driver=self.other.id)
+        self.assertEqual(self.ids(delta, 'vehicles'), [self.vehicle.id])
+        self.assertEqual(self.ids(delta, 'trips'), [self.trip.id])
+        self.assertEqual(self.ids(delta, 'stops'), [stop.id for stop in self.stops])
+        self.assertEqual(self.ids(delta, 'events'), [self.event.id])
+
+    def test_cascade_deletes_are_recorded_in_bulk(self):
+        trips = [create_trip(self.other, f'O-{number}') for number in range(5)]
+        for trip in trips:
+            create_stop(trip, 1)
+            for _ in range(8):
+                create_event(trip)
+        self.vehicle.assigned_driver = self.other
+        self.vehicle.save()
+        other_id = self.other.id
+        token = self.sync(driver=other_id)['next']
+        with CaptureQueriesContext(connection) as queries:
+            self.other.delete()
+        # Lookup, cleanup and insert per model (driver, trips, stops, events, vehicles), not per row
+        self.assertEqual(sum('sync_changes' in query['sql'] for query in queries), 15)
+        delta = self.sync(token, driver=other_id)
+        self.assertEqual(len(delta['deleted']['trips']), 6)
+        self.assertEqual(len(delta['deleted']['stops']), 5)
+        self.assertEqual(len(delta['deleted']['events']), 40)
+        self.assertEqual(delta['deleted']['vehicles'], [self.vehicle.id])
+        self.assertFalse(any(delta['changes'].values()))
+
+    def test_retried_delete_is_recorded_again(self):
+        token = self.sync()['next']
+        trips = Trip.objects.filter(pk=self.trip.pk)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            trips.delete()
+            raise RuntimeError
+        self.assertEqual(self.sync(token)['deleted']['trips'], [])
+        trips.delete()
+        delta = self.sync(token)
+        self.assertEqual(delta['deleted']['trips'], [self.trip.pk])
+        self.assertEqual(delta['deleted']['stops'], [stop.id for stop in self.stops])
+
+    def test_snapshot_pages(self):
+        for _ in range(3):
+            create_event(self.trip)
+        seen, token, has_more = [], 0, True
+        while has_more:
+            page = self.sync(token, limit=2)
+            seen.extend((name, row['id']) for name, rows in page['changes'].items() for row in rows)
+            token, has_more = page['next'], page['has_more']
+        self.assertEqual(len(seen), 1 + 2 + 4 + 1)
+        self.assertEqual(token, changes.current_token())
+
+    def test_bulk_writes_and_transitions_are_recorded(self):
+        token = self.sync()['next']
+        self.client.post('/api/trips/events/bulk/', [
+            {'trip': self.trip.id, 'event_type': 'other', 'description': f'ping {index}'} for index in range(3)
+        ], format='json')
+        transitions.start(self.trip.id)
+        delta = self.sync(token)
+        self.assertEqual(len(delta['changes']['events']), 4)
+        self.assertEqual(delta['changes']['trips'][0]['status'], 'in_progress')
+
+        page = self.sync(token, limit=2)
+        self.assertTrue(page['has_more'])
+        self.assertEqual(len(page['changes']['events']), 2)
+        rest = self.sync(page['next'])
+        self.assertFalse(rest['has_more'])
+        self.assertEqual(len(rest['changes']['events']) + len(rest['changes']['trips']), 3)
+
+    def test_inserted_rows_and_bad_tokens(self):
+        SyncChange.objects.all().delete()
+        changes.record_inserted(TripStop, TripStop.objects.all())
+        self.assertEqual(set(SyncChange.objects.values_list('object_id', 'driver_id')),
+                         {(stop.id, self.driver.id) for stop in self.stops})
+        self.assertEqual(len(self.sync(0)['changes']['stops']), 2)
+        for params in ({'since': -1}, {'since': 'abc'}, {'limit': 'x'}, {'driver': 10 ** 20}, {'since': 2 ** 63}):
+            self.assertEqual(self.client.get('/api/sync/', params).status_code, 400)
+
+
+class DatabaseProfileTests(TestCase):
+    def test_connections_use_production_profile(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 10000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_profiles(self):
+        self.assertNotIn('OPTIONS', sqlite_database('db.sqlite3', 'default'))
+        database = sqlite_database('db.sqlite3', busy_timeout=250)
+        self.assertIn('PRAGMA journal_mode = WAL', database['OPTIONS']['init_command'])
+        self.assertIn('PRAGMA busy_timeout = 250', database['OPTIONS']['init_command'])
+        self.assertEqual(database['CONN_MAX_AGE'], 600)
+        with self.assertRaises(ValueError):
+            sqlite_database('db.sqlite3', 'fast')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], RESPONSE_CACHE_ENABLED=False)
+class ReadReplicaTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.driver = create_driver()
+        self.trip = create_trip(self.driver, 1)
+        create_stop(self.trip, 1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.driver)
+
+    def queries(self, method, url, **kwargs):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(self.client, method)(url, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400)
+        return len(primary), len(replica)
+
+    def test_safe_reads_use_replica(self):
+        for url in ('/api/trips/trips/', f'/api/trips/trips/{self.trip.id}/', f'/api/trips/trips/{self.trip.id}/stops/',
+                    f'/api/drivers/drivers/{self.driver.id}/trips/', '/api/trips/trips/export/', '/api/trips/events/export/'):
+            primary, replica = self.queries('get', url)
+            self.assertEqual(primary, 0, url)
+            self.assertGreater(replica, 0, url)
+        self.assertEqual(self.queries('get', '/api/sync/')[1], 0)
+
+    def test_writers_stick_to_primary(self):
+        primary, replica = self.queries('post', f'/api/trips/trips/{self.trip.id}/start_trip/')
+        self.assertEqual(replica, 0)
+        self.assertIn(STICKY_COOKIE, self.client.cookies)
+        primary, replica = self.queries('get', f'/api/trips/trips/{self.trip.id}/')
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+
+        self.client.cookies[STICKY_COOKIE] = str(time.time() - 1)
+        self.assertEqual(self.queries('get', f'/api/trips/trips/{self.trip.id}/')[0], 0)
+
+    def test_reads_after_writes_use_primary(self):
+        with read_from('replica') as state:
+            self.assertEqual(router.db_for_read(Trip), 'replica')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Trip), 'default')
+            self.assertEqual(router.db_for_write(Trip, instance=Trip.objects.get(pk=self.trip.pk)), 'default')
+            self.assertTrue(state.wrote)
+            self.assertEqual(router.db_for_read(Trip), 'default')
+        self.assertEqual(router.db_for_read(Trip), 'default')
+
+    def test_copy_database(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        source, target = os.path.join(directory, 'primary.sqlite3'), os.path.join(directory, 'replica.sqlite3')
+        with sqlite3.connect(source) as primary:
+            primary.execute('CREATE TABLE trips (id INTEGER PRIMARY KEY)')
+            primary.executemany('INSERT INTO trips VALUES (?)', [(1,), (2,)])
+        primary.close()
+        copy_database(source, target)
+        with sqlite3.connect(source) as primary:
+            primary.execute('INSERT INTO trips VALUES (3)')
+        primary.close()
+        copy_database(source, target)
+        replica = sqlite3.connect(target)
+        self.assertEqual(replica.execute('SELECT COUNT(*) FROM trips').fetchone()[0], 3)
+        replica.close()
@@ -0,0 +1,118 @@
+"""
+Trip state machine
+
+Each transition is a single ``UPDATE trips SET <changed columns> WHERE
+id = %s AND status IN (<allowed sources>)`` followed by its TripEvent,
+both in one atomic block. The database decides which of two concurrent
+requests wins: the loser's UPDATE matches no row and raises
+InvalidTransition, so a trip is never started or completed twice.
+``queryset.update`` sends no signals, so the cache, rollup, lane,
+sync-feed and stream hooks are called here.
+
+    planned --start--> in_progress --complete--> completed
+    planned / in_progress --cancel--> cancelled
+    cancelled --resume--> planned (never started) / in_progress
+"""
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+from driver_truck.caching import invalidate
+from . import lanes, rollups
+from .changes import record_changes
+from .models import Trip, TripEvent, TripStatus
+from .streams import publish_trip_status
+
+
+class Transition(NamedTuple):
+    sources: tuple
+    verb: str
+    event_type: str
+    description: str
+
+
+TRANSITIONS = {
+    'start': Transition((TripStatus.PLANNED,), 'started', 'start', 'Trip started'),
+    'complete': Transition((TripStatus.IN_PROGRESS,), 'completed', 'complete', 'Trip completed'),
+    'cancel': Transition((TripStatus.PLANNED, TripStatus.IN_PROGRESS), 'cancelled', 'other', 'Trip cancelled'),
+    'resume': Transition((TripStatus.CANCELLED,), 'resumed', 'other', 'Trip resumed'),
+}
+
+
+class InvalidTransition(Exception):
+    """
+    The trip was not in a status the transition starts from
+    """
+
+    def __init__(self, name, current):
+        self.name = name
+        self.current = current
+        transition = TRANSITIONS[name]
+        sources = ' or '.join(transition.sources)
+        super().__init__(f'Trip can only be {transition.verb} from {sources} status')
+
+
+def changes_for(name, now):
+    """
+    Column values the UPDATE for transition ``name`` writes
+    """
+    if name == 'start':
+        return {'status': TripStatus.IN_PROGRESS, 'actual_start_time': now}
+    if name == 'complete':
+        return {'status': TripStatus.COMPLETED, 'actual_end_time': now}
+    if name == 'cancel':
+        return {'status': TripStatus.CANCELLED}
+    # A resumed trip goes back to where it was before it was cancelled
+    return {'status': Case(
+        When(actual_start_time__isnull=True, then=Value(TripStatus.PLANNED)),
+        default=Value(TripStatus.IN_PROGRESS),
+    )}
+
+
+def transition(trip_id, name, **changes):
+    """
+    Apply transition ``name`` to trip ``trip_id``; returns the updated trip
+
+    ``changes`` are extra columns written by the same UPDATE (for example
+    ``actual_distance`` on complete). Raises Trip.DoesNotExist or
+    InvalidTransition.
+    """
+    spec = TRANSITIONS[name]
+    now = timezone.now()
+    values = {**changes_for(name, now), **changes, 'updated_at': now}
+    with transaction.atomic():
+        updated = Trip.objects.filter(pk=trip_id, status__in=spec.sources).update(**values)
+        if not updated:
+            current = Trip.objects.filter(pk=trip_id).values_list('status', flat=True).first()
+            if current is None:
+                raise Trip.DoesNotExist(f'Trip {trip_id} does not exist')
+            raise InvalidTransition(name, current)
+
+        trip = Trip.objects.select_related('driver').get(pk=trip_id)
+        TripEvent.objects.create(trip=trip, event_type=spec.event_type, event_time=now, description=spec.description)
+        if name == 'complete':
+            rollups.record_trip_completed(trip)
+            lanes.record_trip_completed(trip)
+        invalidate(f'trip:{trip.pk}', 'trips')
+        record_changes(Trip, [trip])
+        publish_trip_status(trip)
+    return trip
+
+
+def start(trip_id):
+    return transition(trip_id, 'start')
+
+
+def complete(trip_id, actual_distance=None):
+    changes = {} if actual_distance is None else {'actual_distance': actual_distance}
+    return transition(trip_id, 'complete', **changes)
+
+
+def cancel(trip_id):
+    return transition(trip_id, 'cancel')
+
+
+def resume(trip_id):
+    return transition(trip_id, 'resume')
@@ -1,12 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TripViewSet, TripStopViewSet, TripEventViewSet
+from .streams import trip_event_stream
+from .views import TripViewSet, TripStopViewSet, TripEventViewSet, FleetPositionViewSet, DriverDailyStatsViewSet, LaneStatsViewSet
 
 router = DefaultRouter()
 router.register(r'trips', TripViewSet)
 router.register(r'stops', TripStopViewSet)
 router.register(r'events', TripEventViewSet)
+router.register(r'fleet/positions', FleetPositionViewSet, basename='fleet-position')
+router.register(r'driver-stats', DriverDailyStatsViewSet)
+router.register(r'lanes', LaneStatsViewSet)
 
 urlpatterns = [
+    path('stream/', trip_event_stream, name='trip-event-stream'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,23 +1,86 @@
-from rest_framework import viewsets, status
+from rest_framework import mixins, serializers, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.db.models import Count, Prefetch, Sum
+from django.http import Http404
+from driver_truck.caching import CachedReadMixin
+from driver_truck.conditional import ConditionalGetMixin
+from driver_truck.fastpath import FastListMixin
+from driver_truck.fieldsets import SparseFieldsetMixin
+from driver_truck.renderers import FastJSONParser
+from driver_truck.replicas import ReplicaReadMixin
 from django.utils import timezone
-from datetime import datetime
-from .models import Trip, TripStop, TripEvent
+from django.utils.dateparse import parse_datetime
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from drivers.models import Vehicle
+from drivers.serializers import VehicleSerializer
+from . import changes, transitions
+from .models import Trip, TripStop, TripEvent, LastKnownPosition, DriverDailyStats, LaneStats, SyncChange
+from .exports import streaming_export
+from .geo import SpatialFilterMixin
+from .pagination import TripPagination, TripStopPagination, TripEventPagination
+from .parsers import BlankLine, NDJSONParser
+from .renderers import CSVRenderer, NDJSONRenderer
 from .serializers import (
     TripSerializer, TripCreateSerializer, TripListSerializer,
-    TripStopSerializer, TripStopCreateSerializer,
-    TripEventSerializer, TripEventCreateSerializer
+    TripStopSerializer, TripStopCreateSerializer, TripStopCheckpointSerializer,
+    TripEventSerializer, TripEventCreateSerializer, TripEventBulkItemSerializer,
+    LastKnownPositionSerializer, DriverDailyStatsSerializer, DriverStatsSummarySerializer,
+    LaneStatsSerializer, LaneCityStatsSerializer
 )
+from .services import apply_checkpoints, record_events
 
 
-class TripViewSet(viewsets.ModelViewSet):
+def local_day_start(day):
+    """
+    Midnight of ``day`` in the current timezone as an aware datetime
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class TripViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedReadMixin, SpatialFilterMixin, SparseFieldsetMixin,
+                  FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Trip model
     """
     queryset = Trip.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = TripPagination
+    cache_tag = 'trip'
+    cache_dependencies = ('drivers',)
+    conditional_modified_field = 'updated_at'
+    change_log = SyncChange
+    spatial_points = (
+        ('origin_latitude', 'origin_longitude', 'origin_grid_cell'),
+        ('destination_latitude', 'destination_longitude', 'destination_grid_cell'),
+    )
+    includable = {'stops', 'events'}
+    default_events_limit = 50
+    max_events_limit = 1000
+    export_columns = {
+        'id': 'id',
+        'trip_number': 'trip_number',
+        'driver': 'driver_id',
+        'driver_username': 'driver__username',
+        'status': 'status',
+        'origin_city': 'origin_city',
+        'origin_state': 'origin_state',
+        'destination_city': 'destination_city',
+        'destination_state': 'destination_state',
+        'planned_start_time': 'planned_start_time',
+        'planned_end_time': 'planned_end_time',
+        'actual_start_time': 'actual_start_time',
+        'actual_end_time': 'actual_end_time',
+        'estimated_distance': 'estimated_distance',
+        'actual_distance': 'actual_distance',
+        'load_description': 'load_description',
+        'load_weight': 'load_weight',
+    }
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -27,7 +90,7 @@ class TripViewSet(viewsets.ModelViewSet):
         return TripSerializer
     
     def get_queryset(self):
-        queryset = Trip.objects.all()
+        queryset = Trip.objects.select_related('driver')
         
         # Filter by driver
         driver_id = self.request.query_params.get('driver')
@@ -43,81 +106,125 @@ class TripViewSet(viewsets.ModelViewSet):
         start_date = self.request.query_params.get('start_date')
         end_date = self.request.query_params.get('end_date')
         
+        # Compare against local-midnight bounds instead of using __date so
+        # the (driver|status, -planned_start_time) indexes can serve the range
         if start_date:
             try:
                 start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(planned_start_time__date__gte=start_date)
+                queryset = queryset.filter(planned_start_time__gte=local_day_start(start_date))
             except ValueError:
                 pass
         
         if end_date:
             try:
                 end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(planned_start_time__date__lte=end_date)
+                # The last representable day has no next midnight; it bounds nothing
+                if end_date < date.max:
+                    queryset = queryset.filter(
+                        planned_start_time__lt=local_day_start(end_date + timedelta(days=1))
+                    )
             except ValueError:
                 pass
         
+        # Filter by proximity (?near=lat,lon&radius_mi=) or bounding box (?bbox=)
+        queryset = self.filter_spatial(queryset)
+        
+        # Embed related collections (?include=stops,events) with one query each
+        include = self.get_include()
+        if 'stops' in include:
+            queryset = queryset.prefetch_related(
+                Prefetch('stops', queryset=TripStop.objects.order_by('stop_order'))
+            )
+        if 'events' in include:
+            events = TripEvent.objects.order_by('-event_time', '-id')
+            # Sliced prefetches must use to_attr
+            queryset = queryset.prefetch_related(
+                Prefetch('events', queryset=events[:self.get_events_limit()], to_attr='included_events')
+            )
+        
         return queryset.order_by('-planned_start_time')
     
+    def get_cache_tags(self):
+        tags = super().get_cache_tags()
+        if self.action == 'list':
+            include = self.get_include()
+            tags += [f'trip_{name}' for name in sorted(include)]
+        return tags
+    
+    def get_include(self):
+        if self.action not in ['list', 'retrieve']:
+            return set()
+        requested = self.request.query_params.get('include', '')
+        return {name.strip() for name in requested.split(',')} & self.includable
+    
+    def get_events_limit(self):
+        try:
+            limit = int(self.request.query_params.get('events_limit', ''))
+        except ValueError:
+            return self.default_events_limit
+        return min(limit, self.max_events_limit) if limit > 0 else self.default_events_limit
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include'] = self.get_include()
+        return context
+    
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Stream all trips matching the list filters as CSV or NDJSON
+        """
+        return streaming_export(
+            self.get_queryset(), self.export_columns, request.accepted_renderer.format, 'trips'
+        )
+    
     @action(detail=True, methods=['post'])
     def start_trip(self, request, pk=None):
         """
         Start a trip
         """
-        trip = self.get_object()
-        
-        if trip.status != 'planned':
-            return Response(
-                {'error': 'Trip can only be started from planned status'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        trip.status = 'in_progress'
-        trip.actual_start_time = timezone.now()
-        trip.save()
-        
-        # Create start event
-        TripEvent.objects.create(
-            trip=trip,
-            event_type='start',
-            event_time=trip.actual_start_time,
-            description='Trip started'
-        )
-        
-        serializer = TripSerializer(trip)
-        return Response(serializer.data)
+        return self.transition_response(pk, 'start')
     
     @action(detail=True, methods=['post'])
     def complete_trip(self, request, pk=None):
         """
         Complete a trip
         """
-        trip = self.get_object()
-        
-        if trip.status != 'in_progress':
-            return Response(
-                {'error': 'Trip can only be completed from in_progress status'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
+        values = {}
         actual_distance = request.data.get('actual_distance')
-        
-        trip.status = 'completed'
-        trip.actual_end_time = timezone.now()
-        if actual_distance:
-            trip.actual_distance = actual_distance
-        trip.save()
-        
-        # Create completion event
-        TripEvent.objects.create(
-            trip=trip,
-            event_type='complete',
-            event_time=trip.actual_end_time,
-            description='Trip completed'
-        )
-        
-        serializer = TripSerializer(trip)
-        return Response(serializer.data)
+        if actual_distance not in (None, ''):
+            field = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=0)
+            try:
+                values['actual_distance'] = field.run_validation(actual_distance)
+            except ValidationError as error:
+                raise ValidationError({'actual_distance': error.detail})
+        return self.transition_response(pk, 'complete', **values)
+    
+    @action(detail=True, methods=['post'])
+    def cancel_trip(self, request, pk=None):
+        """
+        Cancel a planned or in-progress trip
+        """
+        return self.transition_response(pk, 'cancel')
+    
+    @action(detail=True, methods=['post'])
+    def resume_trip(self, request, pk=None):
+        """
+        Resume a cancelled trip where it left off
+        """
+        return self.transition_response(pk, 'resume')
+    
+    def transition_response(self, pk, name, **values):
+        """
+        Run a state transition as one conditional UPDATE (see transitions.py)
+        """
+        try:
+            trip = transitions.transition(pk, name, **values)
+        except (Trip.DoesNotExist, ValueError):
+            raise Http404
+        except transitions.InvalidTransition as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(TripSerializer(trip).data)
     
     @action(detail=True, methods=['get'])
     def stops(self, request, pk=None):
@@ -140,12 +247,18 @@ class TripViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class TripStopViewSet(viewsets.ModelViewSet):
+class TripStopViewSet(ReplicaReadMixin, ConditionalGetMixin, SpatialFilterMixin, SparseFieldsetMixin, FastListMixin,
+                      viewsets.ModelViewSet):
     """
     ViewSet for TripStop model
     """
     queryset = TripStop.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = TripStopPagination
+    version_tags = ('trip_stops', 'trips')
+    change_log = SyncChange
+    spatial_points = (('latitude', 'longitude', 'grid_cell'),)
+    sync_max_items = 5000
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -153,7 +266,7 @@ class TripStopViewSet(viewsets.ModelViewSet):
         return TripStopSerializer
     
     def get_queryset(self):
-        queryset = TripStop.objects.all()
+        queryset = TripStop.objects.select_related('trip')
         
         # Filter by trip
         trip_id = self.request.query_params.get('trip')
@@ -170,48 +283,129 @@ class TripStopViewSet(viewsets.ModelViewSet):
         if is_completed is not None:
             queryset = queryset.filter(is_completed=is_completed.lower() == 'true')
         
+        # Filter by proximity (?near=lat,lon&radius_mi=) or bounding box (?bbox=)
+        queryset = self.filter_spatial(queryset)
+        
         return queryset.order_by('trip', 'stop_order')
     
     @action(detail=True, methods=['post'])
     def arrive(self, request, pk=None):
         """
-        Mark arrival at a stop
+        Mark arrival at a stop (now, or at the device time in ``at``)
         """
-        stop = self.get_object()
-        stop.actual_arrival = timezone.now()
-        stop.save()
-        
-        serializer = TripStopSerializer(stop)
-        return Response(serializer.data)
+        return self.checkpoint_response(request, pk, 'arrive')
     
     @action(detail=True, methods=['post'])
     def depart(self, request, pk=None):
         """
-        Mark departure from a stop
+        Mark departure from a stop (now, or at the device time in ``at``)
         """
+        return self.checkpoint_response(request, pk, 'depart')
+    
+    def checkpoint_response(self, request, pk, action):
         stop = self.get_object()
-        stop.actual_departure = timezone.now()
-        stop.is_completed = True
-        stop.save()
-        
-        # Create stop completion event
-        TripEvent.objects.create(
-            trip=stop.trip,
-            event_type='stop',
-            event_time=stop.actual_departure,
-            description=f'Completed {stop.get_stop_type_display()} at {stop.city}, {stop.state}'
-        )
+        checkpoint = TripStopCheckpointSerializer().run_validation({
+            'stop': stop.pk, 'action': action, 'at': request.data.get('at') or timezone.now(),
+        })
+        (result,), stops, _ = apply_checkpoints([checkpoint])
+        if result not in ('applied', 'unchanged'):
+            return Response({'error': result}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(TripStopSerializer(stops[stop.pk]).data)
+    
+    @action(detail=False, methods=['post'], parser_classes=[FastJSONParser])
+    def sync(self, request):
+        """
+        Replay checkpoints and events recorded while a device was offline
+
+        The body is ``{"checkpoints": [{"stop", "action", "at"}, ...],
+        "events": [<bulk event item>, ...]}``, checkpoints in device order.
+        Valid items are applied in one transaction and invalid ones are
+        reported by index. The response carries every stop of the
+        affected trips as stored after the merge.
+        """
+        data = request.data
+        if not isinstance(data, dict) or not isinstance(data.get('checkpoints', []), list) \
+                or not isinstance(data.get('events', []), list):
+            return Response(
+                {'error': 'Expected {"checkpoints": [...], "events": [...]}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        items = {'checkpoints': data.get('checkpoints', []), 'events': data.get('events', [])}
+        if sum(len(batch) for batch in items.values()) > self.sync_max_items:
+            return Response(
+                {'error': f'Batch too large, at most {self.sync_max_items} items per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        serializer = TripStopSerializer(stop)
-        return Response(serializer.data)
+        errors = []
+        valid = {}
+        validators = {'checkpoints': TripStopCheckpointSerializer(), 'events': TripEventBulkItemSerializer()}
+        for section, batch in items.items():
+            valid[section] = []
+            for index, item in enumerate(batch):
+                if not isinstance(item, dict):
+                    errors.append({section[:-1]: index, 'errors': {'non_field_errors': ['Expected an object']}})
+                    continue
+                try:
+                    valid[section].append((index, validators[section].run_validation(item)))
+                except ValidationError as exc:
+                    errors.append({section[:-1]: index, 'errors': exc.detail})
+        
+        trip_ids = {event['trip'] for _, event in valid['events']}
+        known_trips = Trip.objects.only('id', 'driver_id').in_bulk(trip_ids)
+        now = timezone.now()
+        events = []
+        for index, event in valid['events']:
+            if event['trip'] not in known_trips:
+                errors.append({'event': index, 'errors': {'trip': [f"Trip {event['trip']} does not exist."]}})
+                continue
+            event['trip'] = known_trips[event['trip']]
+            event.setdefault('event_time', now)
+            events.append(TripEvent(**event))
+        
+        results, stops, created = apply_checkpoints([checkpoint for _, checkpoint in valid['checkpoints']], events)
+        counts = {'applied': 0, 'unchanged': 0}
+        for (index, _), result in zip(valid['checkpoints'], results):
+            if result in counts:
+                counts[result] += 1
+            else:
+                errors.append({'checkpoint': index, 'errors': {'non_field_errors': [result]}})
+        
+        trip_ids = {stop.trip_id for stop in stops.values()} | {event.trip_id for event in created}
+        merged = TripStop.objects.filter(trip_id__in=trip_ids).select_related('trip').order_by('trip', 'stop_order')
+        return Response({
+            **counts,
+            'events_created': len(created),
+            'failed': len(errors),
+            'errors': errors,
+            'stops': TripStopSerializer(merged, many=True).data,
+        })
 
 
-class TripEventViewSet(viewsets.ModelViewSet):
+class TripEventViewSet(ReplicaReadMixin, ConditionalGetMixin, SpatialFilterMixin, SparseFieldsetMixin, FastListMixin,
+                       viewsets.ModelViewSet):
     """
     ViewSet for TripEvent model
     """
     queryset = TripEvent.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = TripEventPagination
+    version_tags = ('trip_events', 'trips')
+    change_log = SyncChange
+    spatial_points = (('latitude', 'longitude', 'grid_cell'),)
+    bulk_max_items = 5000
+    export_columns = {
+        'id': 'id',
+        'trip': 'trip_id',
+        'trip_number': 'trip__trip_number',
+        'event_type': 'event_type',
+        'event_time': 'event_time',
+        'location': 'location',
+        'latitude': 'latitude',
+        'longitude': 'longitude',
+        'description': 'description',
+        'additional_data': 'additional_data',
+    }
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -219,7 +413,7 @@ class TripEventViewSet(viewsets.ModelViewSet):
         return TripEventSerializer
     
     def get_queryset(self):
-        queryset = TripEvent.objects.all()
+        queryset = TripEvent.objects.select_related('trip')
         
         # Filter by trip
         trip_id = self.request.query_params.get('trip')
@@ -231,4 +425,276 @@ class TripEventViewSet(viewsets.ModelViewSet):
         if event_type:
             queryset = queryset.filter(event_type=event_type)
         
+        # Filter by proximity (?near=lat,lon&radius_mi=) or bounding box (?bbox=)
+        queryset = self.filter_spatial(queryset)
+        
         return queryset.order_by('-event_time')
+    
+    def perform_create(self, serializer):
+        # Rollup counters are updated by post_save; keep them in the same transaction
+        with transaction.atomic():
+            serializer.save()
+    
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Stream all events matching the list filters as CSV or NDJSON
+        """
+        return streaming_export(
+            self.get_queryset(), self.export_columns, request.accepted_renderer.format, 'trip_events'
+        )
+    
+    @action(detail=False, methods=['post'], url_path='bulk', parser_classes=[FastJSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        Create many events at once from a JSON array or NDJSON body
+
+        The batch is validated in one pass in which items fail independently;
+        invalid items and items for unknown trips are reported by index
+        (the line number for NDJSON) while the rest are inserted.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Expected a JSON array or NDJSON body of events'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if sum(not isinstance(item, BlankLine) for item in items) > self.bulk_max_items:
+            return Response(
+                {'error': f'Batch too large, at most {self.bulk_max_items} events per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        valid, errors = TripEventBulkItemSerializer(many=True).partition(items)
+        
+        # One query to check every referenced trip; the owners it loads are
+        # reused by the position, rollup and sync-feed hooks
+        trip_ids = {data['trip'] for _, data in valid}
+        known_trips = Trip.objects.only('id', 'driver_id').in_bulk(trip_ids)
+        
+        now = timezone.now()
+        events = []
+        for index, data in valid:
+            if data['trip'] not in known_trips:
+                errors.append({'index': index, 'errors': {'trip': [f"Trip {data['trip']} does not exist."]}})
+                continue
+            data['trip'] = known_trips[data['trip']]
+            data.setdefault('event_time', now)
+            events.append(TripEvent(**data))
+        
+        if events:
+            record_events(events)
+        
+        errors.sort(key=lambda error: error['index'])
+        return Response(
+            {'created': len(events), 'failed': len(errors), 'errors': errors},
+            status=status.HTTP_201_CREATED if events else status.HTTP_400_BAD_REQUEST
+        )
+
+
+class FleetPositionViewSet(SparseFieldsetMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Latest position of every truck on an in-progress trip
+    """
+    queryset = LastKnownPosition.objects.all()
+    serializer_class = LastKnownPositionSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+    
+    def get_queryset(self):
+        queryset = LastKnownPosition.objects.filter(
+            trip__status='in_progress'
+        ).select_related('trip', 'driver')
+        
+        # Filter by driver
+        driver_id = self.request.query_params.get('driver')
+        if driver_id:
+            queryset = queryset.filter(driver_id=driver_id)
+        
+        # Only trucks that moved after a previous poll
+        since = self.request.query_params.get('since')
+        if since:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since:
+                if timezone.is_naive(since):
+                    since = timezone.make_aware(since)
+                queryset = queryset.filter(updated_at__gt=since)
+        
+        return queryset.order_by('trip_id')
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Positions plus the server time to pass as ``since`` on the next poll
+        """
+        as_of = timezone.now()
+        serializer = self.get_serializer(self.filter_queryset(self.get_queryset()), many=True)
+        return Response({'as_of': as_of, 'positions': serializer.data})
+
+
+class DriverDailyStatsViewSet(ConditionalGetMixin, SparseFieldsetMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Per-driver daily rollups for dashboards, read without touching trips or events
+    """
+    queryset = DriverDailyStats.objects.all()
+    serializer_class = DriverDailyStatsSerializer
+    permission_classes = [IsAuthenticated]
+    version_tags = ('driver_stats',)
+    conditional_modified_field = 'updated_at'
+    
+    def get_queryset(self):
+        queryset = DriverDailyStats.objects.select_related('driver')
+        
+        # Filter by driver
+        driver_id = self.request.query_params.get('driver')
+        if driver_id:
+            queryset = queryset.filter(driver_id=driver_id)
+        
+        # Filter by date range (inclusive local days)
+        start_date = self.request.query_params.get('start_date')
+        if start_date:
+            try:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+                queryset = queryset.filter(day__gte=start_date)
+            except ValueError:
+                pass
+        
+        end_date = self.request.query_params.get('end_date')
+        if end_date:
+            try:
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+                queryset = queryset.filter(day__lte=end_date)
+            except ValueError:
+                pass
+        
+        return queryset.order_by('-day', 'driver_id')
+    
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        Totals per driver over the filtered days
+        """
+        totals = (
+            self.get_queryset()
+            .values('driver')
+            .annotate(
+                days=Count('id'),
+                trips_completed=Sum('trips_completed'),
+                planned_miles=Sum('planned_miles'),
+                actual_miles=Sum('actual_miles'),
+                actual_duration=Sum('actual_duration'),
+                stops_completed=Sum('stops_completed'),
+                delay_events=Sum('delay_events'),
+            )
+            .order_by('driver')
+        )
+        serializer = DriverStatsSummarySerializer(totals, many=True)
+        return Response(serializer.data)
+
+
+class LaneStatsViewSet(ConditionalGetMixin, SparseFieldsetMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Completed-trip analytics per origin -> destination state lane
+    """
+    queryset = LaneStats.objects.all()
+    permission_classes = [IsAuthenticated]
+    version_tags = ('lanes',)
+    conditional_modified_field = 'updated_at'
+    
+    def get_serializer_class(self):
+        if self.action == 'cities':
+            return LaneCityStatsSerializer
+        return LaneStatsSerializer
+    
+    def get_queryset(self):
+        # State lanes have blank cities; the cities action drills into city pairs
+        if self.action == 'cities':
+            queryset = LaneStats.objects.exclude(origin_city='')
+        else:
+            queryset = LaneStats.objects.filter(origin_city='')
+        
+        # Filter by lane
+        origin_state = self.request.query_params.get('origin_state')
+        if origin_state:
+            queryset = queryset.filter(origin_state=origin_state)
+        
+        destination_state = self.request.query_params.get('destination_state')
+        if destination_state:
+            queryset = queryset.filter(destination_state=destination_state)
+        
+        return queryset.order_by('-trips', 'origin_state', 'destination_state', 'origin_city', 'destination_city')
+    
+    @action(detail=False, methods=['get'])
+    def cities(self, request):
+        """
+        City pairs, optionally within one lane (``?origin_state=&destination_state=``)
+        """
+        return self.list(request)
+
+
+class SyncFeedView(APIView):
+    """
+    Delta-sync feed for mobile clients (see trips/changes.py)
+
+    ``GET /api/sync/?since=<token>&driver=<id>&limit=`` returns the trips,
+    stops, events and vehicles changed after ``since`` plus the IDs of
+    deleted ones, oldest change first. Pass the returned ``next`` as the
+    following ``since``; ``has_more`` asks for another page right away.
+    Without ``since`` (or with 0) every current row is returned, in pages
+    of the same size, along with the token to continue from.
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 1000
+    max_limit = 5000
+    max_number = 2 ** 63 - 1
+    sections = {
+        'trip': ('trips', Trip, TripSerializer, 'driver'),
+        'trip_stop': ('stops', TripStop, TripStopSerializer, 'trip'),
+        'trip_event': ('events', TripEvent, TripEventSerializer, 'trip'),
+        'vehicle': ('vehicles', Vehicle, VehicleSerializer, 'assigned_driver'),
+    }
+    
+    def get(self, request):
+        params = request.query_params
+        since = self.parse_number(params.get('since'), 'since', 0)
+        driver_id = self.parse_number(params.get('driver'), 'driver', None)
+        limit = min(self.parse_number(params.get('limit'), 'limit', self.default_limit) or 1, self.max_limit)
+        
+        deleted = {name: [] for name, _, _, _ in self.sections.values()}
+        # A snapshot pages through the live entries, which cover every current row
+        ceiling = changes.current_token() if since == 0 else since
+        entries, has_more = changes.changes_since(since, driver_id, limit, live_only=since == 0)
+        if has_more:
+            token = entries[-1][0]
+        else:
+            # Read before the entries: anything written meanwhile comes again next time
+            token = max(ceiling, entries[-1][0] if entries else 0)
+        changed = defaultdict(list)
+        for _, label, object_id, gone in entries:
+            if gone:
+                deleted[self.sections[label][0]].append(object_id)
+            else:
+                changed[label].append(object_id)
+        
+        data = {}
+        for label, (name, model, serializer_class, related) in self.sections.items():
+            rows = list(model.objects.filter(pk__in=changed[label]).select_related(related).order_by('pk'))
+            data[name] = serializer_class(rows, many=True).data
+            # Rows deleted after their entry was read are reported as deleted
+            found = {row.pk for row in rows}
+            deleted[name].extend(object_id for object_id in changed[label] if object_id not in found)
+        return Response({'since': since, 'next': token, 'has_more': has_more, 'changes': data, 'deleted': deleted})
+    
+    def parse_number(self, value, name, default):
+        if value in (None, ''):
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            number = -1
+        # Ids and tokens are 64-bit signed integers in the database
+        if not 0 <= number <= self.max_number:
+            raise ValidationError({name: ['Expected a non-negative integer.']})
+        return number
@@ -132,6 +132,9 @@ const dutyLogAPI = {
 // Trip API endpoints
 const tripAPI = {
   getTrips: () => apiRequest('/trips/trips/'),
+  // Trip with its stops and latest events embedded, in one request
+  getTripDocument: (id, eventsLimit = 50) =>
+    apiRequest(`/trips/trips/${id}/?include=stops,events&events_limit=${eventsLimit}`),
   createTrip: (data) => apiRequest('/trips/trips/', {
     method: 'POST',
     body: JSON.stringify(data),
@@ -177,6 +180,7 @@ const apiService = {
 
   // Trips
   getTrips: tripAPI.getTrips,
+  getTripDocument: tripAPI.getTripDocument,
   createTrip: tripAPI.createTrip,
   updateTrip: tripAPI.updateTrip,
   deleteTrip: tripAPI.deleteTrip,